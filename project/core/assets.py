@@ -1,8 +1,177 @@
+import io
+import json
+import mmap
 import os
+import struct
 
 PROJECT_ROOT = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "..")
 )
 
+ASSETS_ROOT = os.path.join(PROJECT_ROOT, "assets")
+
+# Pack de distribución (tools/asset_packer.py). Si no existe, se leen los archivos sueltos.
+PACK_PATH = os.environ.get("JUEGO_ASSET_PACK") or os.path.join(PROJECT_ROOT, "assets.pack")
+
+# Formato del pack (little-endian):
+#   header: MAGIC(8) | count u32 | index_offset u64 | index_size u64
+#   datos:  blobs concatenados
+#   index:  por entrada -> path_len u16 | path utf-8 | offset u64 | length u64 | sha1(20)
+PACK_MAGIC = b"JUEGOPK1"
+PACK_HEADER = struct.Struct("<8sIQQ")
+PACK_ENTRY = struct.Struct("<QQ20s")
+
+
 def asset_path(*parts: str) -> str:
     return os.path.join(PROJECT_ROOT, "assets", *parts)
+
+
+def asset_key(path: str) -> str:
+    """
+    Clave canónica de un asset: path relativo a assets/ con '/'.
+    Acepta lo que devuelve asset_path() o un path ya relativo.
+    """
+    p = os.path.normpath(path)
+    if os.path.isabs(p):
+        p = os.path.relpath(p, ASSETS_ROOT)
+    return p.replace("\\", "/")
+
+
+class AssetPack:
+    """Lector de assets.pack: índice en memoria + datos por mmap (un solo open)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, index_offset, index_size = PACK_HEADER.unpack_from(self._mm, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"Asset pack inválido (magic): {path}")
+
+        self.index: dict[str, tuple[int, int, bytes]] = {}
+        self._dirs: dict[str, set[str]] = {}
+
+        pos = index_offset
+        end = index_offset + index_size
+        for _ in range(count):
+            (name_len,) = struct.unpack_from("<H", self._mm, pos)
+            pos += 2
+            name = bytes(self._mm[pos:pos + name_len]).decode("utf-8")
+            pos += name_len
+            offset, length, digest = PACK_ENTRY.unpack_from(self._mm, pos)
+            pos += PACK_ENTRY.size
+            self.index[name] = (offset, length, digest)
+
+            # índice de directorios para list_assets()
+            parent, _, base = name.rpartition("/")
+            self._dirs.setdefault(parent, set()).add(base)
+            while parent:
+                grand, _, base = parent.rpartition("/")
+                self._dirs.setdefault(grand, set()).add(base)
+                parent = grand
+
+        if pos != end:
+            raise ValueError(f"Asset pack inválido (índice corrupto): {path}")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def read(self, key: str) -> bytes:
+        offset, length, _ = self.index[key]
+        return self._mm[offset:offset + length]
+
+    def read_range(self, key: str, start: int, size: int) -> bytes:
+        offset, length, _ = self.index[key]
+        start = max(0, min(start, length))
+        end = min(length, start + size)
+        return self._mm[offset + start:offset + end]
+
+    def listdir(self, key: str) -> list[str]:
+        return sorted(self._dirs.get(key.strip("/"), ()))
+
+    def is_dir(self, key: str) -> bool:
+        return key.strip("/") in self._dirs
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+
+_pack: AssetPack | None = None
+_pack_checked = False
+
+
+def get_pack() -> AssetPack | None:
+    """Pack abierto (lazy), o None en desarrollo (sin assets.pack)."""
+    global _pack, _pack_checked
+    if not _pack_checked:
+        _pack_checked = True
+        if os.path.exists(PACK_PATH):
+            _pack = AssetPack(PACK_PATH)
+    return _pack
+
+
+# -------------------------
+# Lectura (pack primero, archivos sueltos como fallback)
+# -------------------------
+def asset_exists(path: str) -> bool:
+    pack = get_pack()
+    if pack is not None and asset_key(path) in pack:
+        return True
+    return os.path.exists(path if os.path.isabs(path) else asset_path(path))
+
+
+def read_asset(path: str) -> bytes:
+    pack = get_pack()
+    if pack is not None:
+        key = asset_key(path)
+        if key in pack:
+            return pack.read(key)
+
+    with open(path if os.path.isabs(path) else asset_path(path), "rb") as f:
+        return f.read()
+
+
+def read_asset_range(path: str, start: int, size: int) -> bytes:
+    """Lee size bytes desde start sin cargar el archivo entero (chunks de mapas en streaming)."""
+    pack = get_pack()
+    if pack is not None:
+        key = asset_key(path)
+        if key in pack:
+            return pack.read_range(key, start, size)
+
+    with open(path if os.path.isabs(path) else asset_path(path), "rb") as f:
+        f.seek(start)
+        return f.read(size)
+
+
+def open_asset(path: str) -> io.BytesIO:
+    """File-like en memoria (sirve para pygame.image.load, ET.parse, etc)."""
+    return io.BytesIO(read_asset(path))
+
+
+def load_json_asset(path: str):
+    return json.loads(read_asset(path).decode("utf-8"))
+
+
+def list_assets(path: str) -> list[str]:
+    """Nombres dentro de un directorio de assets (pack + sueltos)."""
+    names: set[str] = set()
+
+    pack = get_pack()
+    if pack is not None:
+        names.update(pack.listdir(asset_key(path)))
+
+    abs_dir = path if os.path.isabs(path) else asset_path(path)
+    if os.path.isdir(abs_dir):
+        names.update(os.listdir(abs_dir))
+
+    return sorted(names)
+
+
+def is_asset_dir(path: str) -> bool:
+    pack = get_pack()
+    if pack is not None and pack.is_dir(asset_key(path)):
+        return True
+    return os.path.isdir(path if os.path.isabs(path) else asset_path(path))
@@ -1,3 +1,6 @@
 TILE_SIZE = 32
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
+
+# NPCs runtime en struct-of-arrays (core/entities/unit_store.py) si numpy está instalado
+VECTOR_NPCS = True
@@ -1,6 +1,47 @@
 import pygame
-from core.assets import asset_path
+from core.assets import asset_key, asset_path, open_asset
 from core.config import TILE_SIZE
+from render.world.atlas import get_atlas
+from render.world.memory import surface_bytes
+
+PROTAGONIST_WALK = "sprites/protagonist/walk.png"
+DEFAULT_MOVE_SPEED = 120  # pixels por segundo
+
+# RPG Maker "sheet grande": 4 bloques a lo ancho, 2 a lo alto (total 8 slots)
+WALK_SHEET_CHARS = (4, 2)
+# Dentro del bloque: 3 columnas x 4 filas (frames)
+WALK_FRAME_GRID = (3, 4)
+
+# Sheets y frames escalados compartidos entre todas las Units (key = asset_key del sheet)
+_walk_sheets: dict[str, pygame.Surface] = {}
+_scaled_frames: dict[tuple, pygame.Surface] = {}
+
+
+def walk_frame_rect(sheet_w: int, sheet_h: int, row: int, col: int, char_col: int = 0, char_row: int = 0) -> pygame.Rect:
+    """Rect de un frame (row, col) del personaje (char_col, char_row) dentro de un walk sheet."""
+    block_w = sheet_w // WALK_SHEET_CHARS[0]
+    block_h = sheet_h // WALK_SHEET_CHARS[1]
+    frame_w = block_w // WALK_FRAME_GRID[0]
+    frame_h = block_h // WALK_FRAME_GRID[1]
+    return pygame.Rect(
+        char_col * block_w + col * frame_w,
+        char_row * block_h + row * frame_h,
+        frame_w,
+        frame_h,
+    )
+
+
+def walk_cache_report() -> dict:
+    """Bytes retenidos por los caches compartidos de walk sheets y frames escalados."""
+    sheets = sum(surface_bytes(s) for s in _walk_sheets.values())
+    frames = sum(surface_bytes(f) for f in _scaled_frames.values())
+    return {
+        "sheets": len(_walk_sheets),
+        "frames": len(_scaled_frames),
+        "sheet_bytes": sheets,
+        "frame_bytes": frames,
+        "total": sheets + frames,
+    }
 
 
 class Unit:
@@ -13,7 +54,7 @@ class Unit:
         self.pixel_y = tile_y * TILE_SIZE
 
         # Movimiento
-        self.move_speed = 120  # pixels por segundo
+        self.move_speed = DEFAULT_MOVE_SPEED
         self.is_moving = False
         self.target_x = self.pixel_x
         self.target_y = self.pixel_y
@@ -21,35 +62,48 @@ class Unit:
         # --- Sprite overworld ---
         self.facing = (0, 1)  # abajo por defecto
 
-        self._walk_sheet = pygame.image.load(
-            asset_path("sprites", "protagonist", "walk.png")
-        ).convert_alpha()
-
-        # RPG Maker "sheet grande": 4 bloques a lo ancho, 2 a lo alto (total 8 slots)
         # En tu caso, el personaje está en el bloque superior-izquierdo (0,0)
-        self._sheet_chars_x = 4
-        self._sheet_chars_y = 2
         self._char_col = 0
         self._char_row = 0
 
-        sheet_w = self._walk_sheet.get_width()
-        sheet_h = self._walk_sheet.get_height()
-
-        # Tamaño del bloque de 1 personaje dentro del sheet (ej 144x192)
-        self._char_block_w = sheet_w // self._sheet_chars_x
-        self._char_block_h = sheet_h // self._sheet_chars_y
-
-        # Dentro del bloque: 3 columnas x 4 filas (frames)
-        self._cols = 3
-        self._rows = 4
-        self._frame_w = self._char_block_w // self._cols
-        self._frame_h = self._char_block_h // self._rows
+        self._walk_key = None
+        self._walk_sheet = None
+        # frames desde el atlas: (row, col) -> (página, rect), ya escalados a TILE_SIZE
+        self._atlas_frames = None
+        self.set_walk_sheet(PROTAGONIST_WALK)
 
         # Animación
         self._anim_time = 0.0
         self._anim_speed = 0.12
         self._frame_index = 1  # idle típico (columna del medio)
 
+    def set_walk_sheet(self, path: str) -> None:
+        """
+        Asigna el walk sheet (path relativo a assets/ o absoluto).
+
+        Usa el atlas si lo tiene; si no, carga el sheet una sola vez por proceso
+        y lo comparte entre todas las Units que lo usan.
+        """
+        key = asset_key(path)
+
+        atlas = get_atlas()
+        frames = atlas.walk_frames(key) if atlas is not None else None
+        if frames:
+            self._walk_key = key
+            self._atlas_frames = frames
+            self._walk_sheet = None
+            return
+
+        sheet = _walk_sheets.get(key)
+        if sheet is None:
+            full = asset_path(key)
+            sheet = pygame.image.load(open_asset(full), full).convert_alpha()
+            _walk_sheets[key] = sheet
+
+        self._walk_key = key
+        self._atlas_frames = None
+        self._walk_sheet = sheet
+
     def set_facing(self, dx: int, dy: int):
         if dx == 0 and dy == 0:
             return
@@ -82,25 +136,31 @@ class Unit:
             row = 3  # dy == -1
 
         col = self._frame_index
+        pos = (self.pixel_x - camera.x, self.pixel_y - camera.y)
+
+        if self._atlas_frames is not None:
+            page, area = self._atlas_frames[(row, col)]
+            screen.blit(page, pos, area)
+            return
+
+        screen.blit(self._frame_surface(row, col), pos)
+
+    def _frame_surface(self, row: int, col: int) -> pygame.Surface:
+        cache_key = (self._walk_key, self._char_col, self._char_row, row, col)
+        frame = _scaled_frames.get(cache_key)
+        if frame is not None:
+            return frame
 
         # Offset al bloque del personaje dentro del sheet 4x2
-        base_x = self._char_col * self._char_block_w
-        base_y = self._char_row * self._char_block_h
-
-        src = pygame.Rect(
-            base_x + col * self._frame_w,
-            base_y + row * self._frame_h,
-            self._frame_w,
-            self._frame_h
+        src = walk_frame_rect(
+            self._walk_sheet.get_width(), self._walk_sheet.get_height(),
+            row, col, self._char_col, self._char_row,
         )
-
         frame = self._walk_sheet.subsurface(src)
 
         # Ajustar al TILE_SIZE del mundo
         if frame.get_width() != TILE_SIZE or frame.get_height() != TILE_SIZE:
             frame = pygame.transform.scale(frame, (TILE_SIZE, TILE_SIZE))
 
-        screen.blit(
-            frame,
-            (self.pixel_x - camera.x, self.pixel_y - camera.y)
-        )
+        _scaled_frames[cache_key] = frame
+        return frame
@@ -0,0 +1,251 @@
+# project/core/entities/unit_store.py
+"""
+Units en struct-of-arrays (opcional, requiere numpy).
+
+UnitStore guarda el estado de movimiento/animación de muchas Units en arrays
+paralelos (un slot por Unit) y los avanza todos juntos en update(dt): la
+interpolación hacia el target y el paso de frames son operaciones vectoriales
+en vez de un MovementController.update + update_sprite por Unit.
+
+StoredUnit es una Unit cuyos campos de movimiento son vistas a su slot: el
+resto del código (controllers, tasks, draw, eventos) la usa igual que a una
+Unit común.
+"""
+from core.entities.unit import Unit
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin él NPCSystem usa Units comunes
+    np = None
+
+HAS_NUMPY = np is not None
+
+# campo -> dtype
+_FIELDS = {
+    "tile_x": "int32",
+    "tile_y": "int32",
+    "pixel_x": "float64",
+    "pixel_y": "float64",
+    "target_x": "float64",
+    "target_y": "float64",
+    "move_speed": "float64",
+    "is_moving": "bool",
+    "facing_x": "int8",
+    "facing_y": "int8",
+    "anim_time": "float64",
+    "anim_speed": "float64",
+    "frame_index": "int8",
+    "alive": "bool",
+}
+
+
+class UnitStore:
+    """
+    Arrays paralelos por campo (ver _FIELDS), un slot por Unit.
+
+    Los slots libres se reusan; si no alcanza la capacidad se duplica.
+    ids[slot] es el id con el que se registró la Unit (o None si el slot está libre).
+
+    Además lleva un índice tile -> ids (lo mantienen los setters de
+    StoredUnit.tile_x/tile_y) para que colisiones e interacciones no recorran
+    todas las Units.
+    """
+
+    def __init__(self, capacity: int = 64):
+        if np is None:
+            raise RuntimeError("UnitStore requiere numpy")
+        self.capacity = max(1, int(capacity))
+        for name, dtype in _FIELDS.items():
+            setattr(self, name, np.zeros(self.capacity, dtype=dtype))
+        self.ids: list = [None] * self.capacity
+        self._free: list[int] = []
+        self._used = 0  # slots [0, _used) alguna vez asignados
+        self._by_tile: dict[tuple[int, int], set] = {}
+
+    def __len__(self) -> int:
+        return self._used - len(self._free)
+
+    # -------------------------------
+    # Slots
+    # -------------------------------
+    def allocate(self, unit_id=None) -> int:
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._used == self.capacity:
+                self._grow(self.capacity * 2)
+            slot = self._used
+            self._used += 1
+        for name in _FIELDS:
+            getattr(self, name)[slot] = 0
+        self.alive[slot] = True
+        self.ids[slot] = unit_id
+        self._by_tile.setdefault((0, 0), set()).add(slot)
+        return slot
+
+    def release(self, unit: "StoredUnit") -> None:
+        """Libera el slot de unit; la Unit sigue usable (queda con un store propio de 1 slot)."""
+        if unit._store is not self:
+            return
+        slot = unit._slot
+        own = UnitStore(capacity=1)
+        own_slot = own.allocate(self.ids[slot])
+        for name in _FIELDS:
+            if name not in ("tile_x", "tile_y"):
+                getattr(own, name)[own_slot] = getattr(self, name)[slot]
+        own.set_tile(own_slot, self.tile_x.item(slot), self.tile_y.item(slot))
+        unit._store, unit._slot = own, own_slot
+
+        self._unindex(slot)
+        self.alive[slot] = False
+        self.is_moving[slot] = False
+        self.ids[slot] = None
+        self._free.append(slot)
+
+    def set_tile(self, slot: int, tx: int, ty: int) -> None:
+        self._unindex(slot)
+        self.tile_x[slot] = tx
+        self.tile_y[slot] = ty
+        self._by_tile.setdefault((int(tx), int(ty)), set()).add(slot)
+
+    def _unindex(self, slot: int) -> None:
+        key = (self.tile_x.item(slot), self.tile_y.item(slot))
+        slots = self._by_tile.get(key)
+        if slots is not None:
+            slots.discard(slot)
+            if not slots:
+                del self._by_tile[key]
+
+    def _grow(self, capacity: int) -> None:
+        for name in _FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[: self.capacity] = old
+            setattr(self, name, new)
+        self.ids.extend([None] * (capacity - self.capacity))
+        self.capacity = capacity
+
+    # -------------------------------
+    # Update vectorizado
+    # -------------------------------
+    def update(self, dt: float, slots=None) -> None:
+        """
+        Equivale a MovementController.update + Unit.update_sprite de cada Unit viva.
+        slots: sólo esos slots (las Units despiertas); None = todos.
+        """
+        n = self._used
+        if n == 0:
+            return
+        sel = np.arange(n) if slots is None else np.fromiter(slots, dtype=np.int64)
+        if sel.size == 0:
+            return
+
+        idx = sel[self.is_moving[sel]]
+        if idx.size:
+            px = self.pixel_x[idx]
+            py = self.pixel_y[idx]
+            tx = self.target_x[idx]
+            ty = self.target_y[idx]
+            dx = tx - px
+            dy = ty - py
+            dist = np.sqrt(dx * dx + dy * dy)
+            step = self.move_speed[idx] * dt
+
+            arrived = dist <= step
+            safe = np.where(arrived, 1.0, dist)
+            self.pixel_x[idx] = np.where(arrived, tx, px + (dx / safe) * step)
+            self.pixel_y[idx] = np.where(arrived, ty, py + (dy / safe) * step)
+            self.is_moving[idx[arrived]] = False
+
+        # animación: idle si no se mueve, avanza frames si camina
+        moving = self.is_moving[sel]
+        anim = self.anim_time[sel]
+        frame = self.frame_index[sel]
+
+        still = ~moving
+        frame[still] = 1
+        anim[still] = 0.0
+
+        anim[moving] += dt
+        roll = moving & (anim >= self.anim_speed[sel])
+        anim[roll] = 0.0
+        frame[roll] = (frame[roll] + 1) % 3
+
+        self.anim_time[sel] = anim
+        self.frame_index[sel] = frame
+
+    # -------------------------------
+    # Consultas
+    # -------------------------------
+    def moving_ids(self, slots=None) -> set:
+        if slots is None:
+            return {self.ids[i] for i in np.flatnonzero(self.is_moving[: self._used])}
+        return {self.ids[i] for i in slots if self.is_moving[i]}
+
+    def ids_at(self, tx: int, ty: int) -> list:
+        return [self.ids[i] for i in self._by_tile.get((tx, ty), ())]
+
+    def ids_in_rect(self, left: float, top: float, right: float, bottom: float) -> list:
+        """Ids cuya posición en píxeles cae dentro del rect (bordes exclusivos)."""
+        n = self._used
+        px = self.pixel_x[:n]
+        py = self.pixel_y[:n]
+        hits = np.flatnonzero(self.alive[:n] & (px > left) & (px < right) & (py > top) & (py < bottom))
+        return [self.ids[i] for i in hits]
+
+
+def _slot_field(name: str):
+    def fget(self):
+        # .item(): escalar de Python (int/float/bool), no np.generic
+        return getattr(self._store, name).item(self._slot)
+
+    def fset(self, value):
+        getattr(self._store, name)[self._slot] = value
+
+    return property(fget, fset)
+
+
+class StoredUnit(Unit):
+    """Unit cuyo estado de movimiento/animación vive en un slot de UnitStore."""
+
+    pixel_x = _slot_field("pixel_x")
+    pixel_y = _slot_field("pixel_y")
+    target_x = _slot_field("target_x")
+    target_y = _slot_field("target_y")
+    move_speed = _slot_field("move_speed")
+    is_moving = _slot_field("is_moving")
+    _anim_time = _slot_field("anim_time")
+    _anim_speed = _slot_field("anim_speed")
+    _frame_index = _slot_field("frame_index")
+
+    def __init__(self, store: UnitStore, unit_id=None, tile_x=5, tile_y=5):
+        self._store = store
+        self._slot = store.allocate(unit_id)
+        super().__init__(tile_x=tile_x, tile_y=tile_y)
+
+    # tile lógico: pasa por set_tile para mantener el índice tile -> ids del store
+    @property
+    def tile_x(self) -> int:
+        return self._store.tile_x.item(self._slot)
+
+    @tile_x.setter
+    def tile_x(self, value) -> None:
+        self._store.set_tile(self._slot, value, self._store.tile_y.item(self._slot))
+
+    @property
+    def tile_y(self) -> int:
+        return self._store.tile_y.item(self._slot)
+
+    @tile_y.setter
+    def tile_y(self, value) -> None:
+        self._store.set_tile(self._slot, self._store.tile_x.item(self._slot), value)
+
+    @property
+    def facing(self) -> tuple[int, int]:
+        s, i = self._store, self._slot
+        return s.facing_x.item(i), s.facing_y.item(i)
+
+    @facing.setter
+    def facing(self, value) -> None:
+        s, i = self._store, self._slot
+        s.facing_x[i], s.facing_y[i] = value
@@ -1,5 +1,11 @@
 from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from core.world.buildings import BuildingManager, Completion
+from core.world.clock import START_TIME
+from core.world.economy import Economy, build_economy
+from core.world.memory import MemoryStore
+from core.world.morality import HAS_NUMPY, MoralitySim, build_population, load_profiles
 
 
 @dataclass
@@ -18,11 +24,69 @@ class GameState:
     # Estado persistente de NPCs (roles, si están activos en el mapa, etc)
     npcs: Dict[str, Dict[str, Any]] = field(default_factory=dict)
 
+    # Reloj del mundo: minutos de juego desde el inicio (core/world/clock.py)
+    world_time: float = START_TIME
+
+    # Lo que cada NPC vio/escuchó del jugador (core/world/memory.py)
+    memories: MemoryStore = field(default_factory=MemoryStore, repr=False, compare=False)
+
+    # Edificios y sus trabajos programados (core/world/buildings.py)
+    buildings: BuildingManager = field(default_factory=BuildingManager, repr=False, compare=False)
+
+    # Moralidad/confianza de la población (core/world/morality.py): se arma al
+    # primer uso con el elenco de assets + lo que traiga el save
+    morality_data: Optional[Dict[str, Any]] = field(default=None, repr=False, compare=False)
+    _morality: Optional[MoralitySim] = field(default=None, init=False, repr=False, compare=False)
+
+    # Economía del pueblo (core/world/economy.py): igual que la moralidad, se
+    # arma al primer uso con lo que traiga el save
+    economy_data: Optional[Dict[str, Any]] = field(default=None, repr=False, compare=False)
+    _economy: Optional[Economy] = field(default=None, init=False, repr=False, compare=False)
+    _economy_built: bool = field(default=False, init=False, repr=False, compare=False)
+
+    # Eventos pendientes (consecuencias, edificios): los corre el WorldState
+    # activo cuando no hay otro evento ni diálogo. Viven acá (y en el save)
+    # para no perderse al cambiar de mapa o de WorldState.
+    pending_events: List[str] = field(default_factory=list)
+
+    # Diario de hechos que cambiaron (lo drena el motor de consecuencias).
+    # None = nadie lo pidió: no se acumula nada.
+    _changes: Optional[List[tuple]] = field(default=None, init=False, repr=False, compare=False)
+
+    # -----------------------
+    # Diario de cambios
+    # -----------------------
+    def track_changes(self) -> None:
+        if self._changes is None:
+            self._changes = []
+
+    def touch(self, *key) -> None:
+        if self._changes is not None:
+            self._changes.append(key)
+
+    def drain_changes(self) -> List[tuple]:
+        """Claves de hechos cambiados desde el último drain: ("flag", f), ("role", npc), ("trust", npc), ("mem", npc, tag)..."""
+        if self._changes is None:
+            return []
+        if self._morality is not None:
+            for npc_id in self._morality.pop_changed():
+                self._changes.append(("trust", npc_id))
+        out, self._changes = self._changes, []
+        return out
+
+    # Listener de cambios de flags (lo setea el WorldState activo para despertar scripts).
+    # No se guarda en el save.
+    on_flag_change: Optional[Callable[[str, Any], None]] = field(default=None, repr=False, compare=False)
+
     # -----------------------
     # NPC state
     # -----------------------
     def set_npc(self, npc_id: str, **data):
         st = self.npcs.get(npc_id, {})
+        if self._changes is not None:
+            for k, v in data.items():
+                if st.get(k) != v:
+                    self._changes.append((k, npc_id))
         st.update(data)
         self.npcs[npc_id] = st
 
@@ -32,6 +96,67 @@ class GameState:
     def npc_role(self, npc_id: str) -> Optional[str]:
         return self.npcs.get(npc_id, {}).get("role")
 
+    def remember(self, npc_ids, tag: str, strength: float = 1.0, witnessed: bool = True) -> None:
+        """Los NPCs recuerdan tag ahora (witnessed=False: se lo contaron)."""
+        if isinstance(npc_ids, str):
+            npc_ids = [npc_ids]
+        npc_ids = list(npc_ids)
+        for npc_id in npc_ids:
+            self.touch("mem", npc_id, tag)
+        if witnessed:
+            self.memories.witness(npc_ids, tag, self.world_time, strength)
+        else:
+            self.memories.hear(npc_ids, tag, self.world_time, strength)
+
+    def morality(self) -> Optional[MoralitySim]:
+        """None sin numpy (las decisiones no mueven nada)."""
+        if self._morality is None and HAS_NUMPY:
+            self._morality = build_population(self.morality_data)
+        return self._morality
+
+    def economy(self) -> Optional[Economy]:
+        """None sin numpy o sin assets/data/economy.json."""
+        if not self._economy_built and HAS_NUMPY:
+            self._economy_built = True
+            self._economy = build_economy(sorted(load_profiles()), self.economy_data)
+        return self._economy
+
+    def decide(self, axes: Dict[str, float], tags=(), magnitude: float = 1.0, witnesses=None, heard_by=None) -> None:
+        """Decisión del jugador: se aplica a toda la población en el próximo tick (ver morality.py)."""
+        sim = self.morality()
+        if sim is not None:
+            sim.queue(axes, tags, magnitude, witnesses=witnesses, heard_by=heard_by)
+
+    def npc_trust(self, npc_id: str, default: float = 50.0) -> float:
+        sim = self.morality()
+        trust = sim.trust_of(npc_id) if sim is not None else None
+        if trust is None:
+            trust = self.npcs.get(npc_id, {}).get("trust", default)
+        return float(trust)
+
+    def npc_remembers(self, npc_id: str, tag: str, within_days: float | None = None,
+                      witnessed_only: bool = False) -> bool:
+        return self.memories.has(npc_id, tag, now=self.world_time, within_days=within_days,
+                                 witnessed_only=witnessed_only)
+
+    def queue_event(self, event_id: str) -> None:
+        self.pending_events.append(str(event_id))
+
+    def pop_event(self) -> Optional[str]:
+        return self.pending_events.pop(0) if self.pending_events else None
+
+    def advance_buildings(self) -> List[Completion]:
+        """
+        Vence los trabajos de edificios hasta world_time (flags incluidos).
+        Los eventos de lo que terminó se encolan acá mismo: ya salieron del
+        heap, y en pending_events sobreviven a un cambio de mapa o un save.
+        """
+        done = self.buildings.advance(self)
+        for c in done:
+            if c.event:
+                self.queue_event(c.event)
+        return done
+
     # -----------------------
     # Player
     # -----------------------
@@ -45,7 +170,12 @@ class GameState:
     # Flags
     # -----------------------
     def set_flag(self, key: str, value: bool = True) -> None:
+        changed = self.story_flags.get(key) != value
         self.story_flags[key] = value
+        if changed:
+            self.touch("flag", key)
+        if changed and self.on_flag_change is not None:
+            self.on_flag_change(key, value)
 
     def get_flag(self, key: str, default: bool = False) -> bool:
         return self.story_flags.get(key, default)
@@ -58,19 +188,39 @@ class GameState:
         if extra:
             payload.update(extra)
         self.party.append(payload)
+        self.touch("party", unit_id)
+
+    def in_party(self, npc_id: str) -> bool:
+        return any(u.get("id") == npc_id for u in self.party)
+
+    def npc_present(self, npc_id: str) -> bool:
+        """
+        En el pueblo (activo y no reclutado) o en la party. Los que se unen a la
+        party quedan active=False en el mapa, pero siguen con su rol.
+        """
+        st = self.npcs.get(npc_id, {})
+        if st.get("active") is not False and not self.get_flag(f"recruited:{npc_id}", False):
+            return True
+        return self.in_party(npc_id)
 
     # -----------------------
     # Save / Load
     # -----------------------
     def to_dict(self) -> Dict[str, Any]:
         return {
-            "version": 2,
+            "version": 5,
             "current_map_id": self.current_map_id,
             "player_tile": [self.player_tile[0], self.player_tile[1]],
             "story_flags": dict(self.story_flags),
             "party": list(self.party),
             "bodyguards": list(self.bodyguards),
             "npcs": dict(self.npcs),  # ✅ IMPORTANTE
+            "world_time": self.world_time,
+            "memories": self.memories.to_dict(),
+            "morality": self._morality.to_dict() if self._morality is not None else self.morality_data,
+            "buildings": self.buildings.to_dict(),
+            "economy": self._economy.to_dict() if self._economy is not None else self.economy_data,
+            "pending_events": list(self.pending_events),
         }
 
 
@@ -93,4 +243,17 @@ class GameState:
         # ✅ IMPORTANTE: mantener roles/estado de NPCs
         gs.npcs = dict(data.get("npcs", {}))
 
+        gs.world_time = float(data.get("world_time", gs.world_time))
+
+        # saves v2 no traen memorias: arrancan vacías
+        gs.memories = MemoryStore.from_dict(data.get("memories"))
+        gs.morality_data = data.get("morality")
+
+        # saves v3 no traen edificios
+        gs.buildings = BuildingManager.from_dict(data.get("buildings"))
+        gs.economy_data = data.get("economy")
+
+        # saves v4 no traen eventos pendientes
+        gs.pending_events = [str(e) for e in data.get("pending_events", [])]
+
         return gs
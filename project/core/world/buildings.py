@@ -0,0 +1,293 @@
+# project/core/world/buildings.py
+"""
+Edificios del pueblo: construcción, mejoras y producción como trabajos con
+hora de fin en tiempo de juego (GameState.world_time, minutos).
+
+Tipos en assets/data/buildings.json:
+
+  {
+    "types": {
+      "forge": {
+        "name": "Herrería",
+        "levels": [
+          {
+            "build_hours": 36,
+            "requires": {"roles": ["weapon_shop"], "workers": 1},
+            "produces": {"iron_sword": 1}, "produce_hours": 24,
+            "set_flags": {"forge_open": true}, "event": "forge_built"
+          },
+          ...
+        ]
+      }
+    }
+  }
+
+Los trabajos ("build" / "produce") van en un heap por hora de fin: avanzar
+el reloj (aunque sea un día entero) sólo saca los que vencieron, sin recorrer
+todos los edificios. Cada edificio tiene un token de trabajo: reemplazar o
+cancelar un trabajo sube el token y la entrada vieja del heap se descarta al
+salir. La producción repetida se pone al día de una vez (ciclos vencidos =
+(ahora - fin) // período + 1), no de a un ciclo por pop.
+
+Un edificio necesita trabajadores con un rol adecuado (requires.roles) y
+presentes (GameState.npc_present: en el pueblo o en la party, como los soldados); si al terminar un ciclo no los tiene, la producción se frena
+(flag building:<id>:stalled) hasta que se le asignen.
+"""
+import heapq
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from core.assets import asset_exists, asset_path, load_json_asset
+from core.world.clock import MINUTES_PER_HOUR
+
+BUILDINGS_PATH = asset_path("data", "buildings.json")
+
+_types: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+def get_building_types() -> Dict[str, Dict[str, Any]]:
+    """Tipos de edificio de buildings.json (se leen una vez)."""
+    global _types
+    if _types is None:
+        _types = {}
+        if asset_exists(BUILDINGS_PATH):
+            try:
+                _types = dict((load_json_asset(BUILDINGS_PATH) or {}).get("types") or {})
+            except (OSError, ValueError) as e:
+                print(f"[BUILD] ⚠️ No se pudo leer buildings.json: {e}")
+    return _types
+
+
+class Job(NamedTuple):
+    due: float
+    seq: int
+    kind: str  # "build" | "produce"
+    building_id: str
+    token: int
+
+
+class Completion(NamedTuple):
+    """Lo que pasó al vencer un trabajo (para lanzar eventos afuera de core)."""
+
+    kind: str  # "built" | "produced" | "stalled"
+    building_id: str
+    type_id: str
+    level: int
+    event: Optional[str]
+    goods: Dict[str, int]
+
+
+class BuildingManager:
+    """
+    Estado de los edificios + heap de trabajos.
+
+    start(gs, building_id, type_id, workers)  -> empieza a construir (nivel 1)
+    upgrade(gs, building_id)                   -> siguiente nivel
+    assign(building_id, workers)               -> cambia trabajadores
+    advance(gs)                                -> vence los trabajos hasta gs.world_time
+    """
+
+    def __init__(self, types: Optional[Dict[str, Dict[str, Any]]] = None):
+        self._types = types
+        self.buildings: Dict[str, Dict[str, Any]] = {}
+        self._jobs: List[Job] = []
+        self._seq = 0
+
+    @property
+    def types(self) -> Dict[str, Dict[str, Any]]:
+        if self._types is None:
+            self._types = get_building_types()
+        return self._types
+
+    def __contains__(self, building_id: str) -> bool:
+        return building_id in self.buildings
+
+    def get(self, building_id: str) -> Dict[str, Any]:
+        return self.buildings.get(building_id, {})
+
+    def pending(self) -> int:
+        return sum(1 for j in self._jobs if self._live(j))
+
+    def next_due(self) -> Optional[float]:
+        while self._jobs and not self._live(self._jobs[0]):
+            heapq.heappop(self._jobs)
+        return self._jobs[0].due if self._jobs else None
+
+    # -------------------------------
+    # Órdenes del jugador
+    # -------------------------------
+    def start(self, gs, building_id: str, type_id: str, workers=()) -> bool:
+        if building_id in self.buildings:
+            print(f"[BUILD] ⚠️ {building_id} ya existe")
+            return False
+        if type_id not in self.types:
+            print(f"[BUILD] ⚠️ Tipo de edificio desconocido: {type_id}")
+            return False
+        self.buildings[building_id] = {
+            "type": type_id,
+            "level": 0,
+            "status": "idle",
+            "workers": [],
+            "stock": {},
+            "token": 0,
+        }
+        if not self.assign(gs, building_id, workers, level=1):
+            del self.buildings[building_id]
+            return False
+        return self._begin_build(gs, building_id)
+
+    def upgrade(self, gs, building_id: str, workers=None) -> bool:
+        b = self.buildings.get(building_id)
+        if b is None or b["status"] == "building":
+            return False
+        if self._level_def(b, b["level"] + 1) is None:
+            print(f"[BUILD] ⚠️ {building_id} ya está al máximo")
+            return False
+        if workers is not None and not self.assign(gs, building_id, workers, level=b["level"] + 1):
+            return False
+        if not self._suitable(gs, b, b["level"] + 1):
+            return False
+        return self._begin_build(gs, building_id)
+
+    def assign(self, gs, building_id: str, workers, level: Optional[int] = None) -> bool:
+        """Asigna trabajadores si cumplen requires del nivel (por default el actual)."""
+        b = self.buildings.get(building_id)
+        if b is None:
+            return False
+        prev = b["workers"]
+        b["workers"] = [str(w) for w in workers or []]
+        if not self._suitable(gs, b, level or max(1, b["level"])):
+            b["workers"] = prev
+            return False
+
+        # un edificio frenado vuelve a producir al tener gente
+        if b["status"] == "stalled":
+            gs.set_flag(f"building:{building_id}:stalled", False)
+            self._begin_production(gs, building_id, gs.world_time)
+        return True
+
+    # -------------------------------
+    # Reloj
+    # -------------------------------
+    def advance(self, gs) -> List[Completion]:
+        """Vence los trabajos con due <= gs.world_time. O(k log n) para k vencidos."""
+        now = gs.world_time
+        out: List[Completion] = []
+        while self._jobs and self._jobs[0].due <= now:
+            job = heapq.heappop(self._jobs)
+            if not self._live(job):
+                continue
+            if job.kind == "build":
+                out.append(self._finish_build(gs, job))
+            else:
+                out.extend(self._finish_production(gs, job, now))
+        return out
+
+    # -------------------------------
+    # Internals
+    # -------------------------------
+    def _level_def(self, b: Dict[str, Any], level: int) -> Optional[Dict[str, Any]]:
+        levels = (self.types.get(b["type"]) or {}).get("levels") or []
+        if 1 <= level <= len(levels):
+            return levels[level - 1] or {}
+        return None
+
+    def _suitable(self, gs, b: Dict[str, Any], level: int) -> bool:
+        spec = self._level_def(b, level)
+        if spec is None:
+            return False
+        req = spec.get("requires") or {}
+        roles = set(req.get("roles") or [])
+        ok = [
+            w for w in b["workers"]
+            if (not roles or gs.npc_role(w) in roles) and gs.npc_present(w)
+        ]
+        need = int(req.get("workers", 1 if roles else 0))
+        if len(ok) < need:
+            print(f"[BUILD] ⚠️ {b['type']} nivel {level}: faltan trabajadores ({len(ok)}/{need}, roles {sorted(roles)})")
+            return False
+        return True
+
+    def _push(self, due: float, kind: str, building_id: str) -> None:
+        b = self.buildings[building_id]
+        b["token"] += 1
+        self._seq += 1
+        heapq.heappush(self._jobs, Job(float(due), self._seq, kind, building_id, b["token"]))
+        b["due"] = float(due)
+
+    def _live(self, job: Job) -> bool:
+        b = self.buildings.get(job.building_id)
+        return b is not None and b["token"] == job.token
+
+    def _begin_build(self, gs, building_id: str) -> bool:
+        b = self.buildings[building_id]
+        spec = self._level_def(b, b["level"] + 1)
+        b["status"] = "building"
+        self._push(gs.world_time + float(spec.get("build_hours", 0)) * MINUTES_PER_HOUR, "build", building_id)
+        gs.set_flag(f"building:{building_id}:in_progress", True)
+        return True
+
+    def _begin_production(self, gs, building_id: str, start: float) -> None:
+        b = self.buildings[building_id]
+        spec = self._level_def(b, b["level"]) or {}
+        hours = float(spec.get("produce_hours", 0) or 0)
+        if not spec.get("produces") or hours <= 0:
+            b["status"] = "idle"
+            b.pop("due", None)
+            return
+        b["status"] = "producing"
+        self._push(start + hours * MINUTES_PER_HOUR, "produce", building_id)
+
+    def _finish_build(self, gs, job: Job) -> Completion:
+        b = self.buildings[job.building_id]
+        b["level"] += 1
+        spec = self._level_def(b, b["level"]) or {}
+
+        gs.set_flag(f"building:{job.building_id}:in_progress", False)
+        gs.set_flag(f"building:{job.building_id}:built", True)
+        gs.set_flag(f"building:{job.building_id}:level_{b['level']}", True)
+        for flag, value in (spec.get("set_flags") or {}).items():
+            gs.set_flag(str(flag), value)
+
+        self._begin_production(gs, job.building_id, job.due)
+        return Completion("built", job.building_id, b["type"], b["level"], spec.get("event"), {})
+
+    def _finish_production(self, gs, job: Job, now: float) -> List[Completion]:
+        b = self.buildings[job.building_id]
+        spec = self._level_def(b, b["level"]) or {}
+
+        if not self._suitable(gs, b, b["level"]):
+            b["status"] = "stalled"
+            b.pop("due", None)
+            gs.set_flag(f"building:{job.building_id}:stalled", True)
+            return [Completion("stalled", job.building_id, b["type"], b["level"], spec.get("stall_event"), {})]
+
+        # ponerse al día de una: todos los ciclos vencidos hasta now
+        period = float(spec["produce_hours"]) * MINUTES_PER_HOUR
+        cycles = int((now - job.due) // period) + 1
+        goods = {str(k): int(v) * cycles for k, v in (spec.get("produces") or {}).items()}
+        stock = b["stock"]
+        for item, qty in goods.items():
+            stock[item] = stock.get(item, 0) + qty
+
+        self._push(job.due + cycles * period, "produce", job.building_id)
+        return [Completion("produced", job.building_id, b["type"], b["level"], spec.get("produce_event"), goods)]
+
+    # -------------------------------
+    # Save / Load
+    # -------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {bid: {k: v for k, v in b.items() if k != "token"} for bid, b in self.buildings.items()}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "BuildingManager":
+        """Los trabajos se rearman desde status + due de cada edificio."""
+        mgr = cls()
+        for bid, raw in (data or {}).items():
+            b = dict(raw)
+            b.setdefault("workers", [])
+            b.setdefault("stock", {})
+            b["token"] = 0
+            mgr.buildings[str(bid)] = b
+            if b.get("status") in ("building", "producing") and b.get("due") is not None:
+                mgr._push(b["due"], "build" if b["status"] == "building" else "produce", str(bid))
+        return mgr
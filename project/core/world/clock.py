@@ -0,0 +1,42 @@
+# project/core/world/clock.py
+"""
+Reloj del mundo. El tiempo se guarda en GameState.world_time como minutos de
+juego desde el inicio de la partida (float).
+"""
+
+MINUTES_PER_HOUR = 60
+MINUTES_PER_DAY = 24 * MINUTES_PER_HOUR
+
+# 1 segundo real = 1 minuto de juego (un día dura 24 minutos)
+GAME_MINUTES_PER_SECOND = 1.0
+
+# la partida arranca a las 08:00 del día 0
+START_TIME = 8 * MINUTES_PER_HOUR
+
+
+def day_of(t: float) -> int:
+    return int(t // MINUTES_PER_DAY)
+
+
+def minute_of_day(t: float) -> float:
+    return t % MINUTES_PER_DAY
+
+
+def hour_of(t: float) -> int:
+    return int(minute_of_day(t) // MINUTES_PER_HOUR)
+
+
+def parse_clock(value) -> int:
+    """'08:30' / '8' / 8 / 8.5 -> minutos del día."""
+    if isinstance(value, (int, float)):
+        return int(round(float(value) * MINUTES_PER_HOUR)) % MINUTES_PER_DAY
+    s = str(value).strip()
+    if ":" in s:
+        h, m = s.split(":", 1)
+        return (int(h) * MINUTES_PER_HOUR + int(m)) % MINUTES_PER_DAY
+    return int(round(float(s) * MINUTES_PER_HOUR)) % MINUTES_PER_DAY
+
+
+def format_clock(t: float) -> str:
+    m = int(minute_of_day(t))
+    return f"{m // MINUTES_PER_HOUR:02d}:{m % MINUTES_PER_HOUR:02d}"
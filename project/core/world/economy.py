@@ -0,0 +1,421 @@
+# project/core/world/economy.py
+"""
+Economía del pueblo en arrays (requiere numpy): tiendas y hogares avanzan
+juntos una vez por día de juego, en un tick vectorizado.
+
+assets/data/economy.json:
+  - goods:  {"food": {"base_price": 2, "need": 1.0}, ...}   need = unidades por hogar y día
+  - shops:  {"inn": {"role": "inn", "sells": {"ale": 30}, "wage": 5, "employees": 3}, ...}
+            sells = producción diaria; role = rol del encargado (sin encargado la tienda cierra)
+  - villagers: hogares genéricos además del elenco
+  - household_income, tax_rate, starting_cash, spend_fraction
+
+Estado:
+  - tiendas [S]:    stock[S, G], price[S, G], rate[S, G] (producción), cash[S], wage[S]
+  - hogares [H]:    cash[H], employer[H] (tienda o -1)
+
+Un día: producción -> sueldos (con impuesto) -> demanda de los hogares según
+presupuesto, repartida entre las tiendas que venden cada bien (más barato =
+más clientes) -> ventas (con impuesto) -> los precios se mueven con la
+relación demanda / stock, alrededor del precio base por el margen del
+encargado (más avaricioso en altruism_greed = más margen).
+
+Threading: update(gs) en el frame sólo hace el punto de sincronización. Al
+cambiar de día copia los arrays y los manda al worker; cuando el resultado
+vuelve lo adopta y re-aplica encima lo que el juego cambió mientras tanto
+(compras del jugador: el diario _journal). El frame nunca espera al tick.
+"""
+import itertools
+import queue
+import threading
+import weakref
+from typing import Any, Dict, List, Optional
+
+from core.assets import asset_exists, asset_path, load_json_asset
+from core.world.clock import day_of
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin él no hay economía simulada
+    np = None
+
+HAS_NUMPY = np is not None
+
+# id único por Economy (version arranca de cero en cada una: juntos identifican un estado de precios)
+_economy_ids = itertools.count(1)
+
+ECONOMY_PATH = asset_path("data", "economy.json")
+
+GREED_AXIS = "altruism_greed"
+GREED_MARKUP = 0.5  # margen extra de un encargado avaricioso al máximo (+50%)
+PRICE_STEP = 0.15  # cuánto se mueve un precio por día ante escasez/sobra
+PRICE_FLOOR, PRICE_CEIL = 0.5, 3.0  # en múltiplos del precio base (con margen)
+STOCK_DAYS = 5.0  # stock máximo en días de producción (lo demás se pierde)
+
+# columnas de estado de la simulación (lo que viaja al worker y vuelve)
+_STATE = ("stock", "price", "shop_cash", "hh_cash", "treasury")
+
+
+def load_config() -> Dict[str, Any]:
+    if not asset_exists(ECONOMY_PATH):
+        return {}
+    try:
+        return load_json_asset(ECONOMY_PATH) or {}
+    except (OSError, ValueError) as e:
+        print(f"[ECON] ⚠️ No se pudo leer economy.json: {e}")
+        return {}
+
+
+def simulate(state: Dict[str, Any], inputs: Dict[str, Any], days: int) -> Dict[str, Any]:
+    """
+    Avanza days días. Función pura sobre arrays (corre en el worker):
+    state = columnas de _STATE (se devuelven nuevas), inputs = datos fijos del tick.
+    """
+    stock = state["stock"].copy()
+    price = state["price"].copy()
+    shop_cash = state["shop_cash"].copy()
+    hh_cash = state["hh_cash"].copy()
+    treasury = float(state["treasury"])
+
+    rate, base, need = inputs["rate"], inputs["base"], inputs["need"]
+    open_ = inputs["open"]  # [S] 1.0 si tiene encargado
+    markup = inputs["markup"]  # [S]
+    wage, employer = inputs["wage"], inputs["employer"]
+    tax, income, spend = inputs["tax_rate"], inputs["household_income"], inputs["spend_fraction"]
+
+    S = stock.shape[0]
+    H = hh_cash.shape[0]
+    sells = (rate > 0) & (open_[:, None] > 0)  # [S, G]
+    employed = employer >= 0
+    target = base[None, :] * markup[:, None]  # [S, G]
+    cap = rate * STOCK_DAYS
+
+    for _ in range(days):
+        # producción
+        stock = np.minimum(stock + rate * open_[:, None], np.maximum(cap, stock))
+
+        # sueldos: la tienda paga (si puede), el hogar cobra menos impuesto
+        pay = np.where(employed, wage[np.maximum(employer, 0)] * open_[np.maximum(employer, 0)], 0.0)
+        payroll = np.bincount(employer[employed], weights=pay[employed], minlength=S)
+        can = np.minimum(1.0, shop_cash / np.maximum(payroll, 1e-9))
+        pay = pay * np.where(employed, can[np.maximum(employer, 0)], 0.0)
+        shop_cash -= payroll * can
+        hh_cash += pay * (1.0 - tax) + income * ~employed
+        treasury += float(pay.sum()) * tax
+
+        # demanda por presupuesto: precio promedio de cada bien entre las tiendas que lo venden
+        offer = np.where(sells, 1.0 / np.maximum(price, 1e-9), 0.0)  # atractivo [S, G]
+        offer_sum = offer.sum(axis=0)
+        share = np.divide(offer, offer_sum, out=np.zeros_like(offer), where=offer_sum > 0)
+        avg_price = (share * price).sum(axis=0)  # [G]
+        basket = float(need @ avg_price)
+        afford = np.minimum(1.0, hh_cash * spend / basket) if basket > 0 else np.zeros(H)
+        afford = np.maximum(afford, 0.0)
+        want_total = need * float(afford.sum())  # [G]
+
+        # ventas
+        demand = share * want_total[None, :]  # [S, G]
+        sales = np.minimum(demand, stock)
+        revenue_sg = sales * price
+        revenue = revenue_sg.sum(axis=1)
+        shop_cash += revenue * (1.0 - tax)
+        treasury += float(revenue.sum()) * tax
+
+        # cada hogar paga su parte (lo que pidió x lo que se llegó a vender de cada bien)
+        filled = np.divide(sales.sum(axis=0), want_total, out=np.zeros_like(want_total), where=want_total > 0)
+        paid_g = np.divide(revenue_sg.sum(axis=0), sales.sum(axis=0), out=np.zeros_like(want_total),
+                           where=sales.sum(axis=0) > 0)
+        hh_cash -= afford * float((need * filled) @ paid_g)
+
+        # precios: escasez sube, sobra baja; siempre dentro de la banda del margen
+        pressure = np.divide(demand - stock, demand + stock, out=np.zeros_like(demand), where=(demand + stock) > 0)
+        price = np.where(sells, price * (1.0 + PRICE_STEP * pressure), price)
+        price = np.clip(price, target * PRICE_FLOOR, target * PRICE_CEIL)
+
+        stock -= sales
+
+    return {"stock": stock, "price": price, "shop_cash": shop_cash, "hh_cash": hh_cash, "treasury": treasury}
+
+
+def _economy_worker(requests: "queue.Queue", results: "queue.Queue") -> None:
+    while True:
+        job = requests.get()
+        if job is None:
+            return
+        ticket, state, inputs, days = job
+        try:
+            results.put((ticket, simulate(state, inputs, days)))
+        except Exception as e:  # que un error no mate el worker en silencio
+            print(f"[ECON] ❌ Tick falló: {e}")
+            results.put((ticket, None))
+
+
+class Economy:
+    """
+    update(gs)               -> punto de sincronización (cada frame; barato)
+    price_of(shop, good)     -> precio actual
+    buy(shop, good, qty)     -> compra del jugador (costo o None)
+    """
+
+    def __init__(self, config: Dict[str, Any], household_ids: List[str], threaded: bool = True):
+        if np is None:
+            raise RuntimeError("Economy requiere numpy")
+        goods = config.get("goods") or {}
+        shops = config.get("shops") or {}
+
+        self.goods = list(goods)
+        self._good_index = {g: i for i, g in enumerate(self.goods)}
+        self.shops = list(shops)
+        self._shop_index = {s: i for i, s in enumerate(self.shops)}
+        self.shop_roles = [(shops[s] or {}).get("role") for s in self.shops]
+
+        S, G = len(self.shops), len(self.goods)
+        self.base = np.array([float((goods[g] or {}).get("base_price", 1)) for g in self.goods])
+        self.need = np.array([float((goods[g] or {}).get("need", 0)) for g in self.goods])
+        self.rate = np.zeros((S, G))
+        for s, shop_id in enumerate(self.shops):
+            for good, qty in ((shops[shop_id] or {}).get("sells") or {}).items():
+                g = self._good_index.get(good)
+                if g is None:
+                    print(f"[ECON] ⚠️ {shop_id} vende un bien desconocido: {good}")
+                    continue
+                self.rate[s, g] = float(qty)
+        self.wage = np.array([float((shops[s] or {}).get("wage", 0)) for s in self.shops])
+
+        # hogares: el elenco + aldeanos genéricos; empleados repartidos por tienda
+        villagers = int(config.get("villagers", 0))
+        self.households = list(household_ids) + [f"villager:{i}" for i in range(villagers)]
+        self._hh_index = {h: i for i, h in enumerate(self.households)}
+        H = len(self.households)
+        self.employer = np.full(H, -1, dtype=np.int64)
+        slots = [s for s, shop_id in enumerate(self.shops) for _ in range(int((shops[shop_id] or {}).get("employees", 0)))]
+        for k, s in enumerate(slots[:villagers]):
+            self.employer[len(household_ids) + k] = s
+
+        self.tax_rate = float(config.get("tax_rate", 0.1))
+        self.household_income = float(config.get("household_income", 0))
+        self.spend_fraction = float(config.get("spend_fraction", 0.5))
+
+        start = float(config.get("starting_cash", 50))
+        self.stock = self.rate * 2.0
+        self.price = np.where(self.rate > 0, self.base[None, :], 0.0) * np.ones((S, 1))
+        self.shop_cash = np.full(S, start * 10)
+        self.hh_cash = np.full(H, start)
+        self.treasury = 0.0
+
+        # inputs que se refrescan en cada punto de sync
+        self.keepers: List[Optional[str]] = [None] * S
+        self.markup = np.ones(S)
+
+        self.day: Optional[int] = None
+        self.ticks = 0
+        self.uid = next(_economy_ids)
+        self.version = 0  # sube cuando cambian los precios (tick adoptado o load)
+
+        # worker
+        self.threaded = threaded
+        self._ticket = 0
+        self._in_flight: Optional[tuple] = None  # (ticket, día destino)
+        self._journal: List[tuple] = []  # cambios del juego durante un tick en vuelo
+        self._requests: Optional[queue.Queue] = None
+        self._results: Optional[queue.Queue] = None
+        self._finalizer = None
+
+    # -------------------------------
+    # Sync
+    # -------------------------------
+    def update(self, gs, block: bool = False) -> None:
+        """Adopta un tick terminado y, si cambió el día, lanza el próximo."""
+        self._collect(block=block)
+
+        today = day_of(gs.world_time)
+        if self.day is None:
+            self.day = today
+        if self._in_flight is not None or today <= self.day:
+            return
+
+        self._refresh_inputs(gs)
+        days = today - self.day
+        state = {k: getattr(self, k) for k in _STATE}
+        if not self.threaded:
+            self._adopt(simulate(state, self._inputs(), days), today)
+            return
+
+        self._ensure_worker()
+        self._ticket += 1
+        self._in_flight = (self._ticket, today)
+        self._requests.put((self._ticket, {k: (v.copy() if hasattr(v, "copy") else v) for k, v in state.items()},
+                            self._inputs(), days))
+
+    def wait(self) -> None:
+        """Espera el tick en vuelo (save / tests)."""
+        self._collect(block=True)
+
+    def close(self) -> None:
+        if self._finalizer is not None:
+            self._finalizer()
+
+    # -------------------------------
+    # Consultas / juego
+    # -------------------------------
+    def price_of(self, shop_id: str, good: str) -> Optional[float]:
+        s, g = self._shop_index.get(shop_id), self._good_index.get(good)
+        if s is None or g is None or self.rate[s, g] <= 0:
+            return None
+        return self.price.item(s, g)
+
+    def base_price(self, good: str) -> Optional[float]:
+        g = self._good_index.get(good)
+        return None if g is None else self.base.item(g)
+
+    def stock_of(self, shop_id: str, good: str) -> float:
+        s, g = self._shop_index.get(shop_id), self._good_index.get(good)
+        return 0.0 if s is None or g is None else self.stock.item(s, g)
+
+    def shop_goods(self, shop_id: str) -> List[str]:
+        s = self._shop_index.get(shop_id)
+        return [] if s is None else [self.goods[g] for g in np.flatnonzero(self.rate[s] > 0)]
+
+    def is_open(self, shop_id: str) -> bool:
+        s = self._shop_index.get(shop_id)
+        return s is not None and (self.shop_roles[s] is None or self.keepers[s] is not None)
+
+    def buy(self, shop_id: str, good: str, qty: int = 1) -> Optional[float]:
+        """El jugador compra: baja el stock y la tienda cobra. Devuelve el costo, o None si no hay."""
+        s, g = self._shop_index.get(shop_id), self._good_index.get(good)
+        if s is None or g is None or not self.is_open(shop_id) or self.stock[s, g] < qty:
+            return None
+        cost = self.price.item(s, g) * qty
+        self._apply_trade(s, g, qty, cost)
+        if self._in_flight is not None:
+            self._journal.append((s, g, qty, cost))
+        return cost
+
+    # -------------------------------
+    # Internals
+    # -------------------------------
+    def _apply_trade(self, s: int, g: int, qty: float, cost: float) -> None:
+        self.stock[s, g] = max(0.0, self.stock[s, g] - qty)
+        self.shop_cash[s] += cost * (1.0 - self.tax_rate)
+        self.treasury += cost * self.tax_rate
+
+    def _refresh_inputs(self, gs) -> None:
+        """Encargados (rol actual en GameState) y su margen según altruism_greed."""
+        by_role: Dict[str, str] = {}
+        for npc_id, st in gs.npcs.items():
+            role = st.get("role")
+            if role and st.get("active") is not False:
+                by_role.setdefault(role, npc_id)
+        sim = gs.morality()
+        for s, role in enumerate(self.shop_roles):
+            keeper = by_role.get(role) if role else None
+            self.keepers[s] = keeper
+            greed = sim.axis_of(keeper, GREED_AXIS) if (sim is not None and keeper) else None
+            self.markup[s] = 1.0 + GREED_MARKUP * max(0.0, greed or 0.0)
+
+    def _inputs(self) -> Dict[str, Any]:
+        open_ = np.array([1.0 if (r is None or k is not None) else 0.0 for r, k in zip(self.shop_roles, self.keepers)])
+        return {
+            "rate": self.rate,
+            "base": self.base,
+            "need": self.need,
+            "open": open_,
+            "markup": self.markup.copy(),
+            "wage": self.wage,
+            "employer": self.employer,
+            "tax_rate": self.tax_rate,
+            "household_income": self.household_income,
+            "spend_fraction": self.spend_fraction,
+        }
+
+    def _collect(self, block: bool = False) -> None:
+        if self._in_flight is None or self._results is None:
+            return
+        while True:
+            try:
+                ticket, result = self._results.get(block=block)
+            except queue.Empty:
+                return
+            if ticket != self._in_flight[0]:
+                continue  # resultado viejo
+            target_day = self._in_flight[1]
+            self._in_flight = None
+            if result is not None:
+                self._adopt(result, target_day)
+            self._journal = []
+            return
+
+    def _adopt(self, result: Dict[str, Any], day: int) -> None:
+        for k in _STATE:
+            setattr(self, k, result[k])
+        # lo que pasó en el juego mientras el worker calculaba
+        for s, g, qty, cost in self._journal:
+            self._apply_trade(s, g, qty, cost)
+        self.day = day
+        self.ticks += 1
+        self.version += 1
+
+    def _ensure_worker(self) -> None:
+        if self._requests is not None:
+            return
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        worker = threading.Thread(target=_economy_worker, args=(self._requests, self._results),
+                                  name="economy", daemon=True)
+        worker.start()
+        self._finalizer = weakref.finalize(self, self._requests.put, None)
+
+    # -------------------------------
+    # Save / Load
+    # -------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "day": self.day,
+            "shops": list(self.shops),
+            "goods": list(self.goods),
+            "stock": np.round(self.stock, 3).tolist(),
+            "price": np.round(self.price, 3).tolist(),
+            "shop_cash": np.round(self.shop_cash, 2).tolist(),
+            "households": list(self.households),
+            "hh_cash": np.round(self.hh_cash, 2).tolist(),
+            "treasury": round(self.treasury, 2),
+            "tax_rate": self.tax_rate,
+        }
+
+    def load(self, data: Optional[Dict[str, Any]]) -> None:
+        """Pisa el estado con el del save (por id: tiendas/bienes/hogares que ya no existen se ignoran)."""
+        if not data:
+            return
+        gcols = [self._good_index.get(g) for g in data.get("goods", [])]
+        for shop_id, stock, price, cash in zip(data.get("shops", []), data.get("stock", []),
+                                               data.get("price", []), data.get("shop_cash", [])):
+            s = self._shop_index.get(shop_id)
+            if s is None:
+                continue
+            for g, st, pr in zip(gcols, stock, price):
+                if g is not None:
+                    self.stock[s, g] = float(st)
+                    self.price[s, g] = float(pr)
+            self.shop_cash[s] = float(cash)
+        for hh, cash in zip(data.get("households", []), data.get("hh_cash", [])):
+            i = self._hh_index.get(hh)
+            if i is not None:
+                self.hh_cash[i] = float(cash)
+        self.treasury = float(data.get("treasury", 0.0))
+        self.tax_rate = float(data.get("tax_rate", self.tax_rate))
+        if data.get("day") is not None:
+            self.day = int(data["day"])
+        self.version += 1
+
+
+def build_economy(household_ids: List[str], saved: Optional[Dict[str, Any]] = None,
+                  threaded: bool = True) -> Optional[Economy]:
+    """Economía de economy.json con esos hogares (+ lo guardado), o None sin numpy/config."""
+    if not HAS_NUMPY:
+        return None
+    config = load_config()
+    if not config.get("shops"):
+        return None
+    econ = Economy(config, household_ids, threaded=threaded)
+    econ.load(saved)
+    return econ
@@ -0,0 +1,292 @@
+# project/core/world/memory.py
+"""
+Memoria de los NPCs: registro append-only de lo que el jugador hizo y cada
+NPC vio (witnessed) o escuchó de otros (heard).
+
+Un recuerdo es (time, tag, strength, witnessed):
+  - time: minutos de juego (GameState.world_time)
+  - tag: qué pasó, ej "cruel", "assigned:advisor", "spared_prisoner"
+  - strength: peso inicial; decae con la edad (vida media HALF_LIFE_DAYS)
+  - witnessed: lo vio (True) o se lo contaron (False, entra con menos peso)
+
+Cada NPC tiene un tope de recuerdos: al pasarse se olvida el más débil ya
+decaído. Por NPC hay un índice tag -> tiempos ordenados, así preguntas como
+"¿marian vio al jugador ser cruel en los últimos 10 días?" son un bisect
+(O(log n)) aunque haya miles de recuerdos en todo el elenco.
+
+En el save cada NPC se serializa en columnas compactas; la serialización se
+cachea por NPC y sólo se rehace la de los que recordaron algo desde el save
+anterior.
+"""
+import heapq
+import math
+import sys
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from core.world.clock import MINUTES_PER_DAY
+
+MEMORY_CAPACITY = 256  # recuerdos por NPC
+HALF_LIFE_DAYS = 30.0
+HEARD_FACTOR = 0.5  # lo escuchado pesa la mitad que lo visto
+FORGET_BELOW = 0.05  # al compactar se olvida lo que decayó por debajo de esto
+
+
+class Memory(NamedTuple):
+    time: float
+    tag: str
+    strength: float
+    witnessed: bool
+
+
+def decayed(strength: float, age_minutes: float, half_life_days: float = HALF_LIFE_DAYS) -> float:
+    if age_minutes <= 0:
+        return strength
+    return strength * 0.5 ** (age_minutes / (half_life_days * MINUTES_PER_DAY))
+
+
+def _retention(rec: Memory) -> float:
+    # log2 de la fuerza decaída + edad en vidas medias: el decaimiento es igual
+    # para todos, así el orden "más débil ahora" no depende de now
+    if rec.strength <= 0:
+        return -math.inf
+    return math.log2(rec.strength) + rec.time / (HALF_LIFE_DAYS * MINUTES_PER_DAY)
+
+
+class NPCMemory:
+    """
+    Recuerdos de un NPC ordenados por tiempo, más dos índices por tag con los
+    tiempos ordenados (todos / sólo vistos): las consultas por tag y ventana
+    de tiempo son dos bisect sobre esa lista.
+    """
+
+    def __init__(self, capacity: int = MEMORY_CAPACITY):
+        self.capacity = max(1, int(capacity))
+        self._records: List[Memory] = []  # ordenados por time
+        self._times: List[float] = []  # espejo de _records[i].time (para bisect)
+        self._by_tag: Dict[str, List[float]] = {}
+        self._witnessed: Dict[str, List[float]] = {}
+        self._weakest: list = []  # heap (retención, time, seq, rec): el próximo a olvidar
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    # -------------------------------
+    # Escritura
+    # -------------------------------
+    def remember(self, tag: str, time: float, strength: float = 1.0, witnessed: bool = True) -> None:
+        tag = sys.intern(str(tag))
+        rec = Memory(float(time), tag, float(strength), bool(witnessed))
+
+        i = bisect_right(self._times, rec.time)
+        self._records.insert(i, rec)
+        self._times.insert(i, rec.time)
+        insort(self._by_tag.setdefault(tag, []), rec.time)
+        if rec.witnessed:
+            insort(self._witnessed.setdefault(tag, []), rec.time)
+        self._push_weakest(rec)
+
+        if len(self._records) > self.capacity:
+            self._forget_weakest()
+
+    def compact(self, now: float) -> int:
+        """Olvida lo que decayó por debajo de FORGET_BELOW. Devuelve cuántos se olvidaron."""
+        keep = [r for r in self._records if decayed(r.strength, now - r.time) >= FORGET_BELOW]
+        dropped = len(self._records) - len(keep)
+        if dropped:
+            self._rebuild(keep)
+        return dropped
+
+    # -------------------------------
+    # Consultas
+    # -------------------------------
+    def count(self, tag: str, since: float | None = None, until: float | None = None,
+              witnessed_only: bool = False) -> int:
+        times = (self._witnessed if witnessed_only else self._by_tag).get(tag)
+        if not times:
+            return 0
+        lo = 0 if since is None else bisect_left(times, since)
+        hi = len(times) if until is None else bisect_right(times, until)
+        return max(0, hi - lo)
+
+    def has(self, tag: str, since: float | None = None, until: float | None = None,
+            witnessed_only: bool = False) -> bool:
+        return self.count(tag, since, until, witnessed_only) > 0
+
+    def last_time(self, tag: str) -> float | None:
+        times = self._by_tag.get(tag)
+        return times[-1] if times else None
+
+    def weight(self, tag: str, now: float, since: float | None = None) -> float:
+        """Suma de fuerzas decaídas de los recuerdos con ese tag (desde since)."""
+        total = 0.0
+        lo = 0 if since is None else bisect_left(self._times, since)
+        for r in self._records[lo:]:
+            if r.tag == tag:
+                total += decayed(r.strength, now - r.time)
+        return total
+
+    def recall(self, since: float | None = None, until: float | None = None) -> List[Memory]:
+        lo = 0 if since is None else bisect_left(self._times, since)
+        hi = len(self._times) if until is None else bisect_right(self._times, until)
+        return self._records[lo:hi]
+
+    def tags(self) -> List[str]:
+        return list(self._by_tag)
+
+    # -------------------------------
+    # Internals
+    # -------------------------------
+    def _push_weakest(self, rec: Memory) -> None:
+        self._seq += 1
+        heapq.heappush(self._weakest, (_retention(rec), rec.time, self._seq, rec))
+
+    def _forget_weakest(self) -> None:
+        rec = heapq.heappop(self._weakest)[3]
+        i = bisect_left(self._times, rec.time)
+        while self._records[i] is not rec:
+            i += 1
+        del self._records[i]
+        del self._times[i]
+        self._unindex(self._by_tag, rec)
+        if rec.witnessed:
+            self._unindex(self._witnessed, rec)
+
+    @staticmethod
+    def _unindex(index: Dict[str, List[float]], rec: Memory) -> None:
+        times = index[rec.tag]
+        times.pop(bisect_left(times, rec.time))
+        if not times:
+            del index[rec.tag]
+
+    def _rebuild(self, records: List[Memory]) -> None:
+        self._records = list(records)
+        self._times = [r.time for r in self._records]
+        self._by_tag = {}
+        self._witnessed = {}
+        self._weakest = []
+        for r in self._records:
+            self._push_weakest(r)
+            self._by_tag.setdefault(r.tag, []).append(r.time)
+            if r.witnessed:
+                self._witnessed.setdefault(r.tag, []).append(r.time)
+
+    # -------------------------------
+    # Save / Load (columnas compactas)
+    # -------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        tag_ids: Dict[str, int] = {}
+        for r in self._records:
+            tag_ids.setdefault(r.tag, len(tag_ids))
+        return {
+            "tags": list(tag_ids),
+            "time": [round(r.time, 2) for r in self._records],
+            "tag": [tag_ids[r.tag] for r in self._records],
+            "strength": [round(r.strength, 3) for r in self._records],
+            "heard": [i for i, r in enumerate(self._records) if not r.witnessed],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], capacity: int = MEMORY_CAPACITY) -> "NPCMemory":
+        mem = cls(capacity=capacity)
+        tags = [sys.intern(str(t)) for t in data.get("tags", [])]
+        heard = set(data.get("heard", []))
+        records = [
+            Memory(float(t), tags[g], float(s), i not in heard)
+            for i, (t, g, s) in enumerate(zip(data.get("time", []), data.get("tag", []), data.get("strength", [])))
+        ]
+        records.sort(key=lambda r: r.time)
+        mem._rebuild(records[-mem.capacity:])
+        return mem
+
+
+class MemoryStore:
+    """
+    Memorias de todo el elenco: npc_id -> NPCMemory.
+
+    witness(npcs, tag, time)  -> lo vieron
+    hear(npcs, tag, time)     -> se lo contaron (fuerza * HEARD_FACTOR)
+    has(npc, tag, now, within_days=10) -> ¿lo recuerda en la ventana?
+    """
+
+    def __init__(self, capacity: int = MEMORY_CAPACITY):
+        self.capacity = capacity
+        self._npcs: Dict[str, NPCMemory] = {}
+
+        # save incremental: payload cacheado por NPC + los que cambiaron desde el último to_dict
+        self._saved: Dict[str, Dict[str, Any]] = {}
+        self._dirty: set[str] = set()
+
+    def __contains__(self, npc_id: str) -> bool:
+        return npc_id in self._npcs
+
+    def of(self, npc_id: str) -> NPCMemory:
+        mem = self._npcs.get(npc_id)
+        if mem is None:
+            mem = NPCMemory(self.capacity)
+            self._npcs[npc_id] = mem
+        return mem
+
+    # -------------------------------
+    # Escritura
+    # -------------------------------
+    def remember(self, npc_id: str, tag: str, time: float, strength: float = 1.0, witnessed: bool = True) -> None:
+        self.of(npc_id).remember(tag, time, strength, witnessed)
+        self._dirty.add(npc_id)
+
+    def witness(self, npc_ids: Iterable[str], tag: str, time: float, strength: float = 1.0) -> None:
+        for npc_id in npc_ids:
+            self.remember(npc_id, tag, time, strength, witnessed=True)
+
+    def hear(self, npc_ids: Iterable[str], tag: str, time: float, strength: float = 1.0) -> None:
+        for npc_id in npc_ids:
+            self.remember(npc_id, tag, time, strength * HEARD_FACTOR, witnessed=False)
+
+    def compact(self, now: float) -> int:
+        dropped = 0
+        for npc_id, mem in self._npcs.items():
+            n = mem.compact(now)
+            if n:
+                dropped += n
+                self._dirty.add(npc_id)
+        return dropped
+
+    # -------------------------------
+    # Consultas
+    # -------------------------------
+    def has(self, npc_id: str, tag: str, now: float | None = None, within_days: float | None = None,
+            witnessed_only: bool = False) -> bool:
+        mem = self._npcs.get(npc_id)
+        if mem is None:
+            return False
+        since = None
+        if now is not None and within_days is not None:
+            since = now - within_days * MINUTES_PER_DAY
+        return mem.has(tag, since=since, until=now, witnessed_only=witnessed_only)
+
+    def weight(self, npc_id: str, tag: str, now: float) -> float:
+        mem = self._npcs.get(npc_id)
+        return mem.weight(tag, now) if mem is not None else 0.0
+
+    # -------------------------------
+    # Save / Load
+    # -------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        for npc_id in self._dirty:
+            mem = self._npcs.get(npc_id)
+            if mem is not None:
+                self._saved[npc_id] = mem.to_dict()
+        self._dirty.clear()
+        return {npc_id: payload for npc_id, payload in self._saved.items() if payload["time"]}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]], capacity: int = MEMORY_CAPACITY) -> "MemoryStore":
+        store = cls(capacity=capacity)
+        for npc_id, payload in (data or {}).items():
+            try:
+                store._npcs[str(npc_id)] = NPCMemory.from_dict(payload, capacity)
+                store._saved[str(npc_id)] = payload
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                print(f"[MEMORY] ⚠️ Memoria ilegible de {npc_id}, se descarta: {e}")
+        return store
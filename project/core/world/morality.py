@@ -0,0 +1,352 @@
+# project/core/world/morality.py
+"""
+Simulación de moralidad y confianza de toda la población (requiere numpy).
+
+Estado en arrays, una fila por NPC:
+  - axes[n, a]:  posición en cada eje de morality_axes.json, en [-1, 1]
+                 (-1 = lado izquierdo, ej "compassion"; +1 = derecho, ej "cruelty")
+  - trust[n]:    confianza en el jugador, en [trust_min[n], trust_max[n]]
+  - sens[n, k]:  sensibilidad a cada tag de decisión (trust_state.sensitivity)
+
+Una decisión del jugador es un impulso disperso sobre los ejes
+({"compassion_cruelty": 1.0} = un acto cruel) más tags ("public_humiliation").
+Por NPC:
+  - aprobación = posición · impulso (coincide con su inclinación -> sube la confianza)
+  - penalidad = suma de sus sensibilidades a los tags de la decisión
+  - deriva: sus ejes se corren un poco hacia lo que el jugador hace
+todo escalado por la exposición (lo vio / lo escuchó / no se enteró).
+
+Las decisiones se encolan y se aplican juntas (una multiplicación de matrices
+para todo el lote, sin loops por NPC); una vez por día de juego la confianza
+vuelve un poco hacia su valor inicial.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from core.assets import asset_exists, asset_path, is_asset_dir, list_assets, load_json_asset
+from core.world.clock import day_of
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin él las decisiones no mueven nada
+    np = None
+
+HAS_NUMPY = np is not None
+
+AXES_PATH = asset_path("data", "morality_axes.json")
+
+INITIAL_LEAN = 0.5  # posición inicial de un eje listado en hidden_profile.moral_axes
+TRUST_GAIN = 8.0  # puntos de confianza por aprobación completa (posición ±1 · impulso 1)
+TAG_PENALTY = 6.0  # puntos de confianza por unidad de sensibilidad
+AXIS_DRIFT = 0.02  # cuánto se corren los ejes hacia el acto, por decisión
+DAILY_RELAX = 0.05  # fracción de la distancia a la confianza inicial que se recupera por día
+HEARD_EXPOSURE = 0.5
+
+SENSITIVITY_LEVELS = {
+    "none": 0.0,
+    "very_low": 0.25,
+    "low": 0.5,
+    "medium": 1.0,
+    "high": 1.5,
+    "very_high": 2.0,
+}
+
+
+def load_axes() -> List[Dict[str, Any]]:
+    """Ejes en orden: [{id, left, right}] (left/right: ids de cada extremo)."""
+    try:
+        data = load_json_asset(AXES_PATH) or {}
+    except (OSError, ValueError) as e:
+        print(f"[MORAL] ⚠️ No se pudo leer morality_axes.json: {e}")
+        return []
+    return [
+        {"id": axis_id, "left": (a.get("left") or {}).get("id"), "right": (a.get("right") or {}).get("id")}
+        for axis_id, a in (data.get("axes") or {}).items()
+    ]
+
+
+def load_profiles() -> Dict[str, Dict[str, Any]]:
+    """
+    Perfil de cada NPC (assets/sprites/npcs/<id>/<id>.json): moral_axes y
+    trust_state para la moralidad; role_reactions y betrayal para el motor de
+    consecuencias (engines/world_engine/consequences.py).
+    """
+    out = {}
+    npcs_dir = asset_path("sprites", "npcs")
+    if not is_asset_dir(npcs_dir):
+        return out
+    for npc_id in sorted(list_assets(npcs_dir)):
+        path = asset_path("sprites", "npcs", npc_id, f"{npc_id}.json")
+        if not asset_exists(path):
+            continue
+        try:
+            data = load_json_asset(path) or {}
+        except (OSError, ValueError):
+            continue
+        out[npc_id] = {
+            "moral_axes": (data.get("hidden_profile") or {}).get("moral_axes") or {},
+            "trust_state": data.get("trust_state") or {},
+            "role_reactions": data.get("role_reactions"),
+            "betrayal": data.get("betrayal"),
+        }
+    return out
+
+
+class MoralitySim:
+    """
+    Población de NPCs en arrays (ver docstring del módulo).
+
+    add(npc_id, profile)           -> agrega una fila (cast del juego o aldeanos generados)
+    queue(axes, tags, witnesses)   -> encola una decisión del jugador
+    tick(now)                      -> aplica el lote pendiente y el relax diario
+    trust_of(npc_id)               -> confianza actual
+    """
+
+    def __init__(self, axes: List[Dict[str, Any]], capacity: int = 16):
+        if np is None:
+            raise RuntimeError("MoralitySim requiere numpy")
+        self.axis_ids = [a["id"] for a in axes]
+        self._axis_index = {a: i for i, a in enumerate(self.axis_ids)}
+        # lado -> (eje, signo): "cruelty" -> (compassion_cruelty, +1)
+        self._sides = {}
+        for i, a in enumerate(axes):
+            if a.get("left"):
+                self._sides[a["left"]] = (i, -1.0)
+            if a.get("right"):
+                self._sides[a["right"]] = (i, 1.0)
+
+        self.ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._tags: Dict[str, int] = {}
+
+        cap = max(1, int(capacity))
+        n_axes = len(self.axis_ids)
+        self.axes = np.zeros((cap, n_axes))
+        self.trust = np.zeros(cap)
+        self.trust_base = np.zeros(cap)
+        self.trust_min = np.zeros(cap)
+        self.trust_max = np.full(cap, 100.0)
+        self.sens = np.zeros((cap, 0))
+
+        self._pending: List[tuple] = []  # (impulso [A], tags [idx], exposición [N] | None)
+        self._day: Optional[int] = None
+        self._changed: set = set()  # ids con confianza distinta desde el último pop_changed
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, npc_id: str) -> bool:
+        return npc_id in self._index
+
+    # -------------------------------
+    # Población
+    # -------------------------------
+    def add(self, npc_id: str, profile: Dict[str, Any]) -> int:
+        if npc_id in self._index:
+            return self._index[npc_id]
+        n = len(self.ids)
+        if n == self.axes.shape[0]:
+            self._grow(n * 2)
+
+        self.ids.append(npc_id)
+        self._index[npc_id] = n
+
+        self.axes[n] = 0.0
+        for _axis, side in (profile.get("moral_axes") or {}).items():
+            hit = self._sides.get(side)
+            if hit is not None:
+                self.axes[n, hit[0]] = hit[1] * INITIAL_LEAN
+
+        ts = profile.get("trust_state") or {}
+        self.trust_min[n] = float(ts.get("min", 0))
+        self.trust_max[n] = float(ts.get("max", 100))
+        self.trust_base[n] = float(ts.get("initial_feeling", 50))
+        self.trust[n] = self.trust_base[n]
+
+        self.sens[n] = 0.0
+        for tag, level in (ts.get("sensitivity") or {}).items():
+            k = self._tag(tag)  # puede agregar una columna: antes de indexar sens
+            self.sens[n, k] = SENSITIVITY_LEVELS.get(str(level), 1.0)
+        return n
+
+    def _tag(self, tag: str) -> int:
+        k = self._tags.get(tag)
+        if k is None:
+            k = len(self._tags)
+            self._tags[tag] = k
+            self.sens = np.hstack([self.sens, np.zeros((self.sens.shape[0], 1))])
+        return k
+
+    def _grow(self, capacity: int) -> None:
+        def grow(a, fill=0.0):
+            shape = (capacity,) + a.shape[1:]
+            out = np.full(shape, fill)
+            out[: a.shape[0]] = a
+            return out
+
+        self.axes = grow(self.axes)
+        self.trust = grow(self.trust)
+        self.trust_base = grow(self.trust_base)
+        self.trust_min = grow(self.trust_min)
+        self.trust_max = grow(self.trust_max, 100.0)
+        self.sens = grow(self.sens)
+
+    # -------------------------------
+    # Decisiones
+    # -------------------------------
+    def queue(self, axes: Dict[str, float], tags: Iterable[str] = (), magnitude: float = 1.0,
+              witnesses: Optional[Iterable[str]] = None, heard_by: Optional[Iterable[str]] = None) -> None:
+        """
+        witnesses=None: toda la población con exposición 1.
+        Con witnesses: ellos 1.0, heard_by HEARD_EXPOSURE, el resto 0.
+        """
+        impulse = np.zeros(len(self.axis_ids))
+        for axis, v in (axes or {}).items():
+            i = self._axis_index.get(axis)
+            if i is None:
+                print(f"[MORAL] ⚠️ Eje desconocido '{axis}'")
+                continue
+            impulse[i] = float(v) * magnitude
+        tag_idx = [self._tag(str(t)) for t in tags or ()]
+
+        exposure = None
+        if witnesses is not None:
+            exposure = {}
+            for npc_id in heard_by or ():
+                exposure[npc_id] = HEARD_EXPOSURE
+            for npc_id in witnesses:
+                exposure[npc_id] = 1.0
+        self._pending.append((impulse, tag_idx, float(magnitude), exposure))
+
+    def flush(self) -> None:
+        """Aplica todas las decisiones pendientes en una sola pasada vectorizada."""
+        if not self._pending:
+            return
+        n = len(self.ids)
+        k = len(self._pending)
+        pending, self._pending = self._pending, []
+        if n == 0:
+            return
+
+        # lote: impulsos [K, A], tags [K, T], exposición [N, K]
+        impulses = np.stack([p[0] for p in pending])
+        tag_hits = np.zeros((k, self.sens.shape[1]))
+        exposure = np.ones((n, k))
+        for j, (_imp, tag_idx, magnitude, exp) in enumerate(pending):
+            if tag_idx:
+                np.add.at(tag_hits[j], tag_idx, magnitude)
+            if exp is not None:
+                col = np.zeros(n)
+                for npc_id, e in exp.items():
+                    i = self._index.get(npc_id)
+                    if i is not None:
+                        col[i] = e
+                exposure[:, j] = col
+
+        axes = self.axes[:n]
+        approval = axes @ impulses.T  # [N, K]
+        penalty = self.sens[:n] @ tag_hits.T  # [N, K]
+        delta = ((TRUST_GAIN * approval - TAG_PENALTY * penalty) * exposure).sum(axis=1)
+        before = self.trust[:n].copy()
+        self.trust[:n] = np.clip(self.trust[:n] + delta, self.trust_min[:n], self.trust_max[:n])
+        self._mark_changed(before)
+
+        drift = exposure @ impulses  # [N, A]
+        self.axes[:n] = np.clip(axes + AXIS_DRIFT * drift, -1.0, 1.0)
+
+    def tick(self, now: float) -> None:
+        """Aplica lo pendiente y, por cada día de juego que pasó, el relax de la confianza."""
+        self.flush()
+        day = day_of(now)
+        if self._day is None:
+            self._day = day
+            return
+        days = day - self._day
+        if days <= 0:
+            return
+        self._day = day
+        n = len(self.ids)
+        keep = (1.0 - DAILY_RELAX) ** days
+        base = self.trust_base[:n]
+        before = self.trust[:n].copy()
+        self.trust[:n] = base + (self.trust[:n] - base) * keep
+        self._mark_changed(before)
+
+    def _mark_changed(self, before) -> None:
+        n = len(self.ids)
+        for i in np.flatnonzero(self.trust[:n] != before):
+            self._changed.add(self.ids[i])
+
+    def pop_changed(self) -> List[str]:
+        """Ids cuya confianza cambió desde la última llamada."""
+        out = list(self._changed)
+        self._changed.clear()
+        return out
+
+    # -------------------------------
+    # Consultas
+    # -------------------------------
+    def trust_of(self, npc_id: str) -> Optional[float]:
+        i = self._index.get(npc_id)
+        return None if i is None else self.trust.item(i)
+
+    def axis_of(self, npc_id: str, axis: str) -> Optional[float]:
+        i = self._index.get(npc_id)
+        a = self._axis_index.get(axis)
+        return None if i is None or a is None else self.axes.item(i, a)
+
+    def leaning(self, npc_id: str, axis: str, threshold: float = 0.25) -> Optional[str]:
+        """Lado del eje hacia el que se inclina (id del extremo), o None si está en el medio."""
+        v = self.axis_of(npc_id, axis)
+        if v is None or abs(v) < threshold:
+            return None
+        for side, (i, sign) in self._sides.items():
+            if i == self._axis_index[axis] and sign == (1.0 if v > 0 else -1.0):
+                return side
+        return None
+
+    def below(self, threshold: float) -> List[str]:
+        """Ids con confianza por debajo de threshold (una comparación vectorial)."""
+        n = len(self.ids)
+        return [self.ids[i] for i in np.flatnonzero(self.trust[:n] < threshold)]
+
+    # -------------------------------
+    # Save / Load
+    # -------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        self.flush()
+        n = len(self.ids)
+        return {
+            "ids": list(self.ids),
+            "axis_ids": list(self.axis_ids),
+            "axes": np.round(self.axes[:n], 4).tolist(),
+            "trust": np.round(self.trust[:n], 3).tolist(),
+            "day": self._day,
+        }
+
+    def load(self, data: Optional[Dict[str, Any]]) -> None:
+        """Pisa posiciones/confianza con las del save (las filas tienen que existir ya)."""
+        if not data:
+            return
+        cols = [self._axis_index.get(a) for a in data.get("axis_ids", [])]
+        for npc_id, row, t in zip(data.get("ids", []), data.get("axes", []), data.get("trust", [])):
+            i = self._index.get(npc_id)
+            if i is None:
+                continue
+            for c, v in zip(cols, row):
+                if c is not None:
+                    self.axes[i, c] = float(v)
+            self.trust[i] = float(t)
+            self._changed.add(npc_id)
+        if data.get("day") is not None:
+            self._day = int(data["day"])
+
+
+def build_population(saved: Optional[Dict[str, Any]] = None) -> Optional[MoralitySim]:
+    """Sim con el elenco de assets/sprites/npcs (+ lo guardado), o None sin numpy."""
+    if not HAS_NUMPY:
+        return None
+    sim = MoralitySim(load_axes())
+    for npc_id, profile in load_profiles().items():
+        sim.add(npc_id, profile)
+    sim.load(saved)
+    return sim
@@ -0,0 +1,156 @@
+# project/core/world/role_assignment.py
+"""
+Asignación óptima de roles: NPCs × cupos por rol (constraints del step
+assign_roles) maximizando la afinidad total (roles.role_bias del JSON de cada NPC).
+
+Es un problema de transporte (flujo de costo mínimo): los cupos de un mismo
+rol son intercambiables, así que en vez de una matriz NPCs × cupos (Húngaro,
+O(n³)) el grafo residual se condensa a los R roles:
+
+  - mover al NPC j de su rol r al rol s cuesta C[j][s] - C[j][r]
+    (por cada par (r, s) un heap con el j más barato; entradas viejas se
+    descartan al mirarlas)
+  - entrar un NPC libre al rol r cuesta C[i][r] (un heap por rol)
+
+Cada paso busca el camino más barato "NPC libre -> rol -> ... -> rol con
+cupo" con Bellman-Ford sobre R nodos y lo aplica (camino aumentante de a un
+NPC). Así se llenan todos los cupos posibles y, entre esas, la asignación es
+la de mayor afinidad. Costo: O(n · R² log n); cientos de NPCs en milisegundos.
+"""
+import heapq
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from core.assets import asset_exists, asset_path, load_json_asset
+
+DEFAULT_BIAS = 0.5  # afinidad de un NPC sin perfil (aldeanos genéricos)
+
+# roles de evento que los perfiles no listan: se puntúan como su rol de perfil
+ROLE_ALIASES = {
+    "weapon_shop": "merchant",
+    "inn": "merchant",
+}
+
+_INF = float("inf")
+_EPS = 1e-9
+
+
+@lru_cache(maxsize=None)
+def load_role_profile(npc_id: str) -> tuple:
+    """(eligible, role_bias) de assets/sprites/npcs/<id>/<id>.json; ((), {}) sin perfil."""
+    path = asset_path("sprites", "npcs", npc_id, f"{npc_id}.json")
+    if not asset_exists(path):
+        return (), {}
+    try:
+        roles = (load_json_asset(path) or {}).get("roles") or {}
+    except (OSError, ValueError):
+        return (), {}
+    return tuple(roles.get("eligible") or ()), dict(roles.get("role_bias") or {})
+
+
+def role_score(npc_id: str, role: str) -> Optional[float]:
+    """Afinidad del NPC con el rol; None si no es elegible."""
+    eligible, bias = load_role_profile(npc_id)
+    alias = ROLE_ALIASES.get(role, role)
+    if eligible and role not in eligible and alias not in eligible:
+        return None
+    if role in bias:
+        return float(bias[role])
+    return float(bias.get(alias, DEFAULT_BIAS))
+
+
+def solve_roles(npc_ids: Iterable[str], capacity: Dict[str, int],
+                scores: Optional[Dict[str, Dict[str, Optional[float]]]] = None) -> Dict[str, str]:
+    """
+    npc_id -> rol para la mayor cantidad posible de NPCs (sin pasarse de
+    capacity[rol]) con afinidad total máxima. Los que no entran quedan afuera.
+
+    scores[npc][rol]: afinidad (None = no elegible); por default role_score().
+    """
+    npcs = list(dict.fromkeys(str(n) for n in npc_ids))
+    roles = [r for r, c in capacity.items() if int(c) > 0]
+    if not npcs or not roles:
+        return {}
+
+    R = len(roles)
+    free = [int(capacity[r]) for r in roles]
+
+    # costo = -afinidad (None -> no hay arco)
+    cost: List[List[float]] = []
+    for npc_id in npcs:
+        row = (scores or {}).get(npc_id)
+        out = []
+        for role in roles:
+            s = row.get(role) if row is not None else role_score(npc_id, role)
+            out.append(_INF if s is None else -float(s))
+        cost.append(out)
+
+    where = [-1] * len(npcs)  # rol actual de cada NPC (-1 = libre)
+
+    # NPCs libres por rol destino: (costo, i)
+    enter = [[(cost[i][r], i) for i in range(len(npcs)) if cost[i][r] < _INF] for r in range(R)]
+    for h in enter:
+        heapq.heapify(h)
+
+    # movimientos r -> s: (C[j][s] - C[j][r], j) para j en r
+    move = [[[] for _ in range(R)] for _ in range(R)]
+
+    def _place(j: int, r: int) -> None:
+        where[j] = r
+        row = cost[j]
+        for s in range(R):
+            if s != r and row[s] < _INF:
+                heapq.heappush(move[r][s], (row[s] - row[r], j))
+
+    def _top_enter(r: int) -> float:
+        h = enter[r]
+        while h and where[h[0][1]] != -1:
+            heapq.heappop(h)
+        return h[0][0] if h else _INF
+
+    def _top_move(r: int, s: int) -> float:
+        h = move[r][s]
+        while h and where[h[0][1]] != r:
+            heapq.heappop(h)
+        return h[0][0] if h else _INF
+
+    while True:
+        # dist[r]: costo mínimo de liberar un lugar en r (0 si r tiene cupo)
+        dist = [0.0 if free[r] > 0 else _INF for r in range(R)]
+        nxt = [-1] * R
+        if all(d == _INF for d in dist):
+            break
+        w = [[_top_move(r, s) if r != s else _INF for s in range(R)] for r in range(R)]
+        for _ in range(R):
+            changed = False
+            for r in range(R):
+                for s in range(R):
+                    d = w[r][s] + dist[s]
+                    if d < dist[r] - _EPS:
+                        dist[r], nxt[r] = d, s
+                        changed = True
+            if not changed:
+                break
+
+        best, start = _INF, -1
+        for r in range(R):
+            total = _top_enter(r) + dist[r]
+            if total < best - _EPS:
+                best, start = total, r
+        if start < 0:
+            break
+
+        # aplicar el camino: entra el NPC libre en start, cada rol del camino pasa uno al siguiente
+        incoming = enter[start][0][1]
+        r = start
+        for _ in range(R):
+            s = nxt[r]
+            if s < 0:
+                break
+            mover = move[r][s][0][1]
+            _place(incoming, r)
+            incoming, r = mover, s
+        _place(incoming, r)
+        free[r] -= 1
+
+    return {npcs[i]: roles[r] for i, r in enumerate(where) if r >= 0}
@@ -1,6 +1,7 @@
 import pygame
-from core.assets import asset_path
+from core.assets import asset_path, open_asset
 from core.config import TILE_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT
+from ui.fonts import get_font
 
 
 class BattleState:
@@ -17,7 +18,7 @@ class BattleState:
         self.cursor_x = 0
         self.cursor_y = 0
 
-        self.font = pygame.font.SysFont(None, 32)
+        self.font = get_font(32)
 
         # ------------------------
         # Protagonista (sprite batalla)
@@ -26,9 +27,8 @@ class BattleState:
         self.hero_tile_y = 3
         self.hero_facing = (0, 1)  # abajo (placeholder)
 
-        self._battle_sheet = pygame.image.load(
-            asset_path("sprites", "protagonist", "battle.png")
-        ).convert_alpha()
+        battle_path = asset_path("sprites", "protagonist", "battle.png")
+        self._battle_sheet = pygame.image.load(open_asset(battle_path), battle_path).convert_alpha()
 
         # RPG Maker SV Actor:
         # 9 columnas x 6 filas  -> sheet 576x384 (frames de 64x64)
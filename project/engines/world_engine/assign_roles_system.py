@@ -1,4 +1,6 @@
 # project/engines/world_engine/assign_roles_system.py
+from core.world.role_assignment import solve_roles
+
 
 class AssignRolesSystem:
     """
@@ -7,9 +9,14 @@ class AssignRolesSystem:
     WorldState delega:
       - start(step)
       - assign(role)
+      - auto_complete()  -> resuelve los NPCs pendientes de una (core/world/role_assignment.py)
       - is_active
       - (internamente abre/cierra dialogue)
       - notifica al runner cuando termina: ws.event_runner.on_assign_roles_done(assignments)
+
+    step "auto": true -> sin menú: se asigna todo con el solver al empezar
+    (pueblos grandes). Con varios NPCs pendientes el menú ofrece completar
+    automáticamente; siempre muestra el rol sugerido del NPC actual.
     """
 
     def __init__(self, world_state):
@@ -51,6 +58,10 @@ class AssignRolesSystem:
         self.idx = 0
         self.assignments_local = {}
 
+        if step.get("auto"):
+            self.auto_complete()
+            return
+
         self._show_prompt()
 
     def assign(self, role: str) -> None:
@@ -77,6 +88,11 @@ class AssignRolesSystem:
             flag_name = set_flag_map.get(str(role))
             if flag_name:
                 self.ws.game.game_state.set_flag(str(flag_name), True)
+
+            # el NPC recuerda qué lugar le dio el jugador (los demás de la fila lo vieron)
+            self.ws.game.game_state.remember(str(npc_id), f"assigned:{role}")
+            others = [str(n) for n in self.npcs if n != npc_id]
+            self.ws.game.game_state.remember(others, f"saw_assigned:{role}")
         except Exception:
             pass
 
@@ -98,6 +114,43 @@ class AssignRolesSystem:
         self.idx += 1
         self._show_prompt()
 
+    def suggest(self) -> dict:
+        """Asignación óptima de los NPCs pendientes con los cupos que quedan (npc_id -> rol)."""
+        return solve_roles(self.npcs[self.idx:], self.remaining)
+
+    def auto_complete(self) -> None:
+        """Asigna todos los pendientes según suggest(), en lote; los que no entran quedan sin rol."""
+        if not self.active:
+            return
+
+        pending = [str(n) for n in self.npcs[self.idx:]]
+        batch = self.suggest()
+
+        gs = self.ws.game.game_state
+        set_flag_map = self.step.get("set_flag", {}) or {}
+        by_role = {}
+        for npc_id, role in batch.items():
+            self.assignments_local[npc_id] = role
+            self.ws._event_assignments[npc_id] = role
+            gs.set_npc(npc_id, role=role)
+            by_role.setdefault(role, []).append(npc_id)
+            self.remaining[role] = max(0, self.remaining.get(role, 0) - 1)
+
+        # flags y recuerdos una vez por rol (no por NPC: con cientos serían n² recuerdos)
+        for role, npc_ids in by_role.items():
+            flag_name = set_flag_map.get(role)
+            if flag_name:
+                gs.set_flag(str(flag_name), True)
+            gs.remember(npc_ids, f"assigned:{role}")
+            assigned = set(npc_ids)
+            gs.remember([n for n in pending if n not in assigned], f"saw_assigned:{role}")
+
+        self.ws._apply_role_outcomes_batch(batch)
+
+        print(f"[ROLES] Auto: {len(batch)}/{len(pending)} asignados")
+        self.idx = len(self.npcs)
+        self._show_prompt()
+
 
     # -------------------------
     # Internals
@@ -124,10 +177,15 @@ class AssignRolesSystem:
             f"Asigná un rol para: {npc_id}",
             f"Pendientes -> {remaining_txt}"
         ]
+        suggested = self.suggest().get(npc_id)
+        if suggested:
+            prompt_lines.append(f"Sugerido: {suggested}")
 
         options = [{"text": r, "action": f"assign_role:{r}"} for r in self.roles if self.remaining.get(r, 0) > 0]
         if not options:
             options = [{"text": r, "action": f"assign_role:{r}"} for r in self.roles]
+        if len(self.npcs) - self.idx > 1:
+            options.append({"text": "Completar automáticamente", "action": "assign_roles_auto"})
 
         self.ws.open_dialogue(
             "Asignación de roles",
@@ -1,8 +1,10 @@
 
 class CollisionSystem:
-    def __init__(self, map_data, get_npc_units=None):
+    def __init__(self, map_data, get_npc_units=None, on_bump=None, get_units_at=None):
         self.map = map_data
         self.get_npc_units = get_npc_units  # callable returning dict npc_id -> Unit
+        self.get_units_at = get_units_at  # callable(tx, ty) -> ids en ese tile (lookup rápido, opcional)
+        self.on_bump = on_bump  # callable(npc_id): alguien intentó pisar el tile de esa Unit
 
     def can_move_to(self, tile_x, tile_y, ignore_unit_ids=None):
         """
@@ -15,23 +17,40 @@ class CollisionSystem:
         """
         ignore = set(ignore_unit_ids or [])
 
-        # Bloqueo por mapa
-        if self.map.is_blocked(tile_x, tile_y):
+        if self.is_static_blocked(tile_x, tile_y):
             return False
 
-        # Bloqueo por NPCs del mapa (legacy)
-        for n in getattr(self.map, "npcs", []):
-            if n.get("tile_x") == tile_x and n.get("tile_y") == tile_y:
+        # Bloqueo por Units activos (evento/runtime)
+        if self.get_units_at is not None:
+            for uid in self.get_units_at(tile_x, tile_y):
+                if uid in ignore:
+                    continue
+                if self.on_bump is not None:
+                    self.on_bump(uid)
                 return False
+            return True
 
-        # Bloqueo por Units activos (evento/runtime)
         npc_units = self.get_npc_units() if self.get_npc_units else None
         if npc_units:
             for uid, u in npc_units.items():
                 if uid in ignore:
                     continue
                 if u.tile_x == tile_x and u.tile_y == tile_y:
+                    if self.on_bump is not None:
+                        self.on_bump(uid)
                     return False
 
         return True
 
+    def is_static_blocked(self, tile_x, tile_y):
+        """Bloqueo que no depende de Units runtime: mapa + NPCs del mapa (legacy)."""
+        # Bloqueo por mapa
+        if self.map.is_blocked(tile_x, tile_y):
+            return True
+
+        # Bloqueo por NPCs del mapa (legacy)
+        for n in getattr(self.map, "npcs", []):
+            if n.get("tile_x") == tile_x and n.get("tile_y") == tile_y:
+                return True
+
+        return False
@@ -0,0 +1,301 @@
+# project/engines/world_engine/consequences.py
+"""
+Motor de consecuencias: efectos ocultos de roles y traiciones.
+
+Las reglas se compilan de los perfiles de NPC (assets/sprites/npcs/<id>/<id>.json)
+y de assets/data/consequences.json:
+
+  - role_reactions.<rol>.hidden_effects: mientras el NPC tenga ese rol, sus
+    efectos están activos (GameState.npcs[id].hidden_effects + flag
+    "effect:<npc>:<efecto>"); si deja el rol se retiran. Los roles de evento
+    cuentan como su alias de perfil (weapon_shop/inn -> merchant). "unassigned" es no
+    tener rol una vez hecha la asignación (intro_done).
+  - betrayal.possible_outcomes (si can_betray): cada tipo usa las condiciones
+    de consequences.json["betrayal"][tipo]; al cumplirse dispara una vez:
+    flag "betrayal:<npc>:<tipo>" + el evento "betrayal_<tipo>_<npc>" o
+    "betrayal_<tipo>" si existe en assets/data/events (WorldState.queue_event).
+  - consequences.json["rules"]: reglas escritas a mano con el mismo formato.
+
+Condiciones ("when"): role, trust_below, trust_above, flags {f: v},
+remembers {tag, count?, within_days?}, active (default: el NPC tiene que estar presente:
+en el pueblo o en la party, ver GameState.npc_present).
+
+Estilo Rete: cada condición es un nodo compartido entre reglas con su último
+valor cacheado, indexado por el hecho que lee (("flag", f), ("role", npc),
+("trust", npc), ("mem", npc, tag)...). Cada tick se drena el diario de
+cambios de GameState y sólo se re-evalúan los nodos de esos hechos; una
+regla lleva la cuenta de cuántos de sus nodos son verdad y se activa/retira
+cuando esa cuenta cruza el total. Sin cambios, un tick no evalúa nada.
+"""
+from dataclasses import dataclass, field
+
+from core.assets import asset_exists, asset_path, load_json_asset
+from core.world.clock import MINUTES_PER_DAY, day_of
+from core.world.morality import load_profiles
+from core.world.role_assignment import ROLE_ALIASES
+
+CONSEQUENCES_PATH = asset_path("data", "consequences.json")
+
+# cortar cascadas (una acción que cambia un hecho que re-dispara otra regla...)
+MAX_PASSES = 8
+
+
+@dataclass
+class _Node:
+    """Condición alfa: un predicado sobre hechos, con su último valor."""
+
+    kind: str
+    args: tuple
+    keys: tuple
+    value: bool = False
+    rules: list = field(default_factory=list)
+
+    def evaluate(self, gs) -> bool:
+        kind, a = self.kind, self.args
+        if kind == "role":
+            role = gs.npc_role(a[0])
+            return role == a[1] or (a[1] is not None and ROLE_ALIASES.get(role) == a[1])
+        if kind == "trust_below":
+            return gs.npc_trust(a[0]) < a[1]
+        if kind == "trust_above":
+            return gs.npc_trust(a[0]) > a[1]
+        if kind == "flag":
+            return gs.get_flag(a[0], False) == a[1]
+        if kind == "active":
+            return gs.npc_present(a[0])
+        if kind == "remembers":
+            npc_id, tag, count, within_days = a
+            mem = gs.memories
+            if npc_id not in mem:
+                return False
+            since = None
+            if within_days is not None:
+                since = gs.world_time - within_days * MINUTES_PER_DAY
+            return mem.of(npc_id).count(tag, since=since) >= count
+        raise ValueError(f"condición desconocida '{kind}'")
+
+
+@dataclass
+class Rule:
+    rule_id: str
+    npc_id: str | None
+    nodes: list
+    effects: tuple = ()  # efectos ocultos (se retiran al dejar de cumplirse)
+    outcome: str | None = None  # tipo de traición/consecuencia (dispara una vez)
+    event_id: str | None = None
+    set_flags: dict = field(default_factory=dict)
+    satisfied: int = 0
+    active: bool = False
+
+
+class ConsequenceEngine:
+    """
+    sync(gs)   -> GameState nuevo: evalúa todo una vez
+    update(ws) -> cada frame: drena cambios, re-evalúa lo afectado, encola eventos emitidos
+    """
+
+    def __init__(self, profiles: dict[str, dict], config: dict):
+        self.rules: list[Rule] = []
+        self._nodes: dict[tuple, _Node] = {}
+        self._index: dict[tuple, list[_Node]] = {}
+        self._compile(profiles, config or {})
+
+        self._owner = None
+        self._day: int | None = None
+        self.pending_events: list[str] = []
+
+        # stats (debug)
+        self.evaluations = 0
+
+    # -------------------------------
+    # API
+    # -------------------------------
+    def sync(self, gs) -> None:
+        self._owner = gs
+        self._day = day_of(gs.world_time)
+        gs.track_changes()
+        gs.drain_changes()
+        self.pending_events = []
+
+        for node in self._nodes.values():
+            node.value = node.evaluate(gs)
+            self.evaluations += 1
+        for rule in self.rules:
+            rule.satisfied = sum(1 for n in rule.nodes if n.value)
+            rule.active = False
+            self._settle(gs, rule, fire=True)
+
+    def update(self, ws) -> None:
+        gs = ws.game.game_state
+        if gs is not self._owner:
+            self.sync(gs)
+
+        day = day_of(gs.world_time)
+        if day != self._day:
+            # las ventanas "within_days" vencen solas con el tiempo
+            self._day = day
+            gs.touch("day")
+
+        for _ in range(MAX_PASSES):
+            changes = gs.drain_changes()
+            if not changes:
+                break
+            self._propagate(gs, changes)
+
+        for event_id in self.pending_events:
+            ws.queue_event(event_id)
+        self.pending_events = []
+
+    def active_effects(self, effect: str) -> list[str]:
+        """NPCs con ese efecto oculto activo."""
+        return [r.npc_id for r in self.rules if r.active and effect in r.effects]
+
+    # -------------------------------
+    # Propagación
+    # -------------------------------
+    def _propagate(self, gs, changes: list[tuple]) -> None:
+        touched: dict[int, _Node] = {}
+        for key in changes:
+            for node in self._index.get(key, ()):
+                touched[id(node)] = node
+
+        dirty_rules: dict[int, Rule] = {}
+        for node in touched.values():
+            value = node.evaluate(gs)
+            self.evaluations += 1
+            if value == node.value:
+                continue
+            node.value = value
+            for rule in node.rules:
+                rule.satisfied += 1 if value else -1
+                dirty_rules[id(rule)] = rule
+
+        for rule in dirty_rules.values():
+            self._settle(gs, rule, fire=True)
+
+    def _settle(self, gs, rule: Rule, fire: bool) -> None:
+        matched = rule.satisfied == len(rule.nodes)
+        if matched == rule.active:
+            return
+        rule.active = matched
+
+        if rule.effects:
+            self._apply_effects(gs, rule, matched)
+
+        if matched and fire and rule.outcome:
+            once = f"betrayal:{rule.npc_id}:{rule.outcome}" if rule.npc_id else f"consequence:{rule.rule_id}"
+            if gs.get_flag(once, False):
+                return
+            gs.set_flag(once, True)
+            for flag, value in rule.set_flags.items():
+                gs.set_flag(flag, value)
+            print(f"[CONSEQ] ⚠️ {rule.rule_id}")
+            if rule.event_id:
+                self.pending_events.append(rule.event_id)
+
+    @staticmethod
+    def _apply_effects(gs, rule: Rule, on: bool) -> None:
+        effects = set(gs.get_npc(rule.npc_id).get("hidden_effects", []) or [])
+        if on:
+            effects |= set(rule.effects)
+        else:
+            effects -= set(rule.effects)
+        gs.set_npc(rule.npc_id, hidden_effects=sorted(effects))
+        for eff in rule.effects:
+            gs.set_flag(f"effect:{rule.npc_id}:{eff}", on)
+
+    # -------------------------------
+    # Compilación
+    # -------------------------------
+    def _compile(self, profiles: dict[str, dict], config: dict) -> None:
+        events = _event_ids()
+        templates = config.get("betrayal", {}) or {}
+
+        for npc_id, profile in sorted(profiles.items()):
+            for role, reaction in (profile.get("role_reactions") or {}).items():
+                effects = tuple((reaction or {}).get("hidden_effects") or ())
+                if not effects:
+                    continue
+                when = {"role": role}
+                if role == "unassigned":
+                    when = {"role": None, "flags": {"intro_done": True}}
+                self._add_rule(f"{npc_id}:{role}", npc_id, when, effects=effects)
+
+            betrayal = profile.get("betrayal") or {}
+            if not betrayal.get("can_betray"):
+                continue
+            for outcome in betrayal.get("possible_outcomes") or []:
+                kind = outcome.get("type")
+                template = templates.get(kind)
+                if not template:
+                    continue
+                event_id = next((e for e in (f"betrayal_{kind}_{npc_id}", f"betrayal_{kind}") if e in events), None)
+                self._add_rule(
+                    f"{npc_id}:betrayal:{kind}", npc_id, template.get("when") or {},
+                    outcome=kind, event_id=event_id, set_flags=template.get("set_flags") or {},
+                )
+
+        for raw in config.get("rules", []) or []:
+            try:
+                self._add_rule(
+                    str(raw["id"]), raw.get("npc"), raw.get("when") or {},
+                    outcome=str(raw.get("outcome") or raw["id"]), event_id=raw.get("event"),
+                    set_flags=raw.get("set_flags") or {},
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"[CONSEQ] ❌ Regla inválida {raw!r}: {e}")
+
+    def _add_rule(self, rule_id: str, npc_id: str | None, when: dict, **kw) -> None:
+        specs = []
+        if npc_id and when.get("active", True):
+            specs.append(("active", (npc_id,), (("active", npc_id), ("flag", f"recruited:{npc_id}"), ("party", npc_id))))
+        if "role" in when:
+            specs.append(("role", (npc_id, when["role"]), (("role", npc_id),)))
+        if "trust_below" in when:
+            specs.append(("trust_below", (npc_id, float(when["trust_below"])), (("trust", npc_id),)))
+        if "trust_above" in when:
+            specs.append(("trust_above", (npc_id, float(when["trust_above"])), (("trust", npc_id),)))
+        for flag, value in (when.get("flags") or {}).items():
+            specs.append(("flag", (str(flag), value), (("flag", str(flag)),)))
+        mems = when.get("remembers") or []
+        for m in [mems] if isinstance(mems, dict) else mems:
+            days = m.get("within_days")
+            keys = (("mem", npc_id, m["tag"]),) + ((("day",),) if days is not None else ())
+            specs.append(("remembers", (npc_id, str(m["tag"]), int(m.get("count", 1)),
+                                        float(days) if days is not None else None), keys))
+
+        if npc_id is None and any(kind in ("role", "trust_below", "trust_above", "remembers") for kind, _, _ in specs):
+            raise ValueError(f"regla '{rule_id}' sin 'npc' con condiciones de NPC")
+
+        rule = Rule(rule_id, npc_id, [self._node(*s) for s in specs], **kw)
+        for node in rule.nodes:
+            node.rules.append(rule)
+        self.rules.append(rule)
+
+    def _node(self, kind: str, args: tuple, keys: tuple) -> _Node:
+        node = self._nodes.get((kind, args))
+        if node is None:
+            node = _Node(kind, args, keys)
+            self._nodes[(kind, args)] = node
+            for key in keys:
+                self._index.setdefault(key, []).append(node)
+        return node
+
+
+def _event_ids() -> set[str]:
+    from engines.world_engine.event_registry import get_event_registry
+    return set(get_event_registry().event_ids())
+
+
+def get_consequence_engine(game) -> ConsequenceEngine:
+    engine = getattr(game, "consequences", None)
+    if engine is None:
+        config = {}
+        if asset_exists(CONSEQUENCES_PATH):
+            try:
+                config = load_json_asset(CONSEQUENCES_PATH) or {}
+            except (OSError, ValueError) as e:
+                print(f"[CONSEQ] ⚠️ consequences.json ilegible: {e}")
+        engine = ConsequenceEngine(load_profiles(), config)
+        game.consequences = engine
+    return engine
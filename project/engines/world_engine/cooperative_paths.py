@@ -0,0 +1,386 @@
+# project/engines/world_engine/cooperative_paths.py
+"""
+Pathfinding cooperativo por ventanas (WHCA*) para los NPCs que caminan.
+
+Cada NPC con un walk_to tiene un plan de WINDOW pasos en espacio-tiempo
+(tile, tick) reservado en una tabla compartida. Al planear se esquivan las
+reservas de los agentes con más prioridad: celdas, cruces de frente y
+"seguir pegado" (entrar a un tile en el tick en que el otro recién lo deja,
+que en el juego no se puede porque el paso real pide el tile libre). Los de
+menos prioridad que quedan pisados se re-planean: se corren, esperan o
+retroceden, así dos grupos en un pasillo no se trancan cara a cara.
+
+  - tick: un paso de tile (TILE_SIZE / velocidad de la Unit)
+  - heurística: distancia real al objetivo sobre el mapa estático (BFS
+    reanudable desde el objetivo, sólo lo que se va necesitando)
+  - prioridad: el que pidió antes; uno que queda encerrado (ningún plan
+    válido) pasa adelante de todos y los demás le abren paso
+  - se re-planea a mitad de ventana, si el NPC se atrasa (un paso que no se
+    pudo dar porque alguien que no planea, ej: el jugador, se cruzó) o si
+    uno de más prioridad lo pisó
+  - update() planea dentro de un presupuesto de ms por frame; los que no
+    entran esperan quietos al frame siguiente
+"""
+import heapq
+import itertools
+import time
+from collections import deque
+
+WINDOW = 8
+BUDGET_MS = 1.0
+
+# pasos posibles en un tick (el primero es esperar)
+_MOVES = ((0, 0), (1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class _GoalDistance:
+    """Distancia de cualquier tile al objetivo, por BFS inverso reanudable."""
+
+    def __init__(self, goal: tuple[int, int], blocked, max_nodes: int = 4096):
+        self.goal = goal
+        self.blocked = blocked
+        self.max_nodes = max_nodes
+        self.dist = {goal: 0}
+        self.frontier = deque([goal])
+
+    def __call__(self, tile: tuple[int, int]) -> int:
+        d = self.dist.get(tile)
+        if d is not None:
+            return d
+
+        dist = self.dist
+        frontier = self.frontier
+        while frontier and len(dist) < self.max_nodes:
+            x, y = cur = frontier.popleft()
+            nd = dist[cur] + 1
+            for dx, dy in _MOVES[1:]:
+                nxt = (x + dx, y + dy)
+                if nxt in dist or self.blocked(*nxt):
+                    continue
+                dist[nxt] = nd
+                frontier.append(nxt)
+            if tile in dist:
+                return dist[tile]
+
+        # inalcanzable o fuera del radio explorado: manhattan
+        return abs(tile[0] - self.goal[0]) + abs(tile[1] - self.goal[1])
+
+    def unreachable(self, tile: tuple[int, int]) -> bool:
+        """True sólo si es seguro: objetivo bloqueado o BFS agotado sin llegar a tile."""
+        if self.blocked(*self.goal):
+            return True
+        self(tile)
+        return tile not in self.dist and not self.frontier
+
+
+class _Plan:
+    __slots__ = ("start", "cells", "step", "goal")
+
+    def __init__(self, start: int, cells: list[tuple[int, int]], goal: tuple[int, int]):
+        self.start = start  # tick de cells[0]
+        self.cells = cells
+        self.step = 0  # índice de la celda en la que está el NPC
+        self.goal = goal
+
+
+class CooperativePlanner:
+    """
+    API (la usa NPCSystem):
+      request(agent, goal)  -> el agente quiere ir a goal (se planea en update)
+      release(agent)        -> llegó / se fue: libera sus reservas
+      update(dt)            -> avanza el reloj y planea dentro del presupuesto
+      next_move(agent, pos) -> (dx, dy) a intentar ahora, o None (esperar)
+      unreachable(agent)    -> el objetivo no se puede alcanzar (el que pidió tiene que rendirse)
+    """
+
+    def __init__(self, blocked, occupied, locate, step_seconds: float, window: int = WINDOW, budget_ms: float = BUDGET_MS):
+        self.blocked = blocked  # (x, y) -> bool: mapa estático
+        self.occupied = occupied  # (x, y) -> ids de Units en ese tile
+        self.locate = locate  # agent -> (x, y) tile lógico actual
+        self.step_seconds = float(step_seconds)
+        self.window = int(window)
+        self.budget_ms = float(budget_ms)
+
+        self.clock = 0.0
+        self.tick = 0
+
+        self._goals: dict[str, tuple[int, int]] = {}
+        self._plans: dict[str, _Plan] = {}
+        self._pending: dict[str, None] = {}  # set ordenado
+        self._order: dict[str, int] = {}
+        self._boost: dict[str, int] = {}
+        self._unreachable: set[str] = set()
+        self._seq = itertools.count(1)
+
+        # reservas -> agent
+        #   _cells: (x, y, t)          el agente está en (x, y) en el tick t
+        #   _edges: (x0, y0, x1, y1, t) va de (x0, y0) a (x1, y1) llegando en t
+        #   _enter: (x1, y1, t)         llega a (x1, y1) en t (índice de _edges por destino)
+        self._cells: dict[tuple, str] = {}
+        self._edges: dict[tuple, str] = {}
+        self._enter: dict[tuple, str] = {}
+        self._owned: dict[str, list[tuple[dict, tuple]]] = {}
+
+        self._distances: dict[tuple[int, int], _GoalDistance] = {}
+
+        # stats (debug)
+        self.plans_made = 0
+
+    # -------------------------------
+    # API
+    # -------------------------------
+    def request(self, agent: str, goal: tuple[int, int]) -> None:
+        goal = (int(goal[0]), int(goal[1]))
+        if self._goals.get(agent) == goal:
+            return
+        if agent not in self._order:
+            self._order[agent] = next(self._seq)
+        self._goals[agent] = goal
+        self._unreachable.discard(agent)
+        self._replan(agent)
+
+    def release(self, agent: str) -> None:
+        self._unreserve(agent)
+        self._plans.pop(agent, None)
+        self._pending.pop(agent, None)
+        self._goals.pop(agent, None)
+        self._order.pop(agent, None)
+        self._boost.pop(agent, None)
+        self._unreachable.discard(agent)
+
+    def unreachable(self, agent: str) -> bool:
+        return agent in self._unreachable
+
+    def invalidate_map(self) -> None:
+        """El mapa estático cambió (otro mapa, chunks nuevos): descartar distancias."""
+        self._distances.clear()
+
+    def update(self, dt: float) -> None:
+        self.clock += dt
+        tick = int(self.clock / self.step_seconds)
+        if tick != self.tick:
+            self.tick = tick
+            self._forget_past()
+
+        if not self._pending:
+            return
+
+        deadline = time.perf_counter() + self.budget_ms / 1000.0
+        while self._pending:
+            agent = max(self._pending, key=self._rank)
+            del self._pending[agent]
+            self._plan(agent)
+            if time.perf_counter() >= deadline:
+                break
+
+    def next_move(self, agent: str, pos: tuple[int, int]) -> tuple[int, int] | None:
+        plan = self._plans.get(agent)
+        if plan is None:
+            return None
+
+        cells = plan.cells
+        if cells[plan.step] != pos:
+            if plan.step + 1 < len(cells) and cells[plan.step + 1] == pos:
+                plan.step += 1  # terminó el paso anterior
+            else:
+                # no está donde el plan dice (lo movió otro sistema)
+                self._replan(agent)
+                return None
+
+        # esperas ya cumplidas
+        while plan.step + 1 < len(cells) and cells[plan.step + 1] == pos and self.tick > plan.start + plan.step:
+            plan.step += 1
+
+        last = plan.step + 1 >= len(cells)
+        late = self.tick > plan.start + plan.step + 2
+        if last or late or plan.step >= self.window // 2:
+            if not (last and pos == plan.goal):
+                self._replan(agent)
+            return None
+
+        nxt = cells[plan.step + 1]
+        if nxt == pos or self.tick < plan.start + plan.step:
+            return None
+        # si el paso falla (tile todavía ocupado) se reintenta; al atrasarse, re-plan
+        return nxt[0] - pos[0], nxt[1] - pos[1]
+
+    # -------------------------------
+    # Planeamiento
+    # -------------------------------
+    def _rank(self, agent: str) -> tuple[int, int]:
+        return self._boost.get(agent, 0), -self._order.get(agent, 0)
+
+    def _replan(self, agent: str) -> None:
+        self._unreserve(agent)
+        self._plans.pop(agent, None)
+        if agent in self._goals:
+            self._pending[agent] = None
+
+    def _distance(self, goal: tuple[int, int]) -> _GoalDistance:
+        h = self._distances.get(goal)
+        if h is None:
+            h = _GoalDistance(goal, self.blocked)
+            self._distances[goal] = h
+        return h
+
+    def _plan(self, agent: str) -> None:
+        goal = self._goals.get(agent)
+        if goal is None:
+            return
+        self.plans_made += 1
+        pos = tuple(self.locate(agent))
+
+        # sin camino en el mapa estático: no se planea (ni reserva) nada
+        if self._distance(goal).unreachable(pos):
+            self._unreachable.add(agent)
+            return
+
+        cells = self._search(agent, pos, goal, self.tick)
+        if cells is None:
+            # encerrado por planes de más prioridad: pasa primero y los demás se re-planean
+            self._boost[agent] = next(self._seq)
+            cells = self._search(agent, pos, goal, self.tick) or [pos, pos]
+
+        plan = _Plan(self.tick, cells, goal)
+        self._plans[agent] = plan
+        self._reserve(agent, plan)
+
+    def _search(self, agent: str, start: tuple[int, int], goal: tuple[int, int], t0: int) -> list[tuple[int, int]] | None:
+        """A* en espacio-tiempo sobre la ventana: celdas tick a tick desde start, o None si no hay salida."""
+        h = self._distance(goal)
+        window = self.window
+        cells_res = self._cells
+        edges_res = self._edges
+        enter_res = self._enter
+        blocked = self.blocked
+        occupied = self.occupied
+        rank = self._rank(agent)
+
+        def yields(owner) -> bool:
+            return owner is not None and owner != agent and self._rank(owner) > rank
+
+        static: dict[tuple[int, int], bool] = {}
+
+        def free(tile) -> bool:
+            ok = static.get(tile)
+            if ok is None:
+                # Units que no caminan (quietas, o con otras órdenes) son obstáculos fijos
+                ok = not blocked(*tile) and not any(
+                    uid != agent and uid not in self._goals for uid in occupied(*tile)
+                )
+                static[tile] = ok
+            return ok
+
+        # agentes esperando plan: están en su tile ahora y el tick siguiente
+        waiting = {tuple(self.locate(a)) for a in self._pending if a != agent}
+
+        def goal_free_from(t: int) -> bool:
+            gx, gy = goal
+            return not any(yields(cells_res.get((gx, gy, t0 + k))) for k in range(t, window + 2))
+
+        # (f, g, t, tile); came: (tile, t) -> (tile, t) previo
+        open_heap = [(h(start), 0, 0, start)]
+        came = {(start, 0): None}
+        g_score = {(start, 0): 0}
+        best = None
+
+        while open_heap:
+            f, g, t, tile = heapq.heappop(open_heap)
+            if g > g_score[(tile, t)]:
+                continue
+            if t == window or (tile == goal and goal_free_from(t)):
+                best = (tile, t)
+                break
+
+            x, y = tile
+            nt = t + 1
+            for dx, dy in _MOVES:
+                nxt = (x + dx, y + dy)
+                nx, ny = nxt
+                if dx or dy:
+                    if not free(nxt) or (nt <= 1 and nxt in waiting):
+                        continue
+                    # cruce de frente / entrar donde otro todavía está
+                    if yields(edges_res.get((nx, ny, x, y, t0 + nt))) or yields(cells_res.get((nx, ny, t0 + t))):
+                        continue
+                if yields(cells_res.get((nx, ny, t0 + nt))):
+                    continue
+                # otro entra acá en el tick siguiente (contando con que ya me fui)
+                if yields(enter_res.get((nx, ny, t0 + nt + 1))):
+                    continue
+
+                # esperar en el objetivo no cuesta
+                ng = g + (0 if (nxt == goal and not (dx or dy)) else 1)
+                key = (nxt, nt)
+                if ng >= g_score.get(key, ng + 1):
+                    continue
+                g_score[key] = ng
+                came[key] = (tile, t)
+                heapq.heappush(open_heap, (ng + h(nxt), ng, nt, nxt))
+
+        if best is None:
+            return None
+
+        path = []
+        node = best
+        while node is not None:
+            path.append(node[0])
+            node = came[node]
+        path.reverse()
+        if len(path) == 1:
+            path.append(start)
+        return path
+
+    # -------------------------------
+    # Reservas
+    # -------------------------------
+    def _reserve(self, agent: str, plan: _Plan) -> None:
+        cells = list(plan.cells)
+        # al final de la ventana se queda ahí un tick más (hasta re-planear)
+        cells.append(cells[-1])
+
+        # claves: (tabla, key); los de menos prioridad que las ocupan se re-planean
+        keys = []
+        bumped = set()
+        prev = None
+        for k, (x, y) in enumerate(cells):
+            t = plan.start + k
+            keys.append((self._cells, (x, y, t)))
+            bumped.add(self._cells.get((x, y, t)))
+            bumped.add(self._enter.get((x, y, t + 1)))
+            if prev is not None and prev != (x, y):
+                keys.append((self._edges, (prev[0], prev[1], x, y, t)))
+                keys.append((self._enter, (x, y, t)))
+                bumped.add(self._edges.get((x, y, prev[0], prev[1], t)))
+                bumped.add(self._cells.get((x, y, t - 1)))
+            prev = (x, y)
+
+        rank = self._rank(agent)
+        for other in bumped:
+            if other is not None and other != agent and self._rank(other) < rank:
+                self._replan(other)
+
+        owned = self._owned.setdefault(agent, [])
+        for table, key in keys:
+            if key not in table:
+                table[key] = agent
+                owned.append((table, key))
+
+    def _unreserve(self, agent: str) -> None:
+        for table, key in self._owned.pop(agent, ()):
+            if table.get(key) == agent:
+                del table[key]
+
+    def _forget_past(self) -> None:
+        # reservas de ticks que ya pasaron
+        old = self.tick - 1
+        for agent, owned in self._owned.items():
+            if owned and owned[0][1][-1] < old:
+                keep = []
+                for table, key in owned:
+                    if key[-1] < old:
+                        if table.get(key) == agent:
+                            del table[key]
+                    else:
+                        keep.append((table, key))
+                self._owned[agent] = keep
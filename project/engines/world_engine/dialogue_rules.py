@@ -0,0 +1,306 @@
+# project/engines/world_engine/dialogue_rules.py
+"""
+Diálogo dinámico por reglas: cada línea candidata trae criterios y al
+interactuar se elige la que más criterios cumple (la más específica).
+
+Líneas en assets/data/dialogue/*.json:
+
+  {
+    "npc": "marian_vell",            // o "*" para todos
+    "lines": [
+      {"text": "...", "criteria": {...}},
+      {"lines": ["...", "..."], "criteria": {...}, "options": [...]}
+    ]
+  }
+
+Criterios (todos deben cumplirse; la especificidad es cuántos hay):
+  - "flags": {"intro_done": true, ...}
+  - "role": "advisor" | null (sin rol)
+  - "map": "pueblo"
+  - "trust": [min, max]                 (GameState.npc_trust: la simulación de core/world/morality.py)
+  - "axis": {"compassion_cruelty": "cruelty"}   (inclinación actual; sin simulación, hidden_profile.moral_axes)
+  - "remembers": ["cruel", {"tag": "bribe", "within_days": 10, "witnessed": true}]
+  - "forgets": ["cruel"]               (no lo recuerda)
+
+Índice: al compilar, cada línea queda en el bucket de su hecho de igualdad más
+raro (rol, mapa, flag en true, eje, recuerdo); las que no tienen ninguno van a
+un bucket común. Al interactuar sólo se miran los buckets de los hechos que son
+verdad ahora, de a uno por especificidad (cada bucket ordenado por dentro):
+se corta apenas nada restante puede superar a la mejor encontrada. El costo
+no crece con la cantidad total de líneas del NPC sino con las que comparten
+hechos con el contexto.
+"""
+import os
+from dataclasses import dataclass
+
+from core.assets import asset_exists, asset_path, is_asset_dir, list_assets, load_json_asset
+from engines.world_engine.event_registry import normalize_map_id
+
+DIALOGUE_DIR = asset_path("data", "dialogue")
+
+_ALWAYS = ("*",)  # bucket de líneas sin hechos indexables
+
+
+@dataclass(frozen=True)
+class DialogueLine:
+    lines: tuple
+    options: tuple
+    specificity: int
+    # residuales (se chequean en el bucket)
+    flags: tuple  # ((flag, valor), ...)
+    role: object  # str | None | ... (_ANY)
+    map_id: str | None
+    trust: tuple | None
+    axes: tuple  # ((eje, lado), ...)
+    remembers: tuple  # ((tag, within_days | None, witnessed_only), ...)
+    forgets: tuple
+    source: str = ""
+
+
+_ANY = object()
+
+
+def _compile_line(raw: dict, source: str) -> DialogueLine:
+    crit = raw.get("criteria", {}) or {}
+    text = raw.get("lines")
+    if text is None:
+        text = [raw.get("text", "")]
+    if isinstance(text, str):
+        text = [text]
+    if not text or not all(isinstance(t, str) for t in text):
+        raise ValueError(f"línea sin texto ({source})")
+
+    flags = tuple(sorted((str(k), v) for k, v in (crit.get("flags", {}) or {}).items()))
+    role = crit["role"] if "role" in crit else _ANY
+    map_id = normalize_map_id(crit["map"]) if crit.get("map") else None
+
+    trust = crit.get("trust")
+    if trust is not None:
+        if not (isinstance(trust, (list, tuple)) and len(trust) == 2):
+            raise ValueError(f"'trust' debe ser [min, max] ({source})")
+        trust = (float(trust[0]), float(trust[1]))
+
+    axes = tuple(sorted((str(k), str(v)) for k, v in (crit.get("axis", {}) or {}).items()))
+
+    def _mem(items):
+        out = []
+        for m in items or []:
+            if isinstance(m, str):
+                out.append((m, None, False))
+            else:
+                days = m.get("within_days")
+                out.append((str(m["tag"]), float(days) if days is not None else None, bool(m.get("witnessed", False))))
+        return tuple(out)
+
+    remembers = _mem(crit.get("remembers"))
+    forgets = tuple(t for t, _, _ in _mem(crit.get("forgets")))
+
+    specificity = (len(flags) + (role is not _ANY) + (map_id is not None) + (trust is not None)
+                   + len(axes) + len(remembers) + len(forgets))
+    return DialogueLine(
+        lines=tuple(text),
+        options=tuple(raw.get("options", []) or []),
+        specificity=specificity,
+        flags=flags,
+        role=role,
+        map_id=map_id,
+        trust=trust,
+        axes=axes,
+        remembers=remembers,
+        forgets=forgets,
+        source=source,
+    )
+
+
+def _facts(line: DialogueLine) -> list[tuple]:
+    """Hechos de igualdad de una línea (claves posibles del índice)."""
+    out = [("flag", k) for k, v in line.flags if v is True]
+    if line.role is not _ANY and line.role is not None:
+        out.append(("role", str(line.role)))
+    if line.map_id is not None:
+        out.append(("map", line.map_id))
+    out += [("axis", k, v) for k, v in line.axes]
+    out += [("mem", t) for t, _, _ in line.remembers]
+    return out
+
+
+class DialogueIndex:
+    """Líneas de un NPC indexadas por su hecho más raro."""
+
+    def __init__(self, lines: list[DialogueLine]):
+        freq: dict[tuple, int] = {}
+        for line in lines:
+            for f in _facts(line):
+                freq[f] = freq.get(f, 0) + 1
+
+        self.buckets: dict[tuple, list[DialogueLine]] = {}
+        for line in lines:
+            facts = _facts(line)
+            key = min(facts, key=lambda f: freq[f]) if facts else _ALWAYS
+            self.buckets.setdefault(key, []).append(line)
+        for bucket in self.buckets.values():
+            bucket.sort(key=lambda ln: -ln.specificity)
+
+        # qué flags/recuerdos conviene mirar en el contexto (sólo los que son clave)
+        self.flag_keys = [k[1] for k in self.buckets if k[0] == "flag"]
+        self.mem_keys = [k[1] for k in self.buckets if k[0] == "mem"]
+        self.size = len(lines)
+
+    def best(self, ctx: "DialogueContext") -> list[DialogueLine]:
+        """Las líneas que cumplen con la especificidad máxima (empate: todas)."""
+        keys = [_ALWAYS, ("role", ctx.role), ("map", ctx.map_id)]
+        keys += [("axis", k, v) for k, v in ctx.axes.items()]
+        keys += [("flag", f) for f in self.flag_keys if ctx.gs.get_flag(f, False) is True]
+        keys += [("mem", t) for t in self.mem_keys if ctx.remembers(t)]
+
+        # buckets con la línea más específica primero: los que no pueden ganar ni se abren
+        buckets = sorted((b for b in map(self.buckets.get, keys) if b), key=lambda b: -b[0].specificity)
+
+        best: list[DialogueLine] = []
+        top = -1
+        for bucket in buckets:
+            if bucket[0].specificity < top:
+                break
+            for line in bucket:
+                if line.specificity < top:
+                    break  # bucket ordenado: no hay nada mejor más abajo
+                if _matches(line, ctx):
+                    if line.specificity > top:
+                        top, best = line.specificity, [line]
+                    else:
+                        best.append(line)
+        return best
+
+
+class DialogueContext:
+    """Lo que una línea puede preguntar sobre el NPC y la partida en este momento."""
+
+    def __init__(self, gs, npc_id: str, map_id, profile: dict | None = None):
+        self.gs = gs
+        self.npc_id = npc_id
+        self.map_id = normalize_map_id(map_id) if map_id else None
+
+        st = gs.get_npc(npc_id)
+        profile = profile or {}
+        self.role = st.get("role")
+        self.trust = gs.npc_trust(npc_id, default=(profile.get("trust_state") or {}).get("initial_feeling", 50))
+
+        sim = gs.morality()
+        if sim is not None and npc_id in sim:
+            self.axes = {}
+            for axis in sim.axis_ids:
+                side = sim.leaning(npc_id, axis)
+                if side is not None:
+                    self.axes[axis] = side
+        else:
+            self.axes = dict((profile.get("hidden_profile") or {}).get("moral_axes") or {})
+
+    def remembers(self, tag: str, within_days: float | None = None, witnessed_only: bool = False) -> bool:
+        return self.gs.npc_remembers(self.npc_id, tag, within_days=within_days, witnessed_only=witnessed_only)
+
+
+def _matches(line: DialogueLine, ctx: DialogueContext) -> bool:
+    if line.role is not _ANY and line.role != ctx.role:
+        return False
+    if line.map_id is not None and line.map_id != ctx.map_id:
+        return False
+    if line.trust is not None and not (line.trust[0] <= ctx.trust <= line.trust[1]):
+        return False
+    for k, v in line.flags:
+        if ctx.gs.get_flag(k, False) != v:
+            return False
+    for k, v in line.axes:
+        if ctx.axes.get(k) != v:
+            return False
+    for tag, days, witnessed in line.remembers:
+        if not ctx.remembers(tag, days, witnessed):
+            return False
+    for tag in line.forgets:
+        if ctx.remembers(tag):
+            return False
+    return True
+
+
+class DialogueRules:
+    """
+    Registro de líneas (assets/data/dialogue): se lee y compila una vez;
+    pick(gs, npc_id, map_id) elige la línea para una interacción.
+    """
+
+    def __init__(self):
+        self._lines: dict[str, list[DialogueLine]] | None = None
+        self._indexes: dict[str, DialogueIndex] = {}
+        self._profiles: dict[str, dict] = {}
+        self._turn: dict[str, int] = {}  # rotación entre empates, por NPC
+
+    def pick(self, gs, npc_id: str, map_id) -> DialogueLine | None:
+        index = self._index(npc_id)
+        if index.size == 0:
+            return None
+
+        best = index.best(DialogueContext(gs, npc_id, map_id, self._profile(npc_id)))
+        if not best:
+            return None
+
+        # empate: rotar para no repetir siempre la misma
+        turn = self._turn.get(npc_id, 0)
+        self._turn[npc_id] = turn + 1
+        return best[turn % len(best)]
+
+    # -------------------------------
+    # Carga
+    # -------------------------------
+    def _index(self, npc_id: str) -> DialogueIndex:
+        index = self._indexes.get(npc_id)
+        if index is None:
+            lines = self._all_lines()
+            index = DialogueIndex(lines.get(npc_id, []) + lines.get("*", []))
+            self._indexes[npc_id] = index
+        return index
+
+    def _all_lines(self) -> dict[str, list[DialogueLine]]:
+        if self._lines is not None:
+            return self._lines
+
+        self._lines = {}
+        if not is_asset_dir(DIALOGUE_DIR):
+            return self._lines
+        for name in sorted(list_assets(DIALOGUE_DIR)):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(DIALOGUE_DIR, name)
+            try:
+                data = load_json_asset(path) or {}
+                npc = str(data.get("npc") or "*")
+                compiled = [
+                    _compile_line(raw, f"{name}[{i}]")
+                    for i, raw in enumerate(data.get("lines", []) or [])
+                ]
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"[DIALOGUE] ❌ {name}: {e}")
+                continue
+            self._lines.setdefault(npc, []).extend(compiled)
+        return self._lines
+
+    def _profile(self, npc_id: str) -> dict:
+        profile = self._profiles.get(npc_id)
+        if profile is None:
+            profile = {}
+            path = asset_path("sprites", "npcs", npc_id, f"{npc_id}.json")
+            if asset_exists(path):
+                try:
+                    profile = load_json_asset(path) or {}
+                except (OSError, ValueError):
+                    profile = {}
+            self._profiles[npc_id] = profile
+        return profile
+
+
+_rules: DialogueRules | None = None
+
+
+def get_dialogue_rules() -> DialogueRules:
+    global _rules
+    if _rules is None:
+        _rules = DialogueRules()
+    return _rules
@@ -1,8 +1,11 @@
 # project/engines/world_engine/dialogue_system.py
 import pygame
-import json
-import os
-from core.assets import asset_path
+from core.assets import asset_path, asset_exists, load_json_asset, open_asset
+from ui.fonts import get_font
+
+
+# Retrato del protagonista ya recortado: se carga una vez y lo comparten todos los WorldState
+_protagonist_portrait = None
 
 
 class DialogueSystem:
@@ -18,14 +21,16 @@ class DialogueSystem:
         self.option_index = 0
         self.context = {}
 
-        self.ui_font = pygame.font.SysFont(None, 24)
+        self.ui_font = get_font(24)
 
-        # Retrato del protagonista (diálogos) — igual que antes
-        raw_portrait = pygame.image.load(
-            asset_path("sprites", "protagonist", "portrait.png")
-        ).convert_alpha()
+        # Retrato del protagonista (diálogos) — igual que antes, pero cacheado
+        global _protagonist_portrait
+        if _protagonist_portrait is None:
+            portrait_path = asset_path("sprites", "protagonist", "portrait.png")
+            raw_portrait = pygame.image.load(open_asset(portrait_path), portrait_path).convert_alpha()
+            _protagonist_portrait = self._trim_transparent(raw_portrait)
 
-        self.portrait_original = self._trim_transparent(raw_portrait)
+        self.portrait_original = _protagonist_portrait
         self.portrait_cover = None
         self.portrait_cover_key = None
 
@@ -61,6 +66,10 @@ class DialogueSystem:
         if after:
             after()
 
+        scheduler = getattr(self.ws, "scheduler", None)
+        if scheduler is not None:
+            scheduler.notify_dialogue_closed()
+
     # -------------------------
     # Input
     # -------------------------
@@ -130,6 +139,19 @@ class DialogueSystem:
             role = action.split(":", 1)[1]
             self.ws.assign_role(role)
             return
+        if action == "assign_roles_auto":
+            self.ws.auto_assign_roles()
+            return
+
+        # tiendas: "shop:<id>[:<página>]" / "shop_item:<id>:<item>"
+        if isinstance(action, str) and action.startswith("shop:"):
+            bits = action.split(":")
+            self.ws.open_shop(bits[1], page=int(bits[2]) if len(bits) > 2 else 0)
+            return
+        if isinstance(action, str) and action.startswith("shop_item:"):
+            _, shop_id, item = action.split(":", 2)
+            self.ws.show_shop_item(shop_id, item)
+            return
 
         # close
         if action == "close":
@@ -191,12 +213,11 @@ class DialogueSystem:
         if speaker_key in ["marian_vell", "selma_ironrose", "loren_valcrest", "iraen_falk", "elinya_brightwell"]:
             try:
                 npc_json_path = asset_path("sprites", "npcs", speaker_key, f"{speaker_key}.json")
-                if os.path.exists(npc_json_path):
-                    with open(npc_json_path, "r", encoding="utf-8") as f:
-                        npc_data = json.load(f)
+                if asset_exists(npc_json_path):
+                    npc_data = load_json_asset(npc_json_path)
                     portrait_path = npc_data.get("visual", {}).get("portrait")
                     if portrait_path:
-                        surf = pygame.image.load(asset_path(*portrait_path.split("/"))).convert_alpha()
+                        surf = pygame.image.load(open_asset(portrait_path), portrait_path).convert_alpha()
                         portrait_surface = self._trim_transparent(surf)
                         portrait_key = speaker_key
             except Exception:
@@ -0,0 +1,381 @@
+# project/engines/world_engine/event_registry.py
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from core.assets import asset_path, is_asset_dir, list_assets, load_json_asset
+
+
+# Tipos de step que entiende EventRunner (cada uno tiene su handler en la dispatch table)
+STEP_TYPES = (
+    "dialogue",
+    "assign_roles",
+    "set_flag",
+    "apply_role_outcomes",
+    "apply_role_spawns",
+    "wait",
+    "wait_flag",
+    "walk_to_marker",
+    "remember",
+    "decision",
+    "build",
+)
+
+# Steps permitidos en eventos ambientales (corren en el scheduler, sin bloquear input)
+AMBIENT_STEP_TYPES = ("set_flag", "wait", "wait_flag", "walk_to_marker", "remember", "decision", "build")
+
+STEP_TRIGGERS = ("auto", "talk")
+
+# Triggers a nivel evento (cómo se dispara el evento completo)
+EVENT_TRIGGERS = ("auto", "talk", "map", "manual")
+
+
+@dataclass(frozen=True)
+class CompiledStep:
+    op: str
+    trigger: str
+    npc_id: Optional[str]
+    data: Dict[str, Any]
+    post: Tuple["CompiledStep", ...] = ()
+
+
+@dataclass(frozen=True)
+class CompiledEvent:
+    event_id: str
+    source: str
+    trigger: str
+    once_flag: Optional[str]
+    map_id: Optional[str]
+    npc_id: Optional[str]
+    trigger_id: Optional[str]
+    ambient: bool
+    loop: bool
+    steps: Tuple[CompiledStep, ...]
+    npc_refs: FrozenSet[str]
+    marker_refs: FrozenSet[str]
+
+
+def normalize_map_id(map_id: Any) -> str:
+    """
+    Normaliza el id de mapa a 'maps/world/<x>.json'.
+
+    Acepta tuple/list (como llega a WorldState), paths con backslash
+    y el formato viejo de saves ("town_01").
+    """
+    if isinstance(map_id, (tuple, list)):
+        map_id = "/".join(str(p) for p in map_id)
+
+    s = str(map_id or "").replace("\\", "/")
+    if "assets/" in s:
+        s = s.split("assets/")[-1]
+    if s and "/" not in s and not s.endswith(".json"):
+        s = f"maps/world/{s}.json"
+    return s
+
+
+def _known_npc_ids() -> FrozenSet[str]:
+    npcs_dir = asset_path("sprites", "npcs")
+    return frozenset(
+        d for d in list_assets(npcs_dir)
+        if is_asset_dir(os.path.join(npcs_dir, d))
+    )
+
+
+def compile_event(event_json: Dict[str, Any], source: str = "<inline>", known_npcs: FrozenSet[str] | None = None) -> CompiledEvent:
+    """
+    Valida y compila un evento JSON a un programa de steps inmutable.
+
+    - Normaliza type/trigger a minúsculas (ya no se hace en cada step durante el juego)
+    - Compila recursivamente los "post"
+    - Junta las referencias a NPCs y markers para resolverlas una sola vez
+    """
+    if not isinstance(event_json, dict):
+        raise ValueError(f"Evento inválido (no es un objeto): {source}")
+
+    event_id = str(event_json.get("id") or os.path.splitext(os.path.basename(source))[0])
+
+    trigger = str(event_json.get("trigger") or "manual").lower()
+    if trigger not in EVENT_TRIGGERS:
+        raise ValueError(f"Evento '{event_id}': trigger desconocido '{trigger}' ({source})")
+
+    npc_refs: set[str] = set()
+    marker_refs: set[str] = set()
+
+    def _compile_step(raw: Any, where: str, allow_talk: bool) -> CompiledStep:
+        if not isinstance(raw, dict):
+            raise ValueError(f"Evento '{event_id}': step inválido en {where} ({source})")
+
+        op = str(raw.get("type") or "").lower()
+        if op not in STEP_TYPES:
+            raise ValueError(f"Evento '{event_id}': step type desconocido '{op}' en {where} ({source})")
+
+        step_trigger = str(raw.get("trigger") or "auto").lower()
+        if step_trigger not in STEP_TRIGGERS:
+            raise ValueError(f"Evento '{event_id}': trigger de step desconocido '{step_trigger}' en {where} ({source})")
+        if step_trigger == "talk" and not allow_talk:
+            raise ValueError(f"Evento '{event_id}': un step 'post' no puede ser trigger=talk ({where}, {source})")
+
+        npc_id = raw.get("npc_id")
+        npc_id = str(npc_id) if npc_id else None
+        if step_trigger == "talk" and not npc_id:
+            raise ValueError(f"Evento '{event_id}': step talk sin npc_id en {where} ({source})")
+        if npc_id:
+            npc_refs.add(npc_id)
+
+        if op == "dialogue":
+            if not isinstance(raw.get("lines", []) or [], list):
+                raise ValueError(f"Evento '{event_id}': 'lines' debe ser lista en {where} ({source})")
+
+        elif op == "assign_roles":
+            if not raw.get("roles"):
+                raise ValueError(f"Evento '{event_id}': assign_roles sin 'roles' en {where} ({source})")
+            npc_from = raw.get("npc_from")
+            if npc_from not in (None, "last_talk"):
+                raise ValueError(f"Evento '{event_id}': npc_from desconocido '{npc_from}' en {where} ({source})")
+            if npc_from is None and not raw.get("npcs"):
+                raise ValueError(f"Evento '{event_id}': assign_roles sin 'npcs' ni 'npc_from' en {where} ({source})")
+            for n in raw.get("npcs", []) or []:
+                npc_refs.add(str(n))
+
+        elif op == "set_flag":
+            if not (raw.get("flag") or raw.get("name")):
+                raise ValueError(f"Evento '{event_id}': set_flag sin 'flag' en {where} ({source})")
+
+        elif op == "wait":
+            try:
+                float(raw.get("seconds", 0))
+            except (TypeError, ValueError):
+                raise ValueError(f"Evento '{event_id}': wait con 'seconds' inválido en {where} ({source})")
+
+        elif op == "wait_flag":
+            if not raw.get("flag"):
+                raise ValueError(f"Evento '{event_id}': wait_flag sin 'flag' en {where} ({source})")
+
+        elif op == "walk_to_marker":
+            if not npc_id or not raw.get("marker"):
+                raise ValueError(f"Evento '{event_id}': walk_to_marker requiere 'npc_id' y 'marker' en {where} ({source})")
+            marker_refs.add(str(raw["marker"]))
+
+        elif op == "remember":
+            if not raw.get("tag"):
+                raise ValueError(f"Evento '{event_id}': remember sin 'tag' en {where} ({source})")
+            for key in ("npcs", "heard_by"):
+                if not isinstance(raw.get(key, []) or [], list):
+                    raise ValueError(f"Evento '{event_id}': '{key}' debe ser lista en {where} ({source})")
+                for n in raw.get(key, []) or []:
+                    npc_refs.add(str(n))
+
+        elif op == "decision":
+            if not isinstance(raw.get("axes", {}) or {}, dict) or not (raw.get("axes") or raw.get("tags")):
+                raise ValueError(f"Evento '{event_id}': decision requiere 'axes' (dict) o 'tags' en {where} ({source})")
+            for key in ("npcs", "heard_by"):
+                if not isinstance(raw.get(key, []) or [], list):
+                    raise ValueError(f"Evento '{event_id}': '{key}' debe ser lista en {where} ({source})")
+                for n in raw.get(key, []) or []:
+                    npc_refs.add(str(n))
+
+        elif op == "build":
+            if not raw.get("building"):
+                raise ValueError(f"Evento '{event_id}': build sin 'building' en {where} ({source})")
+            if not isinstance(raw.get("workers", []) or [], list):
+                raise ValueError(f"Evento '{event_id}': 'workers' debe ser lista en {where} ({source})")
+            for n in raw.get("workers", []) or []:
+                npc_refs.add(str(n))
+
+        elif op == "apply_role_spawns":
+            for marker_id in (raw.get("role_to_marker", {}) or {}).values():
+                marker_refs.add(str(marker_id))
+
+        elif op == "apply_role_outcomes":
+            for cfg in (raw.get("roles", {}) or {}).values():
+                marker_id = (cfg or {}).get("move_to_marker")
+                if marker_id:
+                    marker_refs.add(str(marker_id))
+                travel = (cfg or {}).get("travel_to")
+                if travel is not None and not (isinstance(travel, dict) and travel.get("map")):
+                    raise ValueError(f"Evento '{event_id}': travel_to requiere 'map' en {where} ({source})")
+
+        post = tuple(
+            _compile_step(p, f"{where}.post[{j}]", allow_talk=False)
+            for j, p in enumerate(raw.get("post", []) or [])
+        )
+
+        data = {k: v for k, v in raw.items() if k != "post"}
+        return CompiledStep(op=op, trigger=step_trigger, npc_id=npc_id, data=data, post=post)
+
+    raw_steps = event_json.get("steps", []) or []
+    if not isinstance(raw_steps, list):
+        raise ValueError(f"Evento '{event_id}': 'steps' debe ser lista ({source})")
+
+    steps = tuple(_compile_step(s, f"steps[{i}]", allow_talk=True) for i, s in enumerate(raw_steps))
+
+    if known_npcs:
+        unknown = sorted(n for n in npc_refs if n not in known_npcs)
+        if unknown:
+            raise ValueError(f"Evento '{event_id}': NPCs desconocidos {unknown} ({source})")
+
+    map_id = event_json.get("map")
+    ev_npc = event_json.get("npc_id")
+    trigger_id = event_json.get("trigger_id")
+
+    ambient = bool(event_json.get("ambient", False))
+    if ambient:
+        bad = sorted({st.op for st in steps if st.op not in AMBIENT_STEP_TYPES or st.trigger != "auto"})
+        if bad:
+            raise ValueError(f"Evento '{event_id}': ambient no soporta steps {bad} ({source})")
+
+    if trigger == "talk" and not ev_npc:
+        raise ValueError(f"Evento '{event_id}': trigger=talk requiere 'npc_id' ({source})")
+    if trigger == "map" and not trigger_id:
+        raise ValueError(f"Evento '{event_id}': trigger=map requiere 'trigger_id' ({source})")
+
+    return CompiledEvent(
+        event_id=event_id,
+        source=source,
+        trigger=trigger,
+        once_flag=event_json.get("once_flag") or None,
+        map_id=normalize_map_id(map_id) if map_id else None,
+        npc_id=str(ev_npc) if ev_npc else None,
+        trigger_id=str(trigger_id) if trigger_id else None,
+        ambient=ambient,
+        loop=bool(event_json.get("loop", False)) and ambient,
+        steps=steps,
+        npc_refs=frozenset(npc_refs),
+        marker_refs=frozenset(marker_refs),
+    )
+
+
+class EventRegistry:
+    """
+    Registro de eventos JSON (assets/data/events).
+
+    - Descubre todos los .json del directorio la primera vez que se consulta
+    - Indexa por trigger del evento:
+        auto  -> por mapa
+        talk  -> por npc_id
+        map   -> por trigger_id (objetos de la capa "triggers" en Tiled)
+    - Compila cada evento recién cuando se pide (lazy) y lo cachea
+    - Un evento inválido (JSON roto, duplicado, steps/NPCs que no validan) se
+      reporta con [EVENT] ❌ y se descarta: las consultas lo tratan como
+      inexistente en vez de cortar el juego con una excepción
+
+    Así disparar un evento durante el juego es un lookup en dict, sin leer JSON.
+    """
+
+    def __init__(self, events_dir: str | None = None):
+        self.events_dir = events_dir or asset_path("data", "events")
+
+        self._scanned = False
+        self._raw: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._compiled: Dict[str, CompiledEvent] = {}
+
+        self._auto_by_map: Dict[str, List[str]] = {}
+        self._talk_by_npc: Dict[str, List[str]] = {}
+        self._by_trigger_id: Dict[str, str] = {}
+
+        self._known_npcs: FrozenSet[str] = frozenset()
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def get(self, event_id: str) -> Optional[CompiledEvent]:
+        self._ensure_scanned()
+
+        ev = self._compiled.get(event_id)
+        if ev is not None:
+            return ev
+
+        entry = self._raw.get(event_id)
+        if entry is None:
+            return None
+
+        path, data = entry
+        # el JSON crudo ya no hace falta (y uno inválido no se reintenta)
+        del self._raw[event_id]
+        try:
+            ev = compile_event(data, source=path, known_npcs=self._known_npcs)
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"[EVENT] ❌ {event_id}: {e}")
+            return None
+        self._compiled[event_id] = ev
+        return ev
+
+    def auto_events(self, map_id: Any) -> List[CompiledEvent]:
+        """Eventos trigger=auto del mapa (los sin 'map' aplican a todos), incluidos los ambient."""
+        self._ensure_scanned()
+        ids = self._auto_by_map.get(normalize_map_id(map_id), []) + self._auto_by_map.get("*", [])
+        return [ev for ev in (self.get(i) for i in ids) if ev is not None]
+
+    def talk_events(self, npc_id: str, map_id: Any = None) -> List[CompiledEvent]:
+        self._ensure_scanned()
+        out = []
+        map_key = normalize_map_id(map_id) if map_id is not None else None
+        for i in self._talk_by_npc.get(str(npc_id), []):
+            ev = self.get(i)
+            if ev is None:
+                continue
+            if ev.map_id and map_key and ev.map_id != map_key:
+                continue
+            out.append(ev)
+        return out
+
+    def trigger_event(self, trigger_id: str) -> Optional[CompiledEvent]:
+        self._ensure_scanned()
+        event_id = self._by_trigger_id.get(str(trigger_id))
+        return self.get(event_id) if event_id else None
+
+    def event_ids(self) -> List[str]:
+        self._ensure_scanned()
+        return sorted(set(self._raw) | set(self._compiled))
+
+    # -------------------------
+    # Discovery
+    # -------------------------
+    def _ensure_scanned(self) -> None:
+        if self._scanned:
+            return
+        self._scanned = True
+
+        self._known_npcs = _known_npc_ids()
+
+        if not is_asset_dir(self.events_dir):
+            return
+
+        for name in list_assets(self.events_dir):
+            if not name.lower().endswith(".json"):
+                continue
+
+            path = os.path.join(self.events_dir, name)
+            try:
+                data = load_json_asset(path) or {}
+            except (OSError, ValueError) as e:
+                print(f"[EVENT] ❌ Evento con JSON inválido: {path} ({e})")
+                continue
+
+            event_id = str(data.get("id") or os.path.splitext(name)[0])
+            if event_id in self._raw:
+                print(f"[EVENT] ❌ Evento duplicado '{event_id}': {path} y {self._raw[event_id][0]} (se ignora el segundo)")
+                continue
+            self._raw[event_id] = (path, data)
+
+            trigger = str(data.get("trigger") or "manual").lower()
+            if trigger == "auto":
+                map_key = normalize_map_id(data["map"]) if data.get("map") else "*"
+                self._auto_by_map.setdefault(map_key, []).append(event_id)
+            elif trigger == "talk" and data.get("npc_id"):
+                self._talk_by_npc.setdefault(str(data["npc_id"]), []).append(event_id)
+            elif trigger == "map" and data.get("trigger_id"):
+                self._by_trigger_id[str(data["trigger_id"])] = event_id
+
+
+_registry: Optional[EventRegistry] = None
+
+
+def get_event_registry() -> EventRegistry:
+    """Registry compartido por todos los WorldState (se escanea una sola vez)."""
+    global _registry
+    if _registry is None:
+        _registry = EventRegistry()
+    return _registry
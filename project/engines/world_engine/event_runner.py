@@ -2,12 +2,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from engines.world_engine.event_registry import CompiledEvent, CompiledStep, compile_event
+from engines.world_engine.event_scheduler import Task, WaitFlag, WaitTime, WaitUnitArrived
 
 
 @dataclass
 class Waiting:
-    kind: str  # "dialogue" | "talk_block" | "assign_roles"
+    kind: str  # "dialogue" | "talk_block" | "assign_roles" | "scheduler"
 
 
 class EventRunner:
@@ -22,6 +25,12 @@ class EventRunner:
         que se ejecutan inmediatamente después de cerrar el diálogo de ese NPC.
       - assign_roles soporta: npc_from="last_talk"
         para aplicar el menú al NPC con el que recién hablaste.
+      - wait / wait_flag / walk_to_marker esperan en ws.scheduler
+        (un task que despierta al runner, sin polling por frame).
+
+    Los eventos llegan compilados (EventRegistry): cada step ya tiene su "op"
+    normalizado y se despacha por tabla (self._ops) en vez de una cadena de ifs.
+    Un dict JSON suelto también se acepta (se compila al vuelo).
 
     Requisitos en WorldState:
       - ws.input_locked: bool
@@ -29,59 +38,86 @@ class EventRunner:
       - ws.start_assign_roles(step_dict)   ✅ (Paso 5)
       - ws.game.game_state.get_flag / set_flag
       - ws._event_assignments (dict)
+      - ws.scheduler (EventScheduler) y ws.npc_system
     """
 
     def __init__(self, ws: Any):
         self.ws = ws
         self.active: bool = False
 
+        self.event_id: Optional[str] = None
         self._once_flag: Optional[str] = None
-        self._steps: List[Dict[str, Any]] = []
+        self._steps: Tuple[CompiledStep, ...] = ()
         self._idx: int = 0
 
         self._waiting: Optional[Waiting] = None
 
         # talk_block: npc_id -> step(dialogue talk)
-        self._talk_pending: Dict[str, Dict[str, Any]] = {}
+        self._talk_pending: Dict[str, CompiledStep] = {}
 
         # contexto del evento (genérico)
         self._ctx: Dict[str, Any] = {}
 
         # cola de pasos post-diálogo (para "después de hablar con X")
-        self._post_queue: List[Dict[str, Any]] = []
+        self._post_queue: List[CompiledStep] = []
+
+        # markers del evento resueltos contra el mapa al arrancar
+        self._markers: Dict[str, Tuple[int, int]] = {}
+
+        # task del scheduler que nos va a despertar (wait / wait_flag / walk_to_marker)
+        self._wait_task: Optional[Task] = None
+
+        # dispatch table: op -> handler (los de SHARED_OPS son los mismos que usan los ambient)
+        self._ops: Dict[str, Callable[[CompiledStep], None]] = {op: self._op_shared for op in SHARED_OPS}
+        self._ops.update({
+            "dialogue": self._op_dialogue,
+            "assign_roles": self._op_assign_roles,
+            "apply_role_outcomes": self._op_apply_role_outcomes,
+            "apply_role_spawns": self._op_apply_role_spawns,
+        })
 
     # -------------------------
     # Lifecycle
     # -------------------------
     def reset(self) -> None:
+        self._cancel_wait_task()
         self.active = False
+        self.event_id = None
         self._once_flag = None
-        self._steps = []
+        self._steps = ()
         self._idx = 0
         self._waiting = None
         self._talk_pending = {}
         self._ctx = {}
         self._post_queue = []
+        self._markers = {}
 
-    def start(self, event_json: Dict[str, Any]) -> None:
+    def start(self, event: CompiledEvent | Dict[str, Any]) -> None:
         self.reset()
 
-        event_json = event_json or {}
-        self._once_flag = event_json.get("once_flag")
+        if not isinstance(event, CompiledEvent):
+            event = compile_event(event or {})
+
+        self.event_id = event.event_id
+        self._once_flag = event.once_flag
 
         if self._once_flag and self.ws.game.game_state.get_flag(self._once_flag, False):
             self.ws.input_locked = False
             return
 
-        self._steps = list(event_json.get("steps", []) or [])
+        self._steps = event.steps
         self._idx = 0
         self.active = True
         self.ws.input_locked = True
 
+        # resolver markers una sola vez (no en cada step)
+        ws_markers = getattr(self.ws, "markers", {}) or {}
+        self._markers = {m: ws_markers[m] for m in event.marker_refs if m in ws_markers}
+
         # Pre-scan útil para tu assign_roles/outcomes
         for step in self._steps:
-            if step.get("type") == "apply_role_outcomes":
-                self.ws._event_apply_role_outcomes_step = step
+            if step.op == "apply_role_outcomes":
+                self.ws._event_apply_role_outcomes_step = step.data
 
         self.advance()
 
@@ -104,9 +140,8 @@ class EventRunner:
                 return
 
             step = self._steps[self._idx]
-            trigger = (step.get("trigger") or "auto").lower()
 
-            if trigger == "talk":
+            if step.trigger == "talk":
                 self._enter_talk_block()
                 return
 
@@ -118,13 +153,11 @@ class EventRunner:
 
         while self._idx < len(self._steps):
             step = self._steps[self._idx]
-            trigger = (step.get("trigger") or "auto").lower()
-            if trigger != "talk":
+            if step.trigger != "talk":
                 break
 
-            npc_id = step.get("npc_id")
-            if npc_id:
-                self._talk_pending[str(npc_id)] = step
+            if step.npc_id:
+                self._talk_pending[step.npc_id] = step
 
             self._idx += 1
 
@@ -154,7 +187,7 @@ class EventRunner:
         self._ctx["last_talk_npc_id"] = str(npc_id)
 
         # Programar post-steps (si existen)
-        self._post_queue = list(step.get("post", []) or [])
+        self._post_queue = list(step.post)
 
         # Bloquear input mientras dura el diálogo / UI
         self.ws.input_locked = True
@@ -170,22 +203,7 @@ class EventRunner:
 
         if self._waiting and self._waiting.kind == "dialogue":
             self._waiting = None
-
-            # 1) Si hay post-steps, ejecutar el siguiente inmediatamente
-            if self._post_queue:
-                next_step = self._post_queue.pop(0)
-                self._exec_step(next_step)
-                return
-
-            # 2) Si todavía quedan talk pendientes del bloque, soltar input y esperar más interacciones
-            if self._talk_pending:
-                self.ws.input_locked = False
-                self._waiting = Waiting(kind="talk_block")
-                return
-
-            # 3) Si no quedan talks, seguir con auto-steps
-            self.ws.input_locked = True
-            self.advance()
+            self._resume()
 
     def on_assign_roles_done(self, assignments: Dict[str, str]) -> None:
         if not self.active:
@@ -201,28 +219,35 @@ class EventRunner:
 
         if self._waiting and self._waiting.kind == "assign_roles":
             self._waiting = None
+            self._resume()
 
-            # 1) Si hay más post-steps, ejecutarlos ya
+    def _resume(self) -> None:
+        """Sigue el evento después de una espera (diálogo, assign_roles, scheduler)."""
+        while self.active and self._waiting is None:
+            # 1) Si hay post-steps, ejecutar el siguiente inmediatamente
             if self._post_queue:
                 next_step = self._post_queue.pop(0)
                 self.ws.input_locked = True
                 self._exec_step(next_step)
-                return
+                continue
 
-            # 2) Si quedan NPCs por hablar en el talk_block, soltar input
+            # 2) Si todavía quedan talk pendientes del bloque, soltar input y esperar más interacciones
             if self._talk_pending:
                 self.ws.input_locked = False
                 self._waiting = Waiting(kind="talk_block")
                 return
 
-            # 3) Continuar el evento
+            # 3) Si no quedan talks, seguir con auto-steps
             self.ws.input_locked = True
             self.advance()
+            return
 
     # -------------------------
     # Finish
     # -------------------------
     def finish(self) -> None:
+        self._cancel_wait_task()
+
         if self._once_flag:
             self.ws.game.game_state.set_flag(self._once_flag, True)
 
@@ -236,93 +261,113 @@ class EventRunner:
     # -------------------------
     # Step execution
     # -------------------------
-    def _exec_step(self, step: Dict[str, Any]) -> None:
-        t = (step.get("type") or "").lower()
-
-        if t == "dialogue":
-            speaker = step.get("speaker", "")
-            lines = step.get("lines", []) or []
-            options = step.get("options") or step.get("choices") or None
-
-            self.ws.open_dialogue(
-                speaker,
-                lines,
-                options=options,
-                context={
-                    "event": "json_event",
-                    "after_dialogue": self.on_dialogue_closed,
-                },
-            )
-            self._waiting = Waiting(kind="dialogue")
-            return
+    def _exec_step(self, step: CompiledStep) -> None:
+        handler = self._ops.get(step.op)
+        if handler is not None:
+            handler(step)
+
+    def _op_dialogue(self, step: CompiledStep) -> None:
+        data = step.data
+        speaker = data.get("speaker", "")
+        lines = data.get("lines", []) or []
+        options = data.get("options") or data.get("choices") or None
+
+        self.ws.open_dialogue(
+            speaker,
+            lines,
+            options=options,
+            context={
+                "event": "json_event",
+                "after_dialogue": self.on_dialogue_closed,
+            },
+        )
+        self._waiting = Waiting(kind="dialogue")
+
+    def _op_assign_roles(self, step: CompiledStep) -> None:
+        # soporte npc_from:"last_talk"
+        data = dict(step.data)
+
+        if data.get("npc_from") == "last_talk":
+            npc_id = self._ctx.get("last_talk_npc_id")
+            if not npc_id:
+                return
+            data["npcs"] = [npc_id]
 
-        if t == "assign_roles":
-            # soporte npc_from:"last_talk"
-            step = dict(step)
-            npc_from = step.get("npc_from")
+        # ✅ Paso 5: delegar al AssignRolesSystem del WorldState
+        self.ws.start_assign_roles(data)
 
-            if npc_from == "last_talk":
-                npc_id = self._ctx.get("last_talk_npc_id")
-                if npc_id:
-                    step["npcs"] = [npc_id]
-                else:
-                    return
+        self._waiting = Waiting(kind="assign_roles")
 
-            # ✅ Paso 5: delegar al AssignRolesSystem del WorldState
-            # antes: self.ws._start_assign_roles(step)
-            self.ws.start_assign_roles(step)
+    def _op_shared(self, step: CompiledStep) -> None:
+        """Op de SHARED_OPS: si devuelve una espera, el evento se duerme en el scheduler."""
+        wait = SHARED_OPS[step.op](self.ws, step, self._markers)
+        if wait is not None:
+            self._wait_on(wait)
 
-            self._waiting = Waiting(kind="assign_roles")
-            return
+    def _op_apply_role_outcomes(self, step: CompiledStep) -> None:
+        self.ws._event_apply_role_outcomes_step = step.data
 
-        if t == "set_flag":
-            flag_name = step.get("flag") or step.get("name")
-            if flag_name:
-                self.ws.game.game_state.set_flag(str(flag_name), step.get("value", True))
+    def _op_apply_role_spawns(self, step: CompiledStep) -> None:
+        role_to_marker = step.data.get("role_to_marker", {}) or {}
+        if not role_to_marker:
             return
 
-        if t == "apply_role_outcomes":
-            self.ws._event_apply_role_outcomes_step = step
+        # ✅ FIX: ahora los runtime NPCs viven en ws.npc_system.units
+        npc_system = getattr(self.ws, "npc_system", None)
+        if not npc_system:
             return
 
-        if t == "apply_role_spawns":
-            role_to_marker = step.get("role_to_marker", {}) or {}
-            if not role_to_marker:
-                return
-
-            # Agrupar por "base role": soldier_1/soldier_2 -> soldier
-            buckets: Dict[str, List[str]] = {}
-            for role_key, marker_id in role_to_marker.items():
-                base = str(role_key).split("_", 1)[0]
-                buckets.setdefault(base, []).append(str(marker_id))
+        # Agrupar por "base role": soldier_1/soldier_2 -> soldier
+        buckets: Dict[str, List[str]] = {}
+        for role_key, marker_id in role_to_marker.items():
+            base = str(role_key).split("_", 1)[0]
+            buckets.setdefault(base, []).append(str(marker_id))
 
-            assignments = dict(getattr(self.ws, "_event_assignments", {}) or {})
-            for npc_id, role in assignments.items():
-                base = str(role).split("_", 1)[0]
-                if base not in buckets or not buckets[base]:
-                    continue
+        assignments = dict(getattr(self.ws, "_event_assignments", {}) or {})
+        for npc_id, role in assignments.items():
+            base = str(role).split("_", 1)[0]
+            if base not in buckets or not buckets[base]:
+                continue
 
-                marker_id = buckets[base].pop(0)
-                target = getattr(self.ws, "markers", {}).get(marker_id)
-                if not target:
-                    continue
+            marker_id = buckets[base].pop(0)
+            target = self._markers.get(marker_id)
+            if not target:
+                continue
 
-                # ✅ FIX: ahora los runtime NPCs viven en ws.npc_system.units
-                unit = getattr(self.ws, "npc_system", None)
-                if not unit:
-                    continue
+            u = npc_system.units.get(npc_id)
+            if not u:
+                continue
 
-                u = self.ws.npc_system.units.get(npc_id)
-                if not u:
-                    continue
-
-                u.tile_x, u.tile_y = target
-                u.pixel_x = target[0] * self._tile_size()
-                u.pixel_y = target[1] * self._tile_size()
+            u.tile_x, u.tile_y = target
+            u.pixel_x = target[0] * self._tile_size()
+            u.pixel_y = target[1] * self._tile_size()
 
+    # -------------------------
+    # Esperas en el scheduler
+    # -------------------------
+    def _wait_on(self, wait: Any) -> None:
+        scheduler = getattr(self.ws, "scheduler", None)
+        if scheduler is None:
             return
 
-        return
+        def _waiter():
+            yield wait
+            self._wait_task = None
+            if self._waiting and self._waiting.kind == "scheduler":
+                self._waiting = None
+                self._resume()
+
+        self._waiting = Waiting(kind="scheduler")
+        task = scheduler.spawn(_waiter(), name=f"event:{self.event_id}")
+        # si la espera ya se cumplió, el task terminó dentro de spawn()
+        if not task.done:
+            self._wait_task = task
+
+    def _cancel_wait_task(self) -> None:
+        task, self._wait_task = self._wait_task, None
+        scheduler = getattr(self.ws, "scheduler", None)
+        if task is not None and scheduler is not None:
+            scheduler.cancel(task)
 
     def _tile_size(self) -> int:
         try:
@@ -330,3 +375,157 @@ class EventRunner:
             return int(TILE_SIZE)
         except Exception:
             return 32
+
+
+# -------------------------
+# Ops compartidos (runner de eventos + scripts ambient)
+# -------------------------
+def apply_set_flag(ws: Any, step: CompiledStep) -> None:
+    flag_name = step.data.get("flag") or step.data.get("name")
+    if flag_name:
+        ws.game.game_state.set_flag(str(flag_name), step.data.get("value", True))
+
+
+def apply_remember(ws: Any, step: CompiledStep) -> None:
+    """
+    Step remember: {tag, strength?, npcs?, heard_by?}
+      - npcs: quienes lo vieron (default: los NPCs runtime del mapa, sin guardaespaldas)
+      - heard_by: quienes se enteran de oídas
+    """
+    gs = ws.game.game_state
+    tag = str(step.data["tag"])
+    strength = float(step.data.get("strength", 1.0))
+
+    witnesses = _witnesses(ws, step)
+    gs.remember(witnesses, tag, strength)
+
+    heard_by = [str(n) for n in step.data.get("heard_by", []) or [] if n not in witnesses]
+    if heard_by:
+        gs.remember(heard_by, tag, strength, witnessed=False)
+
+
+def apply_decision(ws: Any, step: CompiledStep) -> None:
+    """
+    Step decision: {axes: {eje: impulso}, tags?, magnitude?, npcs?, heard_by?}
+    Impulso sobre la moralidad/confianza de la población (core/world/morality.py):
+      - npcs: quienes lo vieron (default: los NPCs runtime del mapa)
+      - heard_by: quienes se enteran de oídas (default: todos los demás)
+    """
+    gs = ws.game.game_state
+    witnesses = _witnesses(ws, step)
+    heard_by = step.data.get("heard_by")
+    if heard_by is None:
+        sim = gs.morality()
+        heard_by = [n for n in sim.ids if n not in witnesses] if sim is not None else []
+    gs.decide(
+        dict(step.data.get("axes", {}) or {}),
+        tags=[str(t) for t in step.data.get("tags", []) or []],
+        magnitude=float(step.data.get("magnitude", 1.0)),
+        witnesses=witnesses,
+        heard_by=[str(n) for n in heard_by],
+    )
+
+
+def apply_build(ws: Any, step: CompiledStep) -> None:
+    """
+    Step build: {building, type?, workers?}
+      - si el edificio no existe se empieza a construir (type requerido)
+      - si existe, se mejora al siguiente nivel (workers reemplaza los asignados)
+    """
+    gs = ws.game.game_state
+    building_id = str(step.data["building"])
+    workers = step.data.get("workers")
+    if building_id in gs.buildings:
+        gs.buildings.upgrade(gs, building_id, workers=workers)
+    else:
+        gs.buildings.start(gs, building_id, str(step.data.get("type") or building_id), workers or [])
+
+
+def _witnesses(ws: Any, step: CompiledStep) -> list:
+    """step.npcs, o los NPCs runtime del mapa (sin guardaespaldas)."""
+    witnesses = step.data.get("npcs")
+    if witnesses is None:
+        prefix = getattr(ws, "_bg_prefix", "bg__")
+        witnesses = [n for n in ws.npc_system.units if not n.startswith(prefix)]
+    return [str(n) for n in witnesses]
+
+
+def start_walk_to_marker(ws: Any, step: CompiledStep, markers: Dict[str, Tuple[int, int]]) -> Optional[WaitUnitArrived]:
+    """
+    Arranca un walk_to de NPCSystem hacia el marker del step.
+
+    Devuelve la espera de llegada, o None si el NPC/marker no existen en este mapa.
+    """
+    npc_system = getattr(ws, "npc_system", None)
+    target = markers.get(str(step.data.get("marker")))
+    if npc_system is None or target is None or step.npc_id not in npc_system.units:
+        return None
+
+    npc_system.set_walk_to(step.npc_id, target, bool(step.data.get("despawn_on_arrival", False)))
+    return WaitUnitArrived(step.npc_id)
+
+
+# op -> handler(ws, step, markers) -> espera del scheduler o None.
+# Una sola implementación por op: EventRunner la despacha desde self._ops y
+# ambient_script hace yield de la espera.
+def _op_wait(ws: Any, step: CompiledStep, markers) -> WaitTime:
+    return WaitTime(float(step.data.get("seconds", 0)))
+
+
+def _op_wait_flag(ws: Any, step: CompiledStep, markers) -> WaitFlag:
+    return WaitFlag(str(step.data["flag"]), step.data.get("value", True))
+
+
+def _op_walk_to_marker(ws: Any, step: CompiledStep, markers) -> Optional[WaitUnitArrived]:
+    wait = start_walk_to_marker(ws, step, markers)
+    return wait if step.data.get("wait", True) else None
+
+
+def _no_wait(apply: Callable[[Any, CompiledStep], None]):
+    def op(ws: Any, step: CompiledStep, markers) -> None:
+        apply(ws, step)
+    return op
+
+
+SHARED_OPS: Dict[str, Callable[[Any, CompiledStep, Dict[str, Tuple[int, int]]], Any]] = {
+    "set_flag": _no_wait(apply_set_flag),
+    "wait": _op_wait,
+    "wait_flag": _op_wait_flag,
+    "walk_to_marker": _op_walk_to_marker,
+    "remember": _no_wait(apply_remember),
+    "decision": _no_wait(apply_decision),
+    "build": _no_wait(apply_build),
+}
+
+
+def ambient_script(ws: Any, event: CompiledEvent):
+    """
+    Script (generator) que interpreta un evento ambient=true.
+
+    No bloquea input ni abre diálogos: sólo los ops de SHARED_OPS (ver AMBIENT_STEP_TYPES).
+    Si el evento tiene "loop": true, se repite hasta que cambie el mapa.
+    """
+    gs = ws.game.game_state
+    ws_markers = getattr(ws, "markers", {}) or {}
+    markers = {m: ws_markers[m] for m in event.marker_refs if m in ws_markers}
+
+    while True:
+        if event.once_flag and gs.get_flag(event.once_flag, False):
+            return
+
+        for step in event.steps:
+            handler = SHARED_OPS.get(step.op)
+            if handler is None:
+                continue
+            wait = handler(ws, step, markers)
+            if wait is not None:
+                yield wait
+
+        if event.once_flag:
+            gs.set_flag(event.once_flag, True)
+
+        if not event.loop:
+            return
+
+        # un loop sin esperas colgaría el frame: como mínimo cede un frame
+        yield None
@@ -0,0 +1,266 @@
+# project/engines/world_engine/event_scheduler.py
+from __future__ import annotations
+
+import heapq
+import itertools
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Generator, List, Optional, Tuple
+
+
+# -------------------------
+# Wait primitives (lo que un script hace "yield")
+# -------------------------
+@dataclass(frozen=True)
+class WaitTime:
+    seconds: float
+
+
+@dataclass(frozen=True)
+class WaitDialogueClosed:
+    pass
+
+
+@dataclass(frozen=True)
+class WaitUnitArrived:
+    unit_id: str
+
+
+@dataclass(frozen=True)
+class WaitFlag:
+    flag: str
+    value: Any = True
+
+
+Script = Generator[Any, Any, None]
+
+
+class Task:
+    """Un script corriendo en el scheduler (wrapper de un generator)."""
+
+    __slots__ = ("gen", "name", "done", "_token", "_wait_key")
+
+    def __init__(self, gen: Script, name: str = ""):
+        self.gen = gen
+        self.name = name
+        self.done = False
+        # se incrementa cada vez que el task se estaciona; invalida timers viejos
+        self._token = 0
+        # clave de _waiters donde está estacionado (para sacarlo al cancelar)
+        self._wait_key: Optional[Tuple[str, str]] = None
+
+    def __repr__(self) -> str:
+        return f"Task({self.name or '?'}, done={self.done})"
+
+
+class EventScheduler:
+    """
+    Scheduler cooperativo de scripts (generators) para eventos y NPCs ambientales.
+
+    Un script hace `yield` de una primitiva de espera y se despierta cuando:
+      - WaitTime(s)            -> pasa el tiempo (heap de timers, sólo se miran los vencidos)
+      - WaitDialogueClosed()   -> notify_dialogue_closed()
+      - WaitUnitArrived(id)    -> notify_arrival(id, arrived) (el yield devuelve arrived:
+                                  False si el camino se abandonó o la unidad se fue)
+      - WaitFlag(flag, value)  -> notify_flag(flag, value)
+      - None                   -> el próximo frame
+
+    Los scripts dormidos no cuestan nada por frame: no se recorren en update(),
+    sólo se despiertan por notificación o cuando vence su timer.
+    """
+
+    def __init__(self, get_flag: Optional[Callable[[str, Any], Any]] = None):
+        self.time = 0.0
+        self._get_flag = get_flag
+
+        self._seq = itertools.count()
+        self._timers: List[Tuple[float, int, int, Task]] = []
+        self._waiters: Dict[Tuple[str, str], List[Tuple[Task, Any]]] = {}
+        self._next_frame: List[Task] = []
+
+        self._ready: Deque[Tuple[Task, Any]] = deque()
+        self._draining = False
+
+        self.tasks: List[Task] = []
+
+    # -------------------------
+    # API
+    # -------------------------
+    def spawn(self, gen: Script, name: str = "") -> Task:
+        """Registra un script y lo corre hasta su primer yield."""
+        task = Task(gen, name=name)
+        self.tasks.append(task)
+        self._ready.append((task, None))
+        self._drain()
+        return task
+
+    def cancel(self, task: Optional[Task]) -> None:
+        if task is None or task.done:
+            return
+        task.done = True
+        task._token += 1
+        try:
+            task.gen.close()
+        except Exception:
+            pass
+        self._forget(task)
+
+    def cancel_all(self) -> None:
+        for task in list(self.tasks):
+            self.cancel(task)
+        self._timers = []
+        self._waiters = {}
+        self._next_frame = []
+        self._ready.clear()
+
+    def update(self, dt: float) -> None:
+        self.time += dt
+
+        if self._next_frame:
+            frame, self._next_frame = self._next_frame, []
+            for task in frame:
+                self._ready.append((task, None))
+
+        timers = self._timers
+        while timers and timers[0][0] <= self.time:
+            _, _, token, task = heapq.heappop(timers)
+            if task.done or token != task._token:
+                continue
+            self._ready.append((task, None))
+
+        self._drain()
+
+    # -------------------------
+    # Notificaciones
+    # -------------------------
+    def notify_dialogue_closed(self) -> None:
+        self._notify(("dialogue", ""), None)
+
+    def notify_arrival(self, unit_id: str, arrived: bool = True) -> None:
+        self._notify(("arrived", str(unit_id)), bool(arrived))
+
+    def notify_flag(self, flag: str, value: Any) -> None:
+        self._notify(("flag", str(flag)), value)
+
+    def resync_flags(self) -> None:
+        """
+        Re-evalúa los WaitFlag contra el valor actual (get_flag).
+        Para schedulers suspendidos (WorldState en el pool): los set_flag de
+        otro mapa no les llegaron por notificación.
+        """
+        if self._get_flag is None:
+            return
+        for _, flag in [k for k in self._waiters if k[0] == "flag"]:
+            self.notify_flag(flag, self._get_flag(flag, None))
+
+    def has_task(self, name: str) -> bool:
+        return any(t.name == name and not t.done for t in self.tasks)
+
+    @property
+    def active_count(self) -> int:
+        return len(self.tasks)
+
+    # -------------------------
+    # Internals
+    # -------------------------
+    def _notify(self, key: Tuple[str, str], value: Any) -> None:
+        waiting = self._waiters.pop(key, None)
+        if not waiting:
+            return
+
+        keep = []
+        for task, wait in waiting:
+            if task.done:
+                continue
+            if isinstance(wait, WaitFlag) and wait.value != value:
+                keep.append((task, wait))
+                continue
+            task._wait_key = None
+            self._ready.append((task, value))
+
+        if keep:
+            self._waiters.setdefault(key, []).extend(keep)
+
+        self._drain()
+
+    def _drain(self) -> None:
+        # evita re-entrar: un script que notifica (ej: set_flag) encola, no anida
+        if self._draining:
+            return
+        self._draining = True
+        try:
+            while self._ready:
+                task, value = self._ready.popleft()
+                if task.done:
+                    continue
+                self._step(task, value)
+        finally:
+            self._draining = False
+
+    def _step(self, task: Task, value: Any) -> None:
+        task._token += 1
+        try:
+            wait = task.gen.send(value)
+        except StopIteration:
+            self._finish(task)
+            return
+        except Exception as e:
+            print(f"[SCHEDULER] Script '{task.name}' falló: {e}")
+            self._finish(task)
+            return
+
+        self._park(task, wait)
+
+    def _park(self, task: Task, wait: Any) -> None:
+        if wait is None:
+            self._next_frame.append(task)
+            return
+
+        if isinstance(wait, WaitTime):
+            if wait.seconds <= 0:
+                self._next_frame.append(task)
+                return
+            heapq.heappush(self._timers, (self.time + float(wait.seconds), next(self._seq), task._token, task))
+            return
+
+        if isinstance(wait, WaitDialogueClosed):
+            self._wait(task, ("dialogue", ""), wait)
+            return
+
+        if isinstance(wait, WaitUnitArrived):
+            self._wait(task, ("arrived", str(wait.unit_id)), wait)
+            return
+
+        if isinstance(wait, WaitFlag):
+            # si ya se cumple, no hace falta esperar la notificación
+            if self._get_flag is not None and self._get_flag(wait.flag, None) == wait.value:
+                self._ready.append((task, wait.value))
+                return
+            self._wait(task, ("flag", str(wait.flag)), wait)
+            return
+
+        print(f"[SCHEDULER] Script '{task.name}' hizo yield de algo desconocido: {wait!r}")
+        self._finish(task)
+
+    def _wait(self, task: Task, key: Tuple[str, str], wait: Any) -> None:
+        task._wait_key = key
+        self._waiters.setdefault(key, []).append((task, wait))
+
+    def _finish(self, task: Task) -> None:
+        task.done = True
+        task._token += 1
+        self._forget(task)
+
+    def _forget(self, task: Task) -> None:
+        try:
+            self.tasks.remove(task)
+        except ValueError:
+            pass
+
+        # sacarlo de la lista de espera (si no, los waiters de tasks cancelados se acumulan)
+        key, task._wait_key = task._wait_key, None
+        waiting = self._waiters.get(key) if key is not None else None
+        if waiting:
+            waiting[:] = [(t, w) for t, w in waiting if t is not task]
+            if not waiting:
+                del self._waiters[key]
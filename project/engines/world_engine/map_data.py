@@ -1,6 +1,6 @@
 # project/engines/world_engine/map_data.py
 
-import json
+from core.assets import load_json_asset
 
 
 class MapData:
@@ -14,17 +14,17 @@ class MapData:
       - load_markers() (usa objectgroup "markers" y property "id")
     """
 
-    def __init__(self, json_path: str, tile_size: int):
+    def __init__(self, json_path: str, tile_size: int, data: dict | None = None):
         self.json_path = json_path
         self.tile_size = tile_size
 
-        self._map_json_cache = None
+        # data: JSON ya cargado (mapas en streaming pasan su meta, sin las tilelayers)
+        self._map_json_cache = data
         self._objectgroups_cache: dict[str, list[dict]] = {}
 
     def load_json(self) -> dict:
         if self._map_json_cache is None:
-            with open(self.json_path, "r", encoding="utf-8") as f:
-                self._map_json_cache = json.load(f)
+            self._map_json_cache = load_json_asset(self.json_path)
         return self._map_json_cache
 
     def get_objectgroup(self, layer_name: str) -> list[dict]:
@@ -1,22 +1,39 @@
-import json
 import os
 import pygame
 import xml.etree.ElementTree as ET
 
+from core.assets import asset_exists, asset_key, load_json_asset, open_asset
+from render.world.atlas import get_atlas, tile_key
+from render.world.memory import surface_bytes
+
 # Bits de flipping de Tiled (GID)
 FLIP_H = 0x80000000
 FLIP_V = 0x40000000
 FLIP_D = 0x20000000
 GID_MASK = 0x1FFFFFFF
 
+COLLISION_LAYERS = ("colission", "collision")
+
+
+def object_tiles(obj: dict, tilewidth: int, tileheight: int):
+    """Tiles (tx, ty) que cubre un rectángulo de un objectgroup de Tiled."""
+    x0 = int(obj["x"] // tilewidth)
+    y0 = int(obj["y"] // tileheight)
+    w = int((obj["width"] + obj["x"] % tilewidth) // tilewidth)
+    h = int((obj["height"] + obj["y"] % tileheight) // tileheight)
+    for dx in range(w):
+        for dy in range(h):
+            yield x0 + dx, y0 + dy
+
 
 class TiledMap:
-    def __init__(self, json_path: str, assets_root: str = ""):
+    def __init__(self, json_path: str, assets_root: str = "", load_tiles: bool = True, data: dict | None = None):
         self.json_path = os.path.normpath(json_path)
         self.assets_root = os.path.normpath(assets_root) if assets_root else ""
 
-        with open(self.json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        # data: JSON ya parseado (open_map lo lee una sola vez para decidir fijo/streaming)
+        if data is None:
+            data = load_json_asset(self.json_path)
 
         self.width = data["width"]
         self.height = data["height"]
@@ -35,22 +52,131 @@ class TiledMap:
         # collision: objectgroup "colission" (rectángulos bloquean tiles)
         self.collision = set()
         for layer in data.get("layers", []):
-            if layer.get("type") == "objectgroup" and layer.get("name") in ("colission", "collision"):
+            if layer.get("type") == "objectgroup" and layer.get("name") in COLLISION_LAYERS:
                 for obj in layer.get("objects", []):
-                    # Convertir el rectángulo a tiles bloqueados
-                    x0 = int(obj["x"] // self.tilewidth)
-                    y0 = int(obj["y"] // self.tileheight)
-                    w = int((obj["width"] + obj["x"] % self.tilewidth) // self.tilewidth)
-                    h = int((obj["height"] + obj["y"] % self.tileheight) // self.tileheight)
-                    for dx in range(w):
-                        for dy in range(h):
-                            tx = x0 + dx
-                            ty = y0 + dy
-                            if 0 <= tx < self.width and 0 <= ty < self.height:
-                                self.collision.add((tx, ty))
+                    for tx, ty in object_tiles(obj, self.tilewidth, self.tileheight):
+                        if 0 <= tx < self.width and 0 <= ty < self.height:
+                            self.collision.add((tx, ty))
 
         # tilesets (soporta TSX / TSJ / embebidos)
-        self.tilesets = []
+        self.tilesets = self._parse_tilesets(data)
+
+        # cache de tiles por gid real (sin bits)
+        self._gid_to_surface = {}
+        # tiles servidos desde el atlas: gid -> (página, rect). Se dibujan con blit por área.
+        self._gid_to_area = {}
+        # tiles con flip/rotación ya transformados (raw gid con bits -> surface)
+        self._flipped_cache = {}
+
+        # GIDs usados por las capas (se escanea una sola vez): sólo esos tiles se materializan
+        self._used_gids = self._scan_used_gids()
+
+        # load_tiles=False: sólo datos (lo usan las tools offline, sin display)
+        if load_tiles:
+            self._load_tiles()
+
+    # -------------------------------
+    # Public API
+    # -------------------------------
+    def is_blocked(self, x: int, y: int) -> bool:
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            return True
+        return (x, y) in self.collision
+
+    def update_streaming(self, center_x, center_y, view_w, view_h, block=False) -> None:
+        """Mapa fijo: todo está en memoria (ver StreamingTiledMap)."""
+        return None
+
+    def draw(self, screen, camera, layer_order=("ground", "objects")):
+        self.draw_region(screen, camera.x, camera.y, screen.get_rect(), layer_order)
+
+    def draw_region(self, surface, cam_x, cam_y, rect, layer_order=("ground", "objects")):
+        """
+        Dibuja sólo los tiles que tocan rect (coordenadas de surface).
+        Lo usa el renderer con scroll para repintar las franjas nuevas.
+        """
+        tw, th = self.tilewidth, self.tileheight
+        rect = pygame.Rect(rect)
+
+        # rango de tiles visibles en rect (clamp al mapa)
+        x0 = max(0, int((rect.left + cam_x) // tw))
+        y0 = max(0, int((rect.top + cam_y) // th))
+        x1 = min(self.width, int((rect.right + cam_x - 1) // tw) + 1)
+        y1 = min(self.height, int((rect.bottom + cam_y - 1) // th) + 1)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        for layer_name in layer_order:
+            grid = self.layers.get(layer_name)
+            if not grid:
+                continue
+
+            for y in range(y0, y1):
+                row = grid[y]
+                py = y * th - cam_y
+                for x in range(x0, x1):
+                    raw_gid = row[x]
+                    px = x * tw - cam_x
+
+                    area = self._gid_to_area.get(raw_gid)
+                    if area is not None:
+                        surface.blit(area[0], (px, py), area[1])
+                        continue
+
+                    tile_surf = self._get_tile_surface(raw_gid)
+                    if tile_surf is None:
+                        continue
+                    surface.blit(tile_surf, (px, py))
+
+    def used_gids(self) -> set[int]:
+        """GIDs reales (sin bits de flip) que aparecen en las capas de tiles."""
+        return set(self._used_gids)
+
+    def memory_report(self) -> dict:
+        """
+        Bytes de surfaces que retiene este mapa, por tileset.
+
+          {"tilesets": {image_key: {"tiles": n, "bytes": b}}, "flipped": b, "total": b}
+
+        Los tiles servidos desde el atlas son subsurfaces: no suman acá
+        (las páginas se cuentan una sola vez en el reporte del atlas).
+        """
+        tilesets = {}
+        total = 0
+        for ts in self.tilesets:
+            lo = ts["firstgid"]
+            hi = lo + ts["tilecount"]
+            tiles = 0
+            size = 0
+            for gid, surf in self._gid_to_surface.items():
+                if lo <= gid < hi:
+                    tiles += 1
+                    size += surface_bytes(surf)
+            for gid in self._gid_to_area:
+                if lo <= gid < hi and gid not in self._gid_to_surface:
+                    tiles += 1
+            tilesets[asset_key(ts["image"])] = {"tiles": tiles, "bytes": size}
+            total += size
+
+        flipped = sum(surface_bytes(s) for s in self._flipped_cache.values())
+        total += flipped
+        return {"tilesets": tilesets, "flipped": flipped, "total": total}
+
+    # -------------------------------
+    # Internal helpers
+    # -------------------------------
+    def _scan_used_gids(self) -> frozenset[int]:
+        used = set()
+        for grid in self.layers.values():
+            for row in grid:
+                used.update(row)
+        out = {raw & GID_MASK for raw in used}
+        out.discard(0)
+        return frozenset(out)
+
+    def _parse_tilesets(self, data: dict) -> list[dict]:
+        """Tilesets del mapa (TSX / TSJ / embebidos), con la imagen resuelta a path absoluto."""
+        tilesets = []
         for ts in data.get("tilesets", []):
             firstgid = ts["firstgid"]
 
@@ -85,7 +211,7 @@ class TiledMap:
                 # lo dejamos en 0: el _load_tiles evitará división por 0.
                 pass
 
-            self.tilesets.append({
+            tilesets.append({
                 "firstgid": firstgid,
                 "image": image_abs,
                 "tilewidth": tw,
@@ -95,41 +221,8 @@ class TiledMap:
                 "margin": margin,
                 "spacing": spacing,
             })
+        return tilesets
 
-        # cache de tiles por gid real (sin bits)
-        self._gid_to_surface = {}
-        self._load_tiles()
-
-    # -------------------------------
-    # Public API
-    # -------------------------------
-    def is_blocked(self, x: int, y: int) -> bool:
-        if x < 0 or y < 0 or x >= self.width or y >= self.height:
-            return True
-        return (x, y) in self.collision
-
-    def draw(self, screen, camera, layer_order=("ground", "objects")):
-        tw, th = self.tilewidth, self.tileheight
-
-        for layer_name in layer_order:
-            grid = self.layers.get(layer_name)
-            if not grid:
-                continue
-
-            for y in range(self.height):
-                for x in range(self.width):
-                    raw_gid = grid[y][x]
-                    tile_surf = self._get_tile_surface(raw_gid)
-                    if tile_surf is None:
-                        continue
-
-                    px = x * tw - camera.x
-                    py = y * th - camera.y
-                    screen.blit(tile_surf, (px, py))
-
-    # -------------------------------
-    # Internal helpers
-    # -------------------------------
     def _resolve_image_path(self, base_dir: str, image_rel: str) -> str:
         """
         Resuelve path de imagen. Por defecto, relativo a base_dir.
@@ -156,22 +249,21 @@ class TiledMap:
         - .tsj (JSON)
         - .tsx (XML)
         """
-        if not os.path.exists(tileset_path):
+        if not asset_exists(tileset_path):
             # Ruta inválida: típicamente porque Tiled guardó tileset fuera del repo
             raise FileNotFoundError(f"No existe el tileset externo: {tileset_path}")
 
         lower = tileset_path.lower()
 
         if lower.endswith(".tsj"):
-            with open(tileset_path, "r", encoding="utf-8") as f:
-                ts_data = json.load(f)
+            ts_data = load_json_asset(tileset_path)
 
             if "image" not in ts_data:
                 raise ValueError(f"Tileset TSJ sin 'image': {tileset_path}")
             return ts_data
 
         if lower.endswith(".tsx"):
-            tree = ET.parse(tileset_path)
+            tree = ET.parse(open_asset(tileset_path))
             root = tree.getroot()
 
             img_node = root.find("image")
@@ -192,37 +284,63 @@ class TiledMap:
         raise ValueError(f"Tileset externo no soportado: {tileset_path}")
 
     def _load_tiles(self):
+        atlas = get_atlas()
+
         for ts in self.tilesets:
             image_path = ts["image"]
-            if not os.path.exists(image_path):
+            firstgid = ts["firstgid"]
+            tilecount = ts["tilecount"]
+
+            # Sólo los tiles de este tileset que el mapa usa; si no usa ninguno, ni se abre el sheet
+            needed = sorted(g for g in self._used_gids if firstgid <= g < firstgid + tilecount)
+            if not needed:
+                continue
+
+            # Atlas: si tiene todos los tiles usados de este tileset, no se decodifica el sheet
+            if atlas is not None and atlas.covers(image_path):
+                if self._load_tiles_from_atlas(atlas, ts, needed):
+                    continue
+            if not asset_exists(image_path):
                 raise FileNotFoundError(f"No se encuentra la imagen del tileset: {image_path}")
 
-            sheet = pygame.image.load(image_path).convert_alpha()
+            sheet = pygame.image.load(open_asset(image_path), image_path).convert_alpha()
 
-            firstgid = ts["firstgid"]
             tw, th = ts["tilewidth"], ts["tileheight"]
             columns = ts["columns"]
-            tilecount = ts["tilecount"]
             margin = ts["margin"]
             spacing = ts["spacing"]
 
-            if tilecount <= 0:
-                continue
             if columns <= 0:
                 # Evitar crash si el tileset no informa columns.
                 # Si esto pasa, lo correcto es que Tiled exporte columns.
                 raise ValueError(f"Tileset sin 'columns' válido (0). Imagen: {image_path}")
 
-            for i in range(tilecount):
+            for gid in needed:
+                i = gid - firstgid
                 col = i % columns
                 row = i // columns
                 x = margin + col * (tw + spacing)
                 y = margin + row * (th + spacing)
                 surf = pygame.Surface((tw, th), pygame.SRCALPHA)
                 surf.blit(sheet, (0, 0), pygame.Rect(x, y, tw, th))
-                gid = firstgid + i
                 self._gid_to_surface[gid] = surf
 
+    def _load_tiles_from_atlas(self, atlas, ts: dict, needed: list[int]) -> bool:
+        firstgid = ts["firstgid"]
+        areas = {}
+        for gid in needed:
+            area = atlas.get(tile_key(ts["image"], gid - firstgid))
+            if area is None:
+                return False
+            areas[gid] = area
+
+        self._gid_to_area.update(areas)
+        return True
+
+    def _load_missing_tile(self, gid: int):
+        """Tile no precargado. El mapa fijo carga todo lo usado al inicio; el streaming lo corta acá."""
+        return None
+
     def _decode_gid(self, raw_gid: int):
         flip_h = bool(raw_gid & FLIP_H)
         flip_v = bool(raw_gid & FLIP_V)
@@ -237,7 +355,21 @@ class TiledMap:
 
         base = self._gid_to_surface.get(gid)
         if base is None:
-            return None
+            area = self._gid_to_area.get(gid)
+            if area is not None:
+                base = area[0].subsurface(area[1])
+            else:
+                base = self._load_missing_tile(gid)
+                if base is None:
+                    return None
+            self._gid_to_surface[gid] = base
+
+        if not (fh or fv or fd):
+            return base
+
+        surf = self._flipped_cache.get(raw_gid)
+        if surf is not None:
+            return surf
 
         surf = base
         if fd:
@@ -245,4 +377,5 @@ class TiledMap:
             fh = not fh
         if fh or fv:
             surf = pygame.transform.flip(surf, fh, fv)
+        self._flipped_cache[raw_gid] = surf
         return surf
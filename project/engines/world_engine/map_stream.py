@@ -0,0 +1,570 @@
+# project/engines/world_engine/map_stream.py
+"""
+Mapas en streaming (mapas grandes / "infinite" de Tiled).
+
+En vez de tener todas las capas en memoria, el mapa se divide en chunks de
+tiles que se cargan alrededor de la cámara en un thread worker y se descartan
+cuando quedan lejos del jugador. Colisiones y dibujo trabajan sobre los chunks
+residentes (un chunk no cargado cuenta como bloqueado).
+
+Fuentes de chunks:
+  - <mapa>.chunks (tools/map_chunker.py): header + meta JSON + blobs zlib.
+    Se lee por rangos (read_asset_range): la memoria no depende del tamaño del mapa.
+  - <mapa>.json con "infinite": true (desarrollo): se parsea el JSON entero
+    y los chunks se decodifican recién al pedirlos.
+
+Formato .chunks (little-endian):
+  header: MAGIC(8) | meta_len u32
+  meta:   JSON utf-8 (tilesets, objectgroups, chunk_w/h, bounds, índice de chunks)
+  datos:  por chunk y capa -> zlib(uint32[chunk_w * chunk_h]); offsets relativos a este bloque
+"""
+import base64
+import gzip
+import json
+import math
+import os
+import queue
+import struct
+import sys
+import threading
+import weakref
+import zlib
+from array import array
+
+import pygame
+
+from core.assets import asset_exists, load_json_asset, open_asset, read_asset_range
+from engines.world_engine.map_loader import COLLISION_LAYERS, GID_MASK, TiledMap, object_tiles
+from render.world.atlas import get_atlas, tile_key
+from render.world.memory import surface_bytes
+
+CHUNK_MAGIC = b"JUEGOCK1"
+CHUNK_HEADER = struct.Struct("<8sI")
+CHUNK_EXT = ".chunks"
+
+# Capa sintética con las colisiones del chunk (1 = bloqueado)
+COLLISION_KEY = "__collision__"
+
+DEFAULT_CHUNK_SIZE = 16
+
+
+def chunk_file_path(json_path: str) -> str:
+    return os.path.splitext(json_path)[0] + CHUNK_EXT
+
+
+def decode_tile_data(data, encoding: str | None = None, compression: str | None = None) -> list[int]:
+    """GIDs crudos (con bits de flip) de una capa/chunk de Tiled (csv o base64 + zlib/gzip)."""
+    if encoding != "base64":
+        return list(data)
+
+    raw = base64.b64decode(data)
+    if compression == "zlib":
+        raw = zlib.decompress(raw)
+    elif compression == "gzip":
+        raw = gzip.decompress(raw)
+    elif compression:
+        raise ValueError(f"Compresión de capa no soportada: {compression}")
+
+    return _u32_from_bytes(raw).tolist()
+
+
+def _u32_from_bytes(raw: bytes) -> array:
+    arr = array("I")
+    arr.frombytes(raw)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def _u32_to_bytes(values) -> bytes:
+    arr = array("I", values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def iter_layer_chunks(layer: dict, map_width: int, chunk_w: int, chunk_h: int):
+    """
+    (cx, cy, gids) de una tilelayer, en la grilla de chunk_w x chunk_h.
+    Soporta capas infinitas (chunks de Tiled) y capas fijas (data completa).
+    """
+    enc = layer.get("encoding")
+    comp = layer.get("compression")
+
+    if "chunks" in layer:
+        for ch in layer["chunks"]:
+            if ch["width"] != chunk_w or ch["height"] != chunk_h:
+                raise ValueError(f"Chunk de tamaño distinto al del mapa en capa {layer.get('name')!r}")
+            yield ch["x"] // chunk_w, ch["y"] // chunk_h, decode_tile_data(ch["data"], enc, comp)
+        return
+
+    data = decode_tile_data(layer.get("data", []), enc, comp)
+    height = len(data) // map_width if map_width else 0
+    for cy in range(math.ceil(height / chunk_h)):
+        for cx in range(math.ceil(map_width / chunk_w)):
+            gids = [0] * (chunk_w * chunk_h)
+            for ly in range(chunk_h):
+                y = cy * chunk_h + ly
+                if y >= height:
+                    break
+                x0 = cx * chunk_w
+                row = data[y * map_width + x0:y * map_width + min(map_width, x0 + chunk_w)]
+                gids[ly * chunk_w:ly * chunk_w + len(row)] = row
+            if any(gids):
+                yield cx, cy, gids
+
+
+def map_chunk_size(data: dict) -> tuple[int, int]:
+    for layer in data.get("layers", []):
+        for ch in layer.get("chunks", []) or []:
+            return int(ch["width"]), int(ch["height"])
+    return DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_SIZE
+
+
+def map_bounds(data: dict) -> tuple[int, int, int, int]:
+    """(x0, y0, x1, y1) en tiles. Mapas infinitos: unión de startx/starty de las capas."""
+    if not data.get("infinite"):
+        return 0, 0, int(data["width"]), int(data["height"])
+
+    x0 = y0 = math.inf
+    x1 = y1 = -math.inf
+    for layer in data.get("layers", []):
+        if layer.get("type") != "tilelayer":
+            continue
+        sx, sy = layer.get("startx", 0), layer.get("starty", 0)
+        x0, y0 = min(x0, sx), min(y0, sy)
+        x1, y1 = max(x1, sx + layer.get("width", 0)), max(y1, sy + layer.get("height", 0))
+    if x0 is math.inf:
+        return 0, 0, 0, 0
+    return int(x0), int(y0), int(x1), int(y1)
+
+
+def collision_by_chunk(data: dict, chunk_w: int, chunk_h: int) -> dict[tuple[int, int], set[int]]:
+    """Objetos de colisión -> índices locales bloqueados por chunk."""
+    tw, th = data["tilewidth"], data["tileheight"]
+    out: dict[tuple[int, int], set[int]] = {}
+    for layer in data.get("layers", []):
+        if layer.get("type") != "objectgroup" or layer.get("name") not in COLLISION_LAYERS:
+            continue
+        for obj in layer.get("objects", []):
+            for tx, ty in object_tiles(obj, tw, th):
+                key = (tx // chunk_w, ty // chunk_h)
+                out.setdefault(key, set()).add((ty % chunk_h) * chunk_w + (tx % chunk_w))
+    return out
+
+
+def map_meta(data: dict) -> dict:
+    """JSON del mapa sin los datos de las tilelayers (lo que MapData necesita: objectgroups, etc)."""
+    meta = {k: v for k, v in data.items() if k != "layers"}
+    meta["layers"] = [layer for layer in data.get("layers", []) if layer.get("type") != "tilelayer"]
+    meta["tile_layers"] = [layer.get("name", "") for layer in data.get("layers", []) if layer.get("type") == "tilelayer"]
+    return meta
+
+
+class MapChunk:
+    __slots__ = ("key", "layers", "blocked")
+
+    def __init__(self, key: tuple[int, int], layers: dict[str, list[int]], blocked: frozenset[int]):
+        self.key = key
+        self.layers = layers
+        self.blocked = blocked
+
+
+# -------------------------
+# Fuentes (se usan desde el worker: sin pygame, sin estado mutable compartido)
+# -------------------------
+class ChunkFileSource:
+    """Chunks desde <mapa>.chunks, leídos por rango."""
+
+    def __init__(self, path: str):
+        self.path = path
+        head = read_asset_range(path, 0, CHUNK_HEADER.size)
+        magic, meta_len = CHUNK_HEADER.unpack(head)
+        if magic != CHUNK_MAGIC:
+            raise ValueError(f"Archivo de chunks inválido (magic): {path}")
+
+        self.meta = json.loads(read_asset_range(path, CHUNK_HEADER.size, meta_len).decode("utf-8"))
+        # offsets del índice: relativos al inicio de los datos (después del meta)
+        self._data_start = CHUNK_HEADER.size + meta_len
+        self.chunk_w = int(self.meta["chunk_w"])
+        self.chunk_h = int(self.meta["chunk_h"])
+        self.bounds = tuple(self.meta["bounds"])
+        self._index = {
+            tuple(int(v) for v in key.split(",")): entry
+            for key, entry in self.meta.pop("chunk_index").items()
+        }
+
+    def has_chunk(self, key: tuple[int, int]) -> bool:
+        return key in self._index
+
+    def load_chunk(self, key: tuple[int, int]) -> MapChunk | None:
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+
+        layers = {}
+        blocked = frozenset()
+        for name, (offset, length) in entry.items():
+            blob = read_asset_range(self.path, self._data_start + offset, length)
+            values = _u32_from_bytes(zlib.decompress(blob))
+            if name == COLLISION_KEY:
+                blocked = frozenset(i for i, v in enumerate(values) if v)
+            else:
+                layers[name] = values.tolist()
+        return MapChunk(key, layers, blocked)
+
+
+class TiledJsonSource:
+    """Chunks desde el JSON de Tiled ya parseado (mapas infinite sin .chunks generado)."""
+
+    def __init__(self, data: dict):
+        self.meta = map_meta(data)
+        self.chunk_w, self.chunk_h = map_chunk_size(data)
+        self.bounds = map_bounds(data)
+
+        # capas crudas: se decodifican recién en load_chunk (en el worker)
+        self._layers = [layer for layer in data.get("layers", []) if layer.get("type") == "tilelayer"]
+        self._raw: dict[tuple[int, int], list[tuple[str, dict, dict]]] = {}
+        for layer in self._layers:
+            for ch in layer.get("chunks", []) or []:
+                key = (ch["x"] // self.chunk_w, ch["y"] // self.chunk_h)
+                self._raw.setdefault(key, []).append((layer.get("name", ""), layer, ch))
+
+        self._collision = collision_by_chunk(data, self.chunk_w, self.chunk_h)
+
+    def has_chunk(self, key: tuple[int, int]) -> bool:
+        return key in self._raw or key in self._collision
+
+    def load_chunk(self, key: tuple[int, int]) -> MapChunk | None:
+        if not self.has_chunk(key):
+            return None
+        layers = {
+            name: decode_tile_data(ch["data"], layer.get("encoding"), layer.get("compression"))
+            for name, layer, ch in self._raw.get(key, ())
+        }
+        return MapChunk(key, layers, frozenset(self._collision.get(key, ())))
+
+
+def _chunk_worker(source, requests: queue.Queue, results: queue.Queue) -> None:
+    # Sólo referencia la fuente y las colas (no el mapa), así el mapa puede liberarse.
+    while True:
+        key = requests.get()
+        if key is None:
+            return
+        try:
+            chunk = source.load_chunk(key)
+        except Exception as e:
+            print(f"[MAP] ❌ Error cargando chunk {key}: {e}")
+            chunk = None
+        results.put((key, chunk))
+
+
+# -------------------------
+# Mapa
+# -------------------------
+class StreamingTiledMap(TiledMap):
+    """
+    TiledMap con capas por chunks residentes alrededor de la cámara.
+
+    Misma API que usa el mundo (is_blocked, draw/draw_region, memory_report) más
+    update_streaming(), que WorldState llama cada frame con el centro de la cámara.
+    """
+
+    # margen de carga (en chunks) alrededor de la vista, y distancia extra antes de descartar
+    LOAD_MARGIN = 1
+    EVICT_MARGIN = 2
+
+    def __init__(self, json_path: str, source, assets_root: str = ""):
+        self.json_path = os.path.normpath(json_path)
+        self.assets_root = os.path.normpath(assets_root) if assets_root else ""
+
+        self.source = source
+        self.meta = source.meta
+        self.tilewidth = int(self.meta["tilewidth"])
+        self.tileheight = int(self.meta["tileheight"])
+        self.chunk_w = source.chunk_w
+        self.chunk_h = source.chunk_h
+        self.bounds = source.bounds
+        self.width = self.bounds[2] - self.bounds[0]
+        self.height = self.bounds[3] - self.bounds[1]
+
+        # sin grillas completas: todo vive en self.chunks
+        self.layers = {}
+        self.collision = set()
+        self.tilesets = self._parse_tilesets(self.meta)
+
+        self._gid_to_surface = {}
+        self._gid_to_area = {}
+        self._flipped_cache = {}
+        self._used_gids = frozenset()
+
+        # sheets decodificados (para cortar tiles a demanda)
+        self._sheets: dict[str, pygame.Surface] = {}
+
+        self.chunks: dict[tuple[int, int], MapChunk] = {}
+        # sube cada vez que llega un chunk (el renderer redibuja)
+        self.version = 0
+        self._pending: set[tuple[int, int]] = set()
+        self._keep: tuple[int, int, int, int] | None = None
+
+        self._requests: queue.Queue = queue.Queue()
+        self._results: queue.Queue = queue.Queue()
+        self._worker = threading.Thread(
+            target=_chunk_worker,
+            args=(source, self._requests, self._results),
+            name=f"map-stream:{os.path.basename(self.json_path)}",
+            daemon=True,
+        )
+        self._worker.start()
+        # al liberar el mapa, cortar el worker
+        self._finalizer = weakref.finalize(self, self._requests.put, None)
+
+    def close(self) -> None:
+        self._finalizer()
+
+    # -------------------------------
+    # Streaming
+    # -------------------------------
+    def update_streaming(self, center_x: float, center_y: float, view_w: int, view_h: int, block: bool = False) -> None:
+        """
+        Pide los chunks que tocan la vista (+ margen) y descarta los lejanos.
+        block=True carga en el thread actual (spawn / teletransporte: sin frame vacío).
+        """
+        self._collect_results()
+
+        cw_px = self.chunk_w * self.tilewidth
+        ch_px = self.chunk_h * self.tileheight
+        ccx = math.floor(center_x / cw_px)
+        ccy = math.floor(center_y / ch_px)
+        rx = math.ceil(view_w / 2 / cw_px) + self.LOAD_MARGIN
+        ry = math.ceil(view_h / 2 / ch_px) + self.LOAD_MARGIN
+
+        # descartar lo que quedó fuera del rango + histéresis (ya fuera de pantalla: no cambia version)
+        ex, ey = rx + self.EVICT_MARGIN, ry + self.EVICT_MARGIN
+        self._keep = (ccx - ex, ccy - ey, ccx + ex, ccy + ey)
+        for key in [k for k in self.chunks if not self._in_keep(k)]:
+            del self.chunks[key]
+
+        wanted = [
+            (cx, cy)
+            for cy in range(ccy - ry, ccy + ry + 1)
+            for cx in range(ccx - rx, ccx + rx + 1)
+            if (cx, cy) not in self.chunks and self.source.has_chunk((cx, cy))
+        ]
+        # los más cercanos primero
+        wanted.sort(key=lambda k: (k[0] - ccx) ** 2 + (k[1] - ccy) ** 2)
+
+        for key in wanted:
+            if block:
+                chunk = self.source.load_chunk(key)
+                if chunk is not None:
+                    self.chunks[key] = chunk
+                    self.version += 1
+            elif key not in self._pending:
+                self._pending.add(key)
+                self._requests.put(key)
+
+    def _collect_results(self) -> None:
+        while True:
+            try:
+                key, chunk = self._results.get_nowait()
+            except queue.Empty:
+                return
+            self._pending.discard(key)
+            # llegó tarde (el jugador ya se alejó) o ya se cargó sincrónico
+            if chunk is None or key in self.chunks or not self._in_keep(key):
+                continue
+            self.chunks[key] = chunk
+            self.version += 1
+
+    def _in_keep(self, key: tuple[int, int]) -> bool:
+        keep = self._keep
+        if keep is None:
+            return True
+        return keep[0] <= key[0] <= keep[2] and keep[1] <= key[1] <= keep[3]
+
+    # -------------------------------
+    # Public API (sobre chunks residentes)
+    # -------------------------------
+    def is_blocked(self, x: int, y: int) -> bool:
+        x0, y0, x1, y1 = self.bounds
+        if x < x0 or y < y0 or x >= x1 or y >= y1:
+            return True
+        chunk = self.chunks.get((x // self.chunk_w, y // self.chunk_h))
+        if chunk is None:
+            return True
+        return (y % self.chunk_h) * self.chunk_w + (x % self.chunk_w) in chunk.blocked
+
+    def draw_region(self, surface, cam_x, cam_y, rect, layer_order=("ground", "objects")):
+        tw, th = self.tilewidth, self.tileheight
+        cw, ch = self.chunk_w, self.chunk_h
+        rect = pygame.Rect(rect)
+
+        bx0, by0, bx1, by1 = self.bounds
+        x0 = max(bx0, int((rect.left + cam_x) // tw))
+        y0 = max(by0, int((rect.top + cam_y) // th))
+        x1 = min(bx1, int((rect.right + cam_x - 1) // tw) + 1)
+        y1 = min(by1, int((rect.bottom + cam_y - 1) // th) + 1)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        for layer_name in layer_order:
+            for cy in range(y0 // ch, (y1 - 1) // ch + 1):
+                for cx in range(x0 // cw, (x1 - 1) // cw + 1):
+                    chunk = self.chunks.get((cx, cy))
+                    if chunk is None:
+                        continue
+                    grid = chunk.layers.get(layer_name)
+                    if not grid:
+                        continue
+
+                    ox, oy = cx * cw, cy * ch
+                    for ty in range(max(y0, oy), min(y1, oy + ch)):
+                        base = (ty - oy) * cw - ox
+                        py = ty * th - cam_y
+                        for tx in range(max(x0, ox), min(x1, ox + cw)):
+                            raw_gid = grid[base + tx]
+                            if not raw_gid:
+                                continue
+                            px = tx * tw - cam_x
+
+                            area = self._gid_to_area.get(raw_gid)
+                            if area is not None:
+                                surface.blit(area[0], (px, py), area[1])
+                                continue
+
+                            tile_surf = self._get_tile_surface(raw_gid)
+                            if tile_surf is not None:
+                                surface.blit(tile_surf, (px, py))
+
+    def used_gids(self) -> set[int]:
+        """GIDs de los chunks residentes."""
+        used = set()
+        for chunk in self.chunks.values():
+            for grid in chunk.layers.values():
+                used.update(grid)
+        out = {raw & GID_MASK for raw in used}
+        out.discard(0)
+        return out
+
+    def memory_report(self) -> dict:
+        report = super().memory_report()
+        sheets = sum(surface_bytes(s) for s in self._sheets.values())
+        report["sheets"] = sheets
+        report["chunks"] = len(self.chunks)
+        report["total"] += sheets
+        return report
+
+    # -------------------------------
+    # Tiles a demanda
+    # -------------------------------
+    def _load_tiles(self):
+        # no hay set de GIDs conocido de antemano: se cortan en _load_missing_tile
+        pass
+
+    def _load_missing_tile(self, gid: int):
+        for ts in self.tilesets:
+            local = gid - ts["firstgid"]
+            if 0 <= local < ts["tilecount"]:
+                break
+        else:
+            return None
+
+        atlas = get_atlas()
+        if atlas is not None and atlas.covers(ts["image"]):
+            area = atlas.get(tile_key(ts["image"], local))
+            if area is not None:
+                return area[0].subsurface(area[1])
+
+        sheet = self._sheets.get(ts["image"])
+        if sheet is None:
+            if not asset_exists(ts["image"]):
+                raise FileNotFoundError(f"No se encuentra la imagen del tileset: {ts['image']}")
+            sheet = pygame.image.load(open_asset(ts["image"]), ts["image"]).convert_alpha()
+            self._sheets[ts["image"]] = sheet
+
+        columns = ts["columns"]
+        if columns <= 0:
+            raise ValueError(f"Tileset sin 'columns' válido (0). Imagen: {ts['image']}")
+        tw, th = ts["tilewidth"], ts["tileheight"]
+        x = ts["margin"] + (local % columns) * (tw + ts["spacing"])
+        y = ts["margin"] + (local // columns) * (th + ts["spacing"])
+        surf = pygame.Surface((tw, th), pygame.SRCALPHA)
+        surf.blit(sheet, (0, 0), pygame.Rect(x, y, tw, th))
+        return surf
+
+
+# -------------------------
+# Escritura (.chunks) — la usa tools/map_chunker.py
+# -------------------------
+def write_chunk_file(out_path: str, data: dict, chunk_size: int | None = None) -> int:
+    """Escribe <mapa>.chunks desde el JSON de Tiled. Devuelve la cantidad de chunks."""
+    if data.get("infinite"):
+        chunk_w, chunk_h = map_chunk_size(data)
+    else:
+        chunk_w = chunk_h = int(chunk_size or DEFAULT_CHUNK_SIZE)
+
+    per_chunk: dict[tuple[int, int], dict[str, list[int]]] = {}
+    for layer in data.get("layers", []):
+        if layer.get("type") != "tilelayer":
+            continue
+        name = layer.get("name", "")
+        for cx, cy, gids in iter_layer_chunks(layer, int(data.get("width", 0)), chunk_w, chunk_h):
+            per_chunk.setdefault((cx, cy), {})[name] = gids
+
+    for key, blocked in collision_by_chunk(data, chunk_w, chunk_h).items():
+        mask = [0] * (chunk_w * chunk_h)
+        for i in blocked:
+            mask[i] = 1
+        per_chunk.setdefault(key, {})[COLLISION_KEY] = mask
+
+    blobs = []
+    for key in sorted(per_chunk):
+        for name, values in per_chunk[key].items():
+            blobs.append((key, name, zlib.compress(_u32_to_bytes(values), 6)))
+
+    index: dict[str, dict[str, list[int]]] = {}
+    offset = 0
+    for (cx, cy), name, blob in blobs:
+        index.setdefault(f"{cx},{cy}", {})[name] = [offset, len(blob)]
+        offset += len(blob)
+
+    meta = map_meta(data)
+    meta.update({"chunk_w": chunk_w, "chunk_h": chunk_h, "bounds": list(map_bounds(data)), "chunk_index": index})
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+
+    with open(out_path + ".tmp", "wb") as out:
+        out.write(CHUNK_HEADER.pack(CHUNK_MAGIC, len(meta_bytes)))
+        out.write(meta_bytes)
+        for _, _, blob in blobs:
+            out.write(blob)
+    os.replace(out_path + ".tmp", out_path)
+    return len(per_chunk)
+
+
+# -------------------------
+# Entrada
+# -------------------------
+def open_map(json_path: str, assets_root: str = "") -> TiledMap:
+    """
+    TiledMap fijo, o StreamingTiledMap si el mapa tiene .chunks generado
+    o es "infinite" en Tiled.
+    """
+    chunks_path = chunk_file_path(json_path)
+    if asset_exists(chunks_path) and not _is_stale(chunks_path, json_path):
+        return StreamingTiledMap(json_path, ChunkFileSource(chunks_path), assets_root=assets_root)
+
+    data = load_json_asset(json_path)
+    if data.get("infinite"):
+        return StreamingTiledMap(json_path, TiledJsonSource(data), assets_root=assets_root)
+    return TiledMap(json_path=json_path, assets_root=assets_root, data=data)
+
+
+def _is_stale(chunks_path: str, json_path: str) -> bool:
+    # Sólo en desarrollo (archivos sueltos): si el JSON se editó después, se ignora el .chunks
+    if not (os.path.exists(chunks_path) and os.path.exists(json_path)):
+        return False
+    if os.path.getmtime(json_path) > os.path.getmtime(chunks_path):
+        print(f"[MAP] ⚠️ {os.path.basename(chunks_path)} desactualizado, usando el JSON (correr tools/map_chunker.py)")
+        return True
+    return False
@@ -1,28 +1,70 @@
 # project/engines/world_engine/map_transition_system.py
 
-import json
 import pygame
 
-from core.assets import asset_path
+from core.assets import asset_path, load_json_asset
 from core.config import TILE_SIZE
+from engines.world_engine.world_manifest import get_world_manifest
+from engines.world_engine.world_state_pool import get_world_pool
 
 
 class MapTransitionSystem:
     """
     Encapsula la transición de mapas.
-    - Lee JSON destino para resolver puertas
-    - Decide spawn tile
+    - Resuelve la llegada con el manifest del mundo (lookup por puerta)
+    - Fallback: lee JSON destino para resolver puertas (mapas fuera del manifest)
+    - Suspende el mapa actual en el WorldStatePool y retoma/crea el destino
     - Aplica lock/cooldown anti-rebote usando WorldInteractionSystem del nuevo state
     """
 
     def __init__(self, world_state):
         self.ws = world_state
+        self.manifest = get_world_manifest()
 
     def change_map(self, destino: str, puerta_entrada: dict | None = None) -> None:
+        arrival = None
+        if puerta_entrada:
+            arrival = self.manifest.arrival(self.ws.map_id, puerta_entrada)
+
+        if arrival is not None:
+            door_rect = arrival["door_rect"]
+            self._enter(
+                destino,
+                tuple(arrival["tile"]),
+                pygame.Rect(door_rect) if door_rect is not None else None,
+            )
+            return
+
+        if puerta_entrada and self.manifest.has_map(self.ws.map_id) and not self.manifest.has_map(destino):
+            print(f"[MAP] ❌ Puerta a un mapa inexistente: {destino}")
+            return
+
+        self._change_map_from_json(destino, puerta_entrada)
+
+    def _enter(self, destino: str, spawn_tile: tuple[int, int], door_rect: pygame.Rect | None) -> None:
+        # ✅ actualizar mapa actual en gamestate ANTES de crear el nuevo state
+        try:
+            self.ws.game.game_state.current_map_id = destino
+        except Exception:
+            pass
+
+        # state del destino: retomado del pool (mapas recientes) o nuevo; el actual queda suspendido
+        pool = get_world_pool(self.ws.game)
+        pool.release(self.ws)
+        nuevo = pool.acquire(self.ws.game, destino, spawn_tile=spawn_tile)
+
+        # aplicar lock/cooldown anti-rebote
+        if door_rect is not None:
+            nuevo.interactions.set_spawn_door_lock(door_rect, cooldown=0.15)
+        else:
+            nuevo.interactions.set_cooldown(0.4)
+
+        self.ws.game.change_state(nuevo)
+
+    def _change_map_from_json(self, destino: str, puerta_entrada: dict | None = None) -> None:
         destino_path = asset_path(destino)
 
-        with open(destino_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = load_json_asset(destino_path)
 
         puertas_destino = []
         for layer in data.get("layers", []):
@@ -32,15 +74,7 @@ class MapTransitionSystem:
 
         # si el mapa destino no tiene puertas, spawn 0,0
         if not puertas_destino:
-            # ✅ actualizar mapa actual en gamestate
-            try:
-                self.ws.game.game_state.current_map_id = destino
-            except Exception:
-                pass
-
-            nuevo = type(self.ws)(self.ws.game, map_rel_path=destino, spawn_tile=(0, 0))
-            nuevo.interactions.set_cooldown(0.4)
-            self.ws.game.change_state(nuevo)
+            self._enter(destino, (0, 0), None)
             return
 
         puerta_destino = None
@@ -78,25 +112,10 @@ class MapTransitionSystem:
             tx = int((puerta_destino["x"] + puerta_destino["width"] / 2) // TILE_SIZE)
             ty = int((puerta_destino["y"] + puerta_destino["height"] / 2) // TILE_SIZE)
 
-        # ✅ actualizar mapa actual en gamestate ANTES de crear el nuevo state
-        try:
-            self.ws.game.game_state.current_map_id = destino
-        except Exception:
-            pass
-
-        # crear nuevo state
-        nuevo = type(self.ws)(self.ws.game, map_rel_path=destino, spawn_tile=(tx, ty))
-
-        # aplicar lock/cooldown anti-rebote
+        door_rect = None
         if puerta_destino is not None:
-            nuevo.interactions.set_spawn_door_lock(
-                pygame.Rect(
-                    puerta_destino["x"], puerta_destino["y"],
-                    puerta_destino["width"], puerta_destino["height"]
-                ),
-                cooldown=0.15
+            door_rect = pygame.Rect(
+                puerta_destino["x"], puerta_destino["y"],
+                puerta_destino["width"], puerta_destino["height"]
             )
-        else:
-            nuevo.interactions.set_cooldown(0.4)
-
-        self.ws.game.change_state(nuevo)
+        self._enter(destino, (tx, ty), door_rect)
@@ -1,9 +1,11 @@
 from core.config import TILE_SIZE
 
 class MovementController:
-    def __init__(self, unit, collision):
+    def __init__(self, unit, collision, on_move=None):
         self.unit = unit
         self.collision = collision
+        # callback al arrancar un paso (ej: NPCSystem despierta la unit)
+        self.on_move = on_move
 
     def try_move(self, dx, dy, ignore_unit_ids=None):
         if self.unit.is_moving:
@@ -21,6 +23,8 @@ class MovementController:
         self.unit.target_x = target_x * TILE_SIZE
         self.unit.target_y = target_y * TILE_SIZE
         self.unit.is_moving = True
+        if self.on_move is not None:
+            self.on_move()
 
 
     def update(self, dt):
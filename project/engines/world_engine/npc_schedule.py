@@ -0,0 +1,289 @@
+# project/engines/world_engine/npc_schedule.py
+"""
+Horarios diarios de NPCs con simulación por nivel de detalle.
+
+Un NPC tiene horario si su JSON (assets/sprites/npcs/<id>/<id>.json) trae:
+
+  "schedule": [
+    {"from": "08:00", "to": "18:00", "map": "pueblo", "marker": "shop", "activity": "work"},
+    {"from": "18:00", "to": "08:00", "map": "inn", "tile": [5, 7], "activity": "sleep"}
+  ]
+
+  - map: id de mapa (como normalize_map_id: "pueblo" o "maps/world/pueblo.json")
+  - marker (markers del mapa, vía manifest) o tile [x, y]
+  - from/to: "HH:MM" (pueden cruzar medianoche)
+
+Simulación:
+  - Mapa cargado (detalle completo): los NPCs son Units; al cambiar de franja
+    caminan al destino o salen por la primera puerta de la ruta al mapa
+    siguiente (world_routes, aunque no sea vecino).
+  - Resto del mundo (grueso): sólo cambia GameState.npcs[id] (map/tile/activity),
+    una vez por hora de juego, sin pathfinding; quien llega al mapa cargado
+    entra por la puerta en la que termina su ruta. Un heap por próximo cambio hace
+    que cada NPC cueste algo sólo cuando le toca cambiar de franja.
+
+No se simulan NPCs inactivos (active=False), reclutados o en la party.
+"""
+import heapq
+from dataclasses import dataclass
+
+from core.assets import asset_exists, asset_path, is_asset_dir, list_assets, load_json_asset
+from core.world.clock import MINUTES_PER_DAY, MINUTES_PER_HOUR, minute_of_day, parse_clock
+from engines.world_engine.event_registry import normalize_map_id
+from engines.world_engine.world_manifest import door_center_tile, get_world_manifest
+from engines.world_engine.world_routes import get_world_router
+
+
+@dataclass(frozen=True)
+class ScheduleEntry:
+    start: int  # minuto del día
+    end: int
+    map_id: str
+    tile: tuple[int, int]
+    activity: str = ""
+
+    def contains(self, minute: float) -> bool:
+        if self.start == self.end:
+            return True
+        if self.start < self.end:
+            return self.start <= minute < self.end
+        # cruza medianoche
+        return minute >= self.start or minute < self.end
+
+
+class NPCSchedule:
+    def __init__(self, npc_id: str, entries: list[ScheduleEntry]):
+        self.npc_id = npc_id
+        self.entries = entries
+        self._bounds = sorted({e.start for e in entries} | {e.end for e in entries})
+
+    def entry_at(self, t: float) -> ScheduleEntry | None:
+        m = minute_of_day(t)
+        for e in self.entries:
+            if e.contains(m):
+                return e
+        return None
+
+    def next_change(self, t: float) -> float:
+        """Próximo borde de franja estrictamente después de t (minutos absolutos)."""
+        day_start = t - minute_of_day(t)
+        m = minute_of_day(t)
+        for b in self._bounds:
+            if b > m:
+                return day_start + b
+        return day_start + MINUTES_PER_DAY + self._bounds[0]
+
+
+def parse_schedule(npc_id: str, raw: list, manifest) -> NPCSchedule | None:
+    entries = []
+    for item in raw or []:
+        try:
+            map_id = normalize_map_id(item["map"])
+            tile = item.get("tile")
+            if tile is None and item.get("marker"):
+                tile = manifest.marker_tile(map_id, item["marker"])
+            if tile is None:
+                print(f"[SCHEDULE] ⚠️ {npc_id}: franja sin tile/marker válido en {map_id}")
+                continue
+            entries.append(ScheduleEntry(
+                start=parse_clock(item.get("from", 0)),
+                end=parse_clock(item.get("to", 0)),
+                map_id=map_id,
+                tile=(int(tile[0]), int(tile[1])),
+                activity=str(item.get("activity", "")),
+            ))
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"[SCHEDULE] ❌ {npc_id}: franja inválida {item!r}: {e}")
+    if not entries:
+        return None
+    return NPCSchedule(npc_id, entries)
+
+
+_schedules: dict[str, NPCSchedule] | None = None
+
+
+def load_schedules() -> dict[str, NPCSchedule]:
+    """Horarios de todos los NPCs (se leen una vez por proceso)."""
+    global _schedules
+    if _schedules is not None:
+        return _schedules
+
+    _schedules = {}
+    npcs_dir = asset_path("sprites", "npcs")
+    if not is_asset_dir(npcs_dir):
+        return _schedules
+
+    manifest = get_world_manifest()
+    for npc_id in list_assets(npcs_dir):
+        path = asset_path("sprites", "npcs", npc_id, f"{npc_id}.json")
+        if not asset_exists(path):
+            continue
+        try:
+            raw = (load_json_asset(path) or {}).get("schedule")
+        except (OSError, ValueError):
+            continue
+        if raw:
+            sched = parse_schedule(npc_id, raw, manifest)
+            if sched is not None:
+                _schedules[npc_id] = sched
+    return _schedules
+
+
+class ScheduleDirector:
+    """
+    Mueve a los NPCs con horario según GameState.world_time.
+
+    sync(ws)   -> al entrar/retomar un mapa: spawnea/quita Units según GameState.npcs
+    update(ws) -> cada frame: detalle completo para los locales, grueso (por hora) para el resto
+    """
+
+    def __init__(self, schedules: dict[str, NPCSchedule]):
+        self.schedules = schedules
+        self.manifest = get_world_manifest()
+
+        self._owner = None
+        self._heap: list[tuple[float, str]] = []
+        self._last_hour: int | None = None
+
+        # NPCs con Unit en el mapa cargado -> franja que están cumpliendo
+        self._local: dict[str, ScheduleEntry | None] = {}
+
+    # -------------------------------
+    # API
+    # -------------------------------
+    def sync(self, ws) -> None:
+        gs = ws.game.game_state
+        if gs is not self._owner:
+            self._rebuild(gs)
+
+        self._local = {}
+        for npc_id in self.schedules:
+            unit = ws.npc_system.units.get(npc_id)
+            st = gs.get_npc(npc_id)
+            here = self._simulated(gs, npc_id) and st.get("map") == ws.map_id and st.get("tile")
+
+            if not here:
+                if unit is not None:
+                    ws.npc_system.remove(npc_id)
+                continue
+
+            tx, ty = st["tile"]
+            if unit is None:
+                ws.npc_system.spawn_unit(npc_id, tx, ty)
+            elif (unit.tile_x, unit.tile_y) != (tx, ty):
+                ws._snap_unit(unit, tx, ty)
+            self._local[npc_id] = self.schedules[npc_id].entry_at(gs.world_time)
+
+    def update(self, ws) -> None:
+        gs = ws.game.game_state
+        if gs is not self._owner:
+            self.sync(ws)
+
+        now = gs.world_time
+        self._update_local(ws, now)
+
+        hour = int(now // MINUTES_PER_HOUR)
+        if hour != self._last_hour:
+            self._last_hour = hour
+            self._update_coarse(ws, now)
+
+    # -------------------------------
+    # Detalle completo (mapa cargado)
+    # -------------------------------
+    def _update_local(self, ws, now: float) -> None:
+        gs = ws.game.game_state
+        for npc_id, current in list(self._local.items()):
+            if npc_id not in ws.npc_system.units or not self._simulated(gs, npc_id):
+                # reclutado / despawneado por otro sistema: deja de ser local
+                del self._local[npc_id]
+                continue
+
+            entry = self.schedules[npc_id].entry_at(now)
+            if entry is None or entry == current:
+                continue
+
+            if entry.map_id == ws.map_id:
+                self._local[npc_id] = entry
+                ws.npc_system.set_walk_to(npc_id, entry.tile, despawn_on_arrival=False)
+                self._store(gs, npc_id, entry)
+                continue
+
+            # se va a otro mapa: caminar hasta la primera puerta de la ruta (o desaparecer)
+            del self._local[npc_id]
+            self._store(gs, npc_id, entry)
+            unit = ws.npc_system.units[npc_id]
+            door = get_world_router().first_door(ws.map_id, (unit.tile_x, unit.tile_y), entry.map_id, entry.tile)
+            if door is not None:
+                ws.npc_system.set_walk_to(npc_id, door_center_tile(door["rect"]), despawn_on_arrival=True, persist=False)
+            else:
+                ws.npc_system.remove(npc_id)
+
+    # -------------------------------
+    # Grueso (resto del mundo, por hora)
+    # -------------------------------
+    def _update_coarse(self, ws, now: float) -> None:
+        gs = ws.game.game_state
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, npc_id = heapq.heappop(heap)
+            sched = self.schedules[npc_id]
+            heapq.heappush(heap, (sched.next_change(now), npc_id))
+
+            # los locales los maneja _update_local; los inactivos no se simulan
+            if npc_id in self._local or not self._simulated(gs, npc_id):
+                continue
+
+            entry = sched.entry_at(now)
+            if entry is None:
+                continue
+
+            prev = gs.get_npc(npc_id)
+            prev_map, prev_tile = prev.get("map"), prev.get("tile")
+            self._store(gs, npc_id, entry)
+
+            # llega al mapa cargado: entra por la puerta en la que termina su ruta
+            if entry.map_id == ws.map_id and npc_id not in ws.npc_system.units:
+                start = None
+                if prev_map and prev_tile and prev_map != ws.map_id:
+                    start = get_world_router().entry_tile(prev_map, prev_tile, ws.map_id, entry.tile)
+                tx, ty = start if start is not None else entry.tile
+                ws.npc_system.spawn_unit(npc_id, tx, ty)
+                ws.npc_system.set_walk_to(npc_id, entry.tile, despawn_on_arrival=False)
+                self._local[npc_id] = entry
+
+    def _rebuild(self, gs) -> None:
+        """GameState nuevo (partida nueva / save): ubicar a todos según la hora y armar el heap."""
+        self._owner = gs
+        now = gs.world_time
+        self._heap = []
+        for npc_id, sched in self.schedules.items():
+            if self._simulated(gs, npc_id):
+                entry = sched.entry_at(now)
+                if entry is not None:
+                    self._store(gs, npc_id, entry)
+            self._heap.append((sched.next_change(now), npc_id))
+        heapq.heapify(self._heap)
+        self._last_hour = int(now // MINUTES_PER_HOUR)
+
+    # -------------------------------
+    # Helpers
+    # -------------------------------
+    @staticmethod
+    def _simulated(gs, npc_id: str) -> bool:
+        if gs.get_npc(npc_id).get("active") is False:
+            return False
+        if gs.get_flag(f"recruited:{npc_id}", False):
+            return False
+        return not any(p.get("id") == npc_id for p in gs.party)
+
+    @staticmethod
+    def _store(gs, npc_id: str, entry: ScheduleEntry) -> None:
+        gs.set_npc(npc_id, map=entry.map_id, tile=list(entry.tile), activity=entry.activity)
+
+
+def get_schedule_director(game) -> ScheduleDirector:
+    director = getattr(game, "npc_schedules", None)
+    if director is None:
+        director = ScheduleDirector(load_schedules())
+        game.npc_schedules = director
+    return director
@@ -1,13 +1,14 @@
 # project/engines/world_engine/npc_system.py
 
-import os
-import json
-import pygame
-
-from core.entities.unit import Unit
+from core.entities.unit import DEFAULT_MOVE_SPEED, Unit
+from core.entities.unit_store import HAS_NUMPY, StoredUnit, UnitStore
+from engines.world_engine.cooperative_paths import CooperativePlanner
 from engines.world_engine.npc_controller import MovementController
-from core.assets import asset_path
-from core.config import TILE_SIZE
+from engines.world_engine.world_manifest import door_center_tile, get_world_manifest
+from engines.world_engine.world_routes import get_world_router
+from core.assets import asset_path, asset_exists, load_json_asset
+from core.config import TILE_SIZE, VECTOR_NPCS
+from render.world.character_generator import cached_sheet, villager_settings
 
 
 class NPCSystem:
@@ -15,11 +16,15 @@ class NPCSystem:
     Runtime NPCs (Units) + controllers + tasks + helpers de interacción.
 
     Se encarga de:
-      - spawns runtime (Unit)
-      - update/draw runtime NPCs
-      - tasks walk_to + despawn + persistencia
+      - spawns runtime (Unit); sin visual.walk usa el sheet horneado de su
+        generator.json (render/world/character_generator), y spawn_villager
+        aldeanos con aspecto sorteado por seed
+      - update/draw runtime NPCs (sólo las despiertas; ver wake)
+      - con numpy (VECTOR_NPCS), movimiento/animación vectorizados en un UnitStore
+      - tasks walk_to + despawn + persistencia (caminos planeados en conjunto, ver cooperative_paths)
       - detectar NPC interactuable frente al player (map npc o runtime unit)
-      - aplicar outcomes de roles sobre runtime NPCs (move_to_marker, despawn, join_party)
+      - viajes a otro mapa (travel_to: sale por la puerta que indica world_routes)
+      - aplicar outcomes de roles sobre runtime NPCs (move_to_marker, travel_to, despawn, join_party)
     """
 
     def __init__(self, world_state, collision):
@@ -30,6 +35,24 @@ class NPCSystem:
         self.controllers: dict[str, MovementController] = {}
         self.tasks: dict[str, dict] = {}
 
+        # Units despiertas: las únicas que update() recorre. Una Unit se duerme
+        # sola cuando no tiene task, no se mueve y quedó en el frame idle; la
+        # despiertan un task, un paso (try_move de quien sea), un choque o una
+        # interacción.
+        self._active: set[str] = set()
+
+        # struct-of-arrays: las Units son StoredUnit y update() avanza todas juntas
+        self.store = UnitStore() if (VECTOR_NPCS and HAS_NUMPY) else None
+
+        # walk_to: todos los que caminan planean juntos (reservas espacio-tiempo)
+        self.paths = CooperativePlanner(
+            blocked=self.collision.is_static_blocked,
+            occupied=self.units_at,
+            locate=lambda npc_id: (self.units[npc_id].tile_x, self.units[npc_id].tile_y),
+            step_seconds=TILE_SIZE / DEFAULT_MOVE_SPEED,
+        )
+        self._paths_map = None
+
     # -------------------------
     # Map NPC data helpers
     # -------------------------
@@ -55,27 +78,82 @@ class NPCSystem:
                 return n.get("id"), n, "map"
 
         # 2) runtime units
-        for uid, u in self.units.items():
-            if getattr(u, "tile_x", None) == tx and getattr(u, "tile_y", None) == ty:
-                return uid, None, "runtime"
+        for uid in self.units_at(tx, ty):
+            self.wake(uid)
+            return uid, None, "runtime"
 
         return None, None, None
 
+    def units_at(self, tx: int, ty: int) -> list[str]:
+        """Ids de runtime units paradas (tile lógico) en (tx, ty)."""
+        if self.store is not None:
+            return self.store.ids_at(tx, ty)
+        return [uid for uid, u in self.units.items() if u.tile_x == tx and u.tile_y == ty]
+
     # -------------------------
     # Update / Render
     # -------------------------
-    def update(self, dt: float) -> None:
-        for ctrl in self.controllers.values():
-            ctrl.update(dt)
+    def wake(self, npc_id: str) -> None:
+        if npc_id in self.units:
+            self._active.add(npc_id)
 
-        for u in self.units.values():
-            u.update_sprite(dt)
+    def is_awake(self, npc_id: str) -> bool:
+        return npc_id in self._active
 
+    def update(self, dt: float) -> None:
+        if self.store is not None:
+            # sólo las despiertas, en un paso vectorizado sobre sus slots
+            slots = self._awake_slots()
+            self.store.update(dt, slots)
+        else:
+            self._update_awake(dt)
+
+        self._update_paths(dt)
         self._update_tasks(dt)
 
+        # quieta, sin task y ya en el frame idle (update_sprite): a dormir hasta que la despierten
+        if self.store is not None:
+            self._active &= self.store.moving_ids(slots) | self.tasks.keys()
+            return
+        for npc_id in list(self._active):
+            u = self.units.get(npc_id)
+            if u is None or (not u.is_moving and npc_id not in self.tasks):
+                self._active.discard(npc_id)
+
+    def _awake_slots(self) -> list[int]:
+        slots = []
+        for npc_id in list(self._active):
+            u = self.units.get(npc_id)
+            if u is None:
+                self._active.discard(npc_id)
+            elif isinstance(u, StoredUnit) and u._store is self.store:
+                slots.append(u._slot)
+        return slots
+
+    def _update_awake(self, dt: float) -> None:
+        for npc_id in list(self._active):
+            u = self.units.get(npc_id)
+            if u is None:
+                self._active.discard(npc_id)
+                continue
+            ctrl = self.controllers.get(npc_id)
+            if ctrl is not None:
+                ctrl.update(dt)
+            u.update_sprite(dt)
+
     def draw(self, screen, camera) -> None:
+        # sólo las que caen en pantalla (con un tile de margen)
+        left = camera.x - TILE_SIZE
+        top = camera.y - TILE_SIZE
+        right = camera.x + camera.width
+        bottom = camera.y + camera.height
+        if self.store is not None:
+            for uid in self.store.ids_in_rect(left, top, right, bottom):
+                self.units[uid].draw(screen, camera)
+            return
         for u in self.units.values():
-            u.draw(screen, camera)
+            if left < u.pixel_x < right and top < u.pixel_y < bottom:
+                u.draw(screen, camera)
 
     # -------------------------
     # Spawning
@@ -84,27 +162,53 @@ class NPCSystem:
         if npc_id in self.units:
             return
 
-        npc_json_path = asset_path("sprites", "npcs", npc_id, f"{npc_id}.json")
-        walk_path = None
-        if os.path.exists(npc_json_path):
+        u = self._new_unit(npc_id, tx, ty)
+        self._set_sheet(u, self._walk_sheet_path(npc_id))
+        self._register(npc_id, u)
+
+    def spawn_villager(self, runtime_id: str, seed, tx: int, ty: int) -> bool:
+        """
+        Aldeano de fondo con aspecto propio (seed -> generator settings).
+        Sólo usa sheets ya horneados (tools/sprite_baker.py): no compone al spawnear.
+        """
+        runtime_id = str(runtime_id)
+        if runtime_id in self.units:
+            return True
+
+        sheet = cached_sheet(villager_settings(seed), "walk")
+        u = self._new_unit(runtime_id, tx, ty)
+        self._set_sheet(u, sheet)
+        self._register(runtime_id, u)
+        return sheet is not None
+
+    @staticmethod
+    def _walk_sheet_path(sprite_id: str) -> str | None:
+        """visual.walk del NPC; si no tiene, el sheet horneado de su generator.json."""
+        npc_json_path = asset_path("sprites", "npcs", sprite_id, f"{sprite_id}.json")
+        if asset_exists(npc_json_path):
             try:
-                with open(npc_json_path, "r", encoding="utf-8") as f:
-                    npc_data = json.load(f)
-                walk_path = npc_data.get("visual", {}).get("walk")
+                walk_path = (load_json_asset(npc_json_path).get("visual") or {}).get("walk")
             except Exception:
                 walk_path = None
+            if walk_path:
+                return walk_path
 
-        u = Unit(tile_x=tx, tile_y=ty)
+        gen_path = asset_path("sprites", "npcs", sprite_id, "generator.json")
+        if asset_exists(gen_path):
+            try:
+                return cached_sheet(load_json_asset(gen_path), "walk")
+            except Exception:
+                return None
+        return None
 
+    @staticmethod
+    def _set_sheet(u: Unit, walk_path: str | None) -> None:
         if walk_path:
             try:
-                u._walk_sheet = pygame.image.load(asset_path(*walk_path.split("/"))).convert_alpha()
+                u.set_walk_sheet(walk_path)
             except Exception:
                 pass
 
-        self.units[npc_id] = u
-        self.controllers[npc_id] = MovementController(u, self.collision)
-
     def spawn_intro_line(self, markers: dict, player_tile: tuple[int, int]) -> None:
         ids = ["selma_ironrose", "loren_valcrest", "iraen_falk", "elinya_brightwell"]
         line_markers = ["line_1", "line_2", "line_3", "line_4"]
@@ -127,16 +231,90 @@ class NPCSystem:
         if not target:
             return
         self.tasks[npc_id] = {"type": "walk_to", "target": target, "despawn": True}
+        self.wake(npc_id)
 
-    def set_walk_to(self, npc_id: str, target_tile: tuple[int, int], despawn_on_arrival: bool) -> None:
+    def set_walk_to(self, npc_id: str, target_tile: tuple[int, int], despawn_on_arrival: bool, persist: bool = True) -> None:
+        """
+        persist=False: al despawnear no se marca inactivo en GameState
+        (ej: horarios, el NPC sigue existiendo en otro mapa).
+        """
         if npc_id not in self.units:
             return
-        self.tasks[npc_id] = {"type": "walk_to", "target": target_tile, "despawn": bool(despawn_on_arrival)}
+        self.tasks[npc_id] = {
+            "type": "walk_to",
+            "target": target_tile,
+            "despawn": bool(despawn_on_arrival),
+            "persist": bool(persist),
+        }
+        self.wake(npc_id)
+
+    def travel_to(self, npc_id: str, map_id, tile: tuple[int, int] | None = None) -> bool:
+        """
+        Manda al NPC a (map_id, tile) por la ruta de world_routes: en el mismo
+        mapa camina hasta tile; si no, camina hasta la primera puerta de la
+        ruta y desaparece, y GameState lo deja en el destino (tile=None: el
+        tile de llegada de la puerta por la que entra).
+
+        Devuelve False si no hay ruta (el NPC no se mueve).
+        """
+        unit = self.units.get(npc_id)
+        if unit is None:
+            return False
+
+        router = get_world_router()
+        here = (unit.tile_x, unit.tile_y)
+        if tile is None:
+            legs = router.route_to_map(self.ws.map_id, here, map_id)
+        else:
+            legs = router.route(self.ws.map_id, here, map_id, tile)
+        if not legs:
+            return False
+
+        dest = legs[-1]
+        if len(legs) == 1:
+            self.set_walk_to(npc_id, dest.end, despawn_on_arrival=False)
+            return True
+
+        self.set_walk_to(npc_id, door_center_tile(legs[0].door["rect"]), despawn_on_arrival=True, persist=False)
+        self.ws.game.game_state.set_npc(npc_id, active=True, map=dest.map_id, tile=list(dest.end))
+        return True
+
+    def _new_unit(self, npc_id: str, tx: int, ty: int) -> Unit:
+        if self.store is not None:
+            return StoredUnit(self.store, npc_id, tile_x=tx, tile_y=ty)
+        return Unit(tile_x=tx, tile_y=ty)
+
+    def _register(self, npc_id: str, u: Unit) -> None:
+        self.units[npc_id] = u
+        self.controllers[npc_id] = MovementController(u, self.collision, on_move=lambda: self.wake(npc_id))
+        self._active.add(npc_id)
+
+    def _release(self, u) -> None:
+        if self.store is not None and isinstance(u, StoredUnit):
+            self.store.release(u)
 
     def remove(self, npc_id: str) -> None:
-        self.units.pop(npc_id, None)
+        self._release(self.units.pop(npc_id, None))
+        self.paths.release(npc_id)
         self.controllers.pop(npc_id, None)
-        self.tasks.pop(npc_id, None)
+        self._active.discard(npc_id)
+        if self.tasks.pop(npc_id, None) is not None:
+            # quien esperaba la llegada no se queda colgado
+            self._notify_arrival(npc_id, arrived=False)
+
+    def _notify_arrival(self, npc_id: str, arrived: bool = True) -> None:
+        scheduler = getattr(self.ws, "scheduler", None)
+        if scheduler is not None:
+            scheduler.notify_arrival(npc_id, arrived)
+
+    def _update_paths(self, dt: float) -> None:
+        # distancias cacheadas por objetivo: se descartan si cambia el mapa (o sus chunks)
+        tmap = self.collision.map
+        key = (id(tmap), getattr(tmap, "version", 0))
+        if key != self._paths_map:
+            self._paths_map = key
+            self.paths.invalidate_map()
+        self.paths.update(dt)
 
     def _update_tasks(self, dt: float) -> None:
         for npc_id, task in list(self.tasks.items()):
@@ -147,32 +325,40 @@ class NPCSystem:
             ctrl = self.controllers.get(npc_id)
             if not unit or not ctrl:
                 self.tasks.pop(npc_id, None)
+                self.paths.release(npc_id)
+                self._notify_arrival(npc_id, arrived=False)
                 continue
 
             tx, ty = task["target"]
+            # una lectura por campo (con UnitStore cada acceso es un property)
+            ux, uy, moving = unit.tile_x, unit.tile_y, unit.is_moving
 
-            if unit.tile_x == tx and unit.tile_y == ty:
+            if ux == tx and uy == ty:
+                if moving:
+                    continue
+                self.tasks.pop(npc_id, None)
+                self.paths.release(npc_id)
+                self._notify_arrival(npc_id)
                 if task.get("despawn"):
                     self.remove(npc_id)
-                    self.ws.game.game_state.set_npc(npc_id, active=False, map=None, tile=None)
+                    if task.get("persist", True):
+                        self.ws.game.game_state.set_npc(npc_id, active=False, map=None, tile=None)
                 continue
 
-            if unit.is_moving:
+            if moving:
                 continue
 
-            dx = 0
-            dy = 0
-            if unit.tile_x < tx:
-                dx = 1
-            elif unit.tile_x > tx:
-                dx = -1
-            elif unit.tile_y < ty:
-                dy = 1
-            elif unit.tile_y > ty:
-                dy = -1
-
-            if dx != 0 or dy != 0:
-                ctrl.try_move(dx, dy)
+            self.paths.request(npc_id, (tx, ty))
+            if self.paths.unreachable(npc_id):
+                # el planner se rindió: despertar a quien espera la llegada, con fallo
+                print(f"[NPC] ⚠️ {npc_id}: no hay camino a {(tx, ty)}")
+                self.tasks.pop(npc_id, None)
+                self.paths.release(npc_id)
+                self._notify_arrival(npc_id, arrived=False)
+                continue
+            step = self.paths.next_move(npc_id, (ux, uy))
+            if step is not None:
+                ctrl.try_move(*step)
 
     # -------------------------
     # Role outcomes (declarativo)
@@ -184,11 +370,21 @@ class NPCSystem:
         cfg soporta:
           - move_to_marker: str
           - despawn_on_arrival: bool
+          - travel_to: {map: str, marker?: str, tile?: [x, y]} (ver travel_to)
           - effects: list[{type: "..."}]
         """
         if npc_id not in self.units:
             return
 
+        travel = cfg.get("travel_to")
+        if travel:
+            map_id = travel.get("map")
+            tile = travel.get("tile")
+            if tile is None and travel.get("marker"):
+                tile = get_world_manifest().marker_tile(map_id, travel["marker"])
+            if not self.travel_to(npc_id, map_id, tuple(tile) if tile else None):
+                print(f"[NPC] ⚠️ {npc_id}: sin ruta a {map_id}")
+
         marker_id = cfg.get("move_to_marker")
         if marker_id:
             target = markers.get(marker_id)
@@ -216,31 +412,16 @@ class NPCSystem:
         if runtime_id in self.units:
             return
 
-        npc_json_path = asset_path("sprites", "npcs", sprite_id, f"{sprite_id}.json")
-        walk_path = None
-        if os.path.exists(npc_json_path):
-            try:
-                with open(npc_json_path, "r", encoding="utf-8") as f:
-                    npc_data = json.load(f)
-                walk_path = npc_data.get("visual", {}).get("walk")
-            except Exception:
-                walk_path = None
-
-        u = Unit(tile_x=tx, tile_y=ty)
-
-        if walk_path:
-            try:
-                u._walk_sheet = pygame.image.load(asset_path(*walk_path.split("/"))).convert_alpha()
-            except Exception:
-                pass
-
-        self.units[runtime_id] = u
-        self.controllers[runtime_id] = MovementController(u, self.collision)
+        u = self._new_unit(runtime_id, tx, ty)
+        self._set_sheet(u, self._walk_sheet_path(sprite_id))
+        self._register(runtime_id, u)
 
     def despawn_unit(self, runtime_id: str) -> None:
         """Elimina un Unit previamente spawneado en runtime."""
         runtime_id = str(runtime_id)
         if runtime_id in self.units:
-            del self.units[runtime_id]
+            self._release(self.units.pop(runtime_id))
+        self.paths.release(runtime_id)
         if runtime_id in self.controllers:
-            del self.controllers[runtime_id]
\ No newline at end of file
+            del self.controllers[runtime_id]
+        self._active.discard(runtime_id)
\ No newline at end of file
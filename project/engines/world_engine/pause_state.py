@@ -1,9 +1,8 @@
 import sys
-import json
-import os
 import pygame
 
-from core.assets import asset_path
+from core.assets import asset_path, asset_exists, load_json_asset
+from ui.fonts import get_font
 
 
 class PauseState:
@@ -11,8 +10,8 @@ class PauseState:
         self.game = game
         self.world_state = world_state
 
-        self.font = pygame.font.SysFont(None, 32)
-        self.small_font = pygame.font.SysFont(None, 24)
+        self.font = get_font(32)
+        self.small_font = get_font(24)
 
         # menu | army | unit | bodyguards
         self.mode = "menu"
@@ -215,9 +214,8 @@ class PauseState:
         data = {}
         for p in candidates:
             try:
-                if os.path.exists(p):
-                    with open(p, "r", encoding="utf-8") as f:
-                        data = json.load(f) or {}
+                if asset_exists(p):
+                    data = load_json_asset(p) or {}
                     break
             except Exception:
                 continue
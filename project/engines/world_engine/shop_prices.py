@@ -0,0 +1,178 @@
+# project/engines/world_engine/shop_prices.py
+"""
+Precios de tiendas: una tabla completa por tienda (compra y venta de cada
+ítem) que se arma una vez y se sirve cacheada a la UI.
+
+assets/data/shops.json:
+  - effects: {"price_manipulation": {"buy": 1.2, "sell": 0.8}, ...}
+             efectos ocultos del encargado (GameState.npcs[id].hidden_effects,
+             ver consequences.py) -> multiplicadores de precio
+  - shops:   {"weapon_shop": {"name", "role", "option"?, "economy"?, "sell_ratio"?,
+              "items": {"iron_sword": {"base": 120, "good"?: "iron_sword"}, ...}}}
+             good: bien de la economía que sigue el precio (default: el mismo
+             id si existe; si no, el índice promedio de la tienda)
+             option: texto de la opción que se agrega al hablar con el encargado
+
+Precio de compra = base × índice de la economía (precio actual / base del
+bien) × efectos del encargado × confianza (más confianza, mejor trato).
+Venta = compra × sell_ratio × efectos.
+
+La tabla se cachea por tienda con una clave de sus entradas: la economía
+(uid + versión: otra partida u otro tick diario cambian la clave), encargado,
+sus efectos ocultos y su confianza redondeada. Consultar no recalcula nada mientras esa clave no cambie.
+"""
+from dataclasses import dataclass
+
+from core.assets import asset_exists, asset_path, load_json_asset
+
+SHOPS_PATH = asset_path("data", "shops.json")
+
+TRUST_DISCOUNT = 0.15  # confianza 100 -> -15%, confianza 0 -> +15%
+TRUST_STEP = 5  # la confianza entra a la clave redondeada (evita rearmar por décimas)
+SHOP_PAGE = 3  # ítems por página en el diálogo de la tienda
+
+
+@dataclass(frozen=True)
+class PriceTable:
+    shop_id: str
+    keeper: str | None
+    buy: dict  # item -> precio al que el jugador compra
+    sell: dict  # item -> precio al que la tienda le compra al jugador
+    by_price: tuple  # items ordenados por precio de compra
+
+    def listing(self, offset: int = 0, limit: int | None = None, cheapest_first: bool = True) -> list[tuple]:
+        """[(item, compra, venta)] ya ordenado, paginado para la UI."""
+        items = self.by_price if cheapest_first else self.by_price[::-1]
+        end = None if limit is None else offset + limit
+        return [(i, self.buy[i], self.sell[i]) for i in items[offset:end]]
+
+
+class ShopPrices:
+    """
+    table(gs, shop_id)          -> PriceTable (cacheada)
+    price(gs, shop_id, item)    -> precio de compra
+    item_name(shop_id, item)    -> nombre para la UI
+    shop_kept_by(gs, npc_id)    -> tienda que atiende el NPC (para ofrecerla al hablarle)
+    """
+
+    def __init__(self, config: dict | None = None):
+        config = config if config is not None else _load_config()
+        self.effects = dict(config.get("effects") or {})
+        self.shops = dict(config.get("shops") or {})
+        self._cache: dict[str, tuple] = {}  # shop_id -> (clave, PriceTable)
+
+        # stats (debug)
+        self.builds = 0
+
+    def table(self, gs, shop_id: str) -> PriceTable | None:
+        spec = self.shops.get(shop_id)
+        if spec is None:
+            return None
+        key = self._key(gs, shop_id, spec)
+        hit = self._cache.get(shop_id)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        table = self._build(gs, shop_id, spec, key)
+        self._cache[shop_id] = (key, table)
+        return table
+
+    def price(self, gs, shop_id: str, item: str) -> float | None:
+        table = self.table(gs, shop_id)
+        return None if table is None else table.buy.get(item)
+
+    def item_name(self, shop_id: str, item: str) -> str:
+        raw = ((self.shops.get(shop_id) or {}).get("items") or {}).get(item) or {}
+        return raw.get("name") or item.replace("_", " ").capitalize()
+
+    def shop_kept_by(self, gs, npc_id: str) -> str | None:
+        """Tienda que atiende npc_id (por su rol), o None."""
+        role = gs.npc_role(npc_id)
+        if not role:
+            return None
+        for shop_id, spec in self.shops.items():
+            if spec.get("role") == role and self.keeper_of(gs, shop_id) == npc_id:
+                return shop_id
+        return None
+
+    def keeper_of(self, gs, shop_id: str) -> str | None:
+        role = (self.shops.get(shop_id) or {}).get("role")
+        if not role:
+            return None
+        for npc_id, st in gs.npcs.items():
+            if st.get("role") == role and st.get("active") is not False:
+                return npc_id
+        return None
+
+    # -------------------------------
+    # Internals
+    # -------------------------------
+    def _key(self, gs, shop_id: str, spec: dict) -> tuple:
+        econ = gs.economy()
+        keeper = self.keeper_of(gs, shop_id)
+        effects = ()
+        trust = None
+        if keeper is not None:
+            effects = tuple(e for e in gs.get_npc(keeper).get("hidden_effects", ()) or () if e in self.effects)
+            trust = int(round(gs.npc_trust(keeper) / TRUST_STEP))
+        prices = (econ.uid, econ.version) if econ is not None else None
+        return (prices, keeper, effects, trust)
+
+    def _build(self, gs, shop_id: str, spec: dict, key: tuple) -> PriceTable:
+        self.builds += 1
+        _prices, keeper, effects, trust = key
+
+        econ = gs.economy()
+        econ_shop = spec.get("economy", shop_id)
+        index = {}
+        if econ is not None:
+            for good in econ.shop_goods(econ_shop):
+                index[good] = econ.price_of(econ_shop, good) / econ.base_price(good)
+        shop_index = sum(index.values()) / len(index) if index else 1.0
+
+        buy_mult = sell_mult = 1.0
+        for eff in effects:
+            buy_mult *= float(self.effects[eff].get("buy", 1.0))
+            sell_mult *= float(self.effects[eff].get("sell", 1.0))
+        if trust is not None:
+            t = trust * TRUST_STEP
+            buy_mult *= 1.0 - TRUST_DISCOUNT * (t - 50) / 50
+        sell_ratio = float(spec.get("sell_ratio", 0.5)) * sell_mult
+
+        buy, sell = {}, {}
+        for item, raw in (spec.get("items") or {}).items():
+            raw = raw or {}
+            good = raw.get("good", item)
+            base = raw.get("base")
+            if base is None and econ is not None:
+                base = econ.base_price(good)
+            price = float(base or 0) * index.get(good, shop_index) * buy_mult
+            buy[item] = max(1, round(price))
+            sell[item] = max(0, int(price * sell_ratio))
+
+        return PriceTable(
+            shop_id=shop_id,
+            keeper=keeper,
+            buy=buy,
+            sell=sell,
+            by_price=tuple(sorted(buy, key=lambda i: (buy[i], i))),
+        )
+
+
+def _load_config() -> dict:
+    if not asset_exists(SHOPS_PATH):
+        return {}
+    try:
+        return load_json_asset(SHOPS_PATH) or {}
+    except (OSError, ValueError) as e:
+        print(f"[SHOP] ⚠️ No se pudo leer shops.json: {e}")
+        return {}
+
+
+_prices: ShopPrices | None = None
+
+
+def get_shop_prices() -> ShopPrices:
+    global _prices
+    if _prices is None:
+        _prices = ShopPrices()
+    return _prices
@@ -3,15 +3,16 @@ import pygame
 
 from core.game_state import GameState
 from core.save_manager import load_game, save_path
+from ui.fonts import get_font
 
 
 class StartMenuState:
     def __init__(self, game):
         self.game = game
 
-        self.font_title = pygame.font.SysFont(None, 64)
-        self.font = pygame.font.SysFont(None, 36)
-        self.small = pygame.font.SysFont(None, 24)
+        self.font_title = get_font(64)
+        self.font = get_font(36)
+        self.small = get_font(24)
 
         self.has_save = save_path(slot=1).exists()
 
@@ -31,6 +31,13 @@ class WorldInteractionSystem:
     # -------------------------------------------------
     # Public API
     # -------------------------------------------------
+    def reset_doors(self) -> None:
+        """Estado de puertas limpio (WorldState retomado desde el pool)."""
+        self._door_was_inside = False
+        self._door_cooldown = 0.0
+        self._door_lock_until_exit = False
+        self._door_lock_rect = None
+
     def set_spawn_door_lock(self, door_rect: pygame.Rect, cooldown: float = 0.15) -> None:
         """
         Usar cuando spawneás al player dentro de un rect de puerta, para que no rebote
@@ -134,9 +141,20 @@ class WorldInteractionSystem:
             event_id = props.get("event_id")
             once = bool(props.get("once", True))
 
-            if event_id:
-                # listo para futuro: acá podrías llamar self.ws.run_event(...) etc
-                pass
+            # con un evento corriendo el trigger queda pendiente (no se consume)
+            if self.ws.event_runner.active:
+                continue
 
             if once:
                 self._trigger_fired.add(obj_id)
+
+            # 1) event_id explícito en el trigger de Tiled
+            # 2) si no, evento registrado con trigger="map" y trigger_id = id del objeto
+            if event_id:
+                self.ws.run_event_by_id(str(event_id))
+                return
+
+            ev = self.ws.events.trigger_event(str(props.get("id") or obj_id))
+            if ev is not None:
+                self.ws.run_event(ev)
+                return
@@ -0,0 +1,268 @@
+# project/engines/world_engine/world_manifest.py
+"""
+Manifest del mundo: todos los mapas de assets/maps/world, sus puertas con el
+destino resuelto, el tile de llegada de cada puerta, sus markers y los
+tilesets que usan.
+
+Se arma una vez (tools/world_manifest.py o al primer uso) y se guarda en
+assets/maps/world_manifest.json con el mtime de cada mapa: al arrancar sólo
+se re-escanean los mapas que cambiaron. Con assets.pack (sin archivos sueltos)
+se usa tal cual.
+
+Las transiciones resuelven el spawn con un lookup (arrival) en vez de abrir
+el JSON destino, y otros sistemas pueden consultar el grafo de puertas.
+"""
+import json
+import os
+
+from core.assets import asset_exists, asset_key, asset_path, is_asset_dir, list_assets, load_json_asset
+from core.config import TILE_SIZE
+from engines.world_engine.event_registry import normalize_map_id
+from engines.world_engine.map_loader import TiledMap
+
+MANIFEST_PATH = asset_path("maps", "world_manifest.json")
+MANIFEST_VERSION = 2
+WORLD_MAPS_DIR = asset_path("maps", "world")
+
+
+def _props(obj: dict) -> dict:
+    return {p.get("name"): p.get("value") for p in obj.get("properties", []) or []}
+
+
+def door_center_tile(rect) -> tuple[int, int]:
+    x, y, w, h = rect
+    return int((x + w / 2) // TILE_SIZE), int((y + h / 2) // TILE_SIZE)
+
+
+def scan_map(json_path: str) -> dict:
+    """Datos del manifest de un mapa (sin resolver destinos)."""
+    data = load_json_asset(json_path)
+
+    markers = {}
+    for layer in data.get("layers", []):
+        if layer.get("type") == "objectgroup" and layer.get("name") == "markers":
+            for obj in layer.get("objects", []):
+                marker_id = _props(obj).get("id")
+                if marker_id:
+                    markers[marker_id] = [int(obj["x"] // TILE_SIZE), int(obj["y"] // TILE_SIZE)]
+
+    doors = []
+    for layer in data.get("layers", []):
+        if layer.get("type") != "objectgroup" or layer.get("name") != "puertas":
+            continue
+        for obj in layer.get("objects", []):
+            props = _props(obj)
+            spawn = None
+            if "spawn_x" in props and "spawn_y" in props:
+                spawn = [int(props["spawn_x"]), int(props["spawn_y"])]
+            doors.append({
+                "id": obj.get("id"),
+                "door_id": props.get("id"),
+                "rect": [obj["x"], obj["y"], obj["width"], obj["height"]],
+                "target": props.get("map") or props.get("target_map"),
+                "spawn": spawn,
+                "spawn_door_id": props.get("spawn_door_id"),
+            })
+        break
+
+    tmap = TiledMap(json_path, load_tiles=False, data=data)
+    return {
+        "width": int(data.get("width", 0)),
+        "height": int(data.get("height", 0)),
+        "infinite": bool(data.get("infinite", False)),
+        "tilesets": [asset_key(ts["image"]) for ts in tmap.tilesets],
+        "doors": doors,
+        "markers": markers,
+    }
+
+
+class WorldManifest:
+    """
+    maps: map_id ('maps/world/x.json') -> {width, height, infinite, tilesets, doors, markers}
+
+    Cada puerta queda con:
+      - target:  map_id destino, o None si no apunta a un mapa existente
+      - arrival: {"map", "tile": (tx, ty), "door_rect": (x, y, w, h) | None}
+    """
+
+    def __init__(self, maps: dict[str, dict]):
+        self.maps = maps
+        self._doors_by_id: dict[tuple[str, object], dict] = {}
+        self._resolve()
+
+    # -------------------------------
+    # Consultas
+    # -------------------------------
+    def has_map(self, map_id) -> bool:
+        return normalize_map_id(map_id) in self.maps
+
+    def doors(self, map_id) -> list[dict]:
+        entry = self.maps.get(normalize_map_id(map_id))
+        return entry["doors"] if entry else []
+
+    def arrival(self, origin_map, door: dict) -> dict | None:
+        """Llegada de una puerta (el objeto de Tiled de 'puertas'), o None si el manifest no la conoce."""
+        entry = self._doors_by_id.get((normalize_map_id(origin_map), door.get("id")))
+        if entry is None:
+            return None
+        return entry.get("arrival")
+
+    def neighbors(self, map_id) -> list[str]:
+        out = []
+        for d in self.doors(map_id):
+            if d["target"] and d["target"] not in out:
+                out.append(d["target"])
+        return out
+
+    def door_graph(self) -> dict[str, list[str]]:
+        return {map_id: self.neighbors(map_id) for map_id in self.maps}
+
+    def marker_tile(self, map_id, marker_id: str) -> tuple[int, int] | None:
+        entry = self.maps.get(normalize_map_id(map_id))
+        tile = (entry or {}).get("markers", {}).get(marker_id)
+        return tuple(tile) if tile else None
+
+    def door_to(self, map_id, target_map) -> dict | None:
+        """Primera puerta de map_id que lleva a target_map."""
+        target = normalize_map_id(target_map)
+        for d in self.doors(map_id):
+            if d["target"] == target:
+                return d
+        return None
+
+    def tilesets(self, map_id) -> list[str]:
+        entry = self.maps.get(normalize_map_id(map_id))
+        return list(entry["tilesets"]) if entry else []
+
+    # -------------------------------
+    # Resolución (mismas reglas que MapTransitionSystem)
+    # -------------------------------
+    def _resolve(self) -> None:
+        for map_id, entry in self.maps.items():
+            for door in entry["doors"]:
+                raw = door.get("raw_target", door.get("target"))
+                door["raw_target"] = raw
+                target = normalize_map_id(raw) if raw else None
+                door["target"] = target if target in self.maps else None
+                self._doors_by_id[(map_id, door["id"])] = door
+
+        for map_id, entry in self.maps.items():
+            for door in entry["doors"]:
+                door["arrival"] = self._arrival(map_id, door) if door["target"] else None
+
+    def _arrival(self, origin: str, door: dict) -> dict:
+        dest_id = door["target"]
+        dest_doors = self.maps[dest_id]["doors"]
+
+        # mapa destino sin puertas: spawn 0,0
+        if not dest_doors:
+            return {"map": dest_id, "tile": (0, 0), "door_rect": None}
+
+        dest_door = None
+
+        # 1) spawn explícito en la puerta de entrada (+ spawn_door_id para el lock)
+        if door.get("spawn"):
+            tile = tuple(door["spawn"])
+            if door.get("spawn_door_id"):
+                for d in dest_doors:
+                    if d.get("door_id") == door["spawn_door_id"]:
+                        dest_door = d
+                        break
+        else:
+            # 2) la puerta del destino que vuelve al origen, o la primera
+            for d in dest_doors:
+                if d.get("target") == origin:
+                    dest_door = d
+                    break
+            if dest_door is None:
+                dest_door = dest_doors[0]
+            tile = door_center_tile(dest_door["rect"])
+
+        rect = tuple(dest_door["rect"]) if dest_door is not None else None
+        return {"map": dest_id, "tile": tile, "door_rect": rect}
+
+
+# -------------------------
+# Build + cache por mtime
+# -------------------------
+def _map_mtime(path: str) -> float | None:
+    # None: el mapa viene del pack (no hay archivo suelto para comparar)
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def build_manifest(write: bool = True, force: bool = False) -> WorldManifest:
+    """
+    Arma el manifest re-escaneando sólo los mapas cuyo mtime cambió respecto
+    del cache. Si algo cambió y write=True, reescribe el cache.
+    """
+    cached = {}
+    if not force and asset_exists(MANIFEST_PATH):
+        try:
+            raw = load_json_asset(MANIFEST_PATH)
+            if raw.get("version") == MANIFEST_VERSION:
+                cached = raw.get("maps", {})
+        except (OSError, ValueError) as e:
+            print(f"[WORLD] ⚠️ Manifest ilegible, se regenera: {e}")
+
+    names = list_assets(WORLD_MAPS_DIR) if is_asset_dir(WORLD_MAPS_DIR) else []
+
+    scans: dict[str, dict] = {}
+    dirty = False
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(WORLD_MAPS_DIR, name)
+        map_id = normalize_map_id(asset_key(path))
+        mtime = _map_mtime(path)
+
+        prev = cached.get(map_id)
+        if prev is not None and (mtime is None or prev.get("mtime") == mtime):
+            scans[map_id] = prev
+            continue
+
+        try:
+            scan = scan_map(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[WORLD] ❌ No se pudo escanear {map_id}: {e}")
+            continue
+        scan["mtime"] = mtime
+        scans[map_id] = scan
+        dirty = True
+
+    if set(cached) - set(scans):
+        dirty = True
+
+    if dirty and write:
+        _write_cache(scans)
+
+    # WorldManifest resuelve destinos in-place: trabajar sobre copias del cache
+    return WorldManifest(json.loads(json.dumps(scans)))
+
+
+def _write_cache(scans: dict[str, dict]) -> None:
+    try:
+        with open(MANIFEST_PATH + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "maps": scans}, f, ensure_ascii=False, indent=1)
+        os.replace(MANIFEST_PATH + ".tmp", MANIFEST_PATH)
+    except OSError as e:
+        # build de distribución (assets de sólo lectura): se usa en memoria
+        print(f"[WORLD] ⚠️ No se pudo guardar el manifest: {e}")
+
+
+_manifest: WorldManifest | None = None
+
+
+def get_world_manifest() -> WorldManifest:
+    global _manifest
+    if _manifest is None:
+        _manifest = build_manifest()
+    return _manifest
+
+
+def reset_world_manifest() -> None:
+    """Descarta el manifest en memoria (ej: el editor de mapas guardó cambios)."""
+    global _manifest
+    _manifest = None
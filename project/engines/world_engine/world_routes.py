@@ -0,0 +1,328 @@
+# project/engines/world_engine/world_routes.py
+"""
+Rutas de NPCs entre mapas (jerárquicas).
+
+  - Arriba: grafo de puertas del manifest. Nodos = tile de salida de cada
+    puerta y tile de llegada al otro lado; aristas = cruzar la puerta (1 paso)
+    y caminar dentro de un mapa entre dos nodos (largo real del camino).
+    Se arma una vez por manifest; una consulta es un Dijkstra sobre unas
+    pocas decenas de nodos.
+  - Abajo: por mapa, la grilla de colisión (sin cargar tiles) y campos de
+    distancia BFS desde cada tile de puerta, cacheados: costo y camino
+    puerta -> puerta salen de ahí sin volver a buscar.
+
+route(mapa A, tile, mapa B, tile) devuelve los tramos (RouteLeg): en cada
+mapa, desde dónde hasta qué puerta (o hasta el tile final). Las rutas también
+se cachean, así muchos NPCs con los mismos horarios cuestan un lookup.
+
+Mapas infinitos/streaming no tienen grilla acá: se estiman con Manhattan
+(el paso a paso en el mapa cargado lo resuelve cooperative_paths igual).
+"""
+import heapq
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from core.assets import asset_path
+from core.world.clock import GAME_MINUTES_PER_SECOND
+from core.config import TILE_SIZE
+from core.entities.unit import DEFAULT_MOVE_SPEED
+from engines.world_engine.event_registry import normalize_map_id
+from engines.world_engine.map_loader import TiledMap
+from engines.world_engine.world_manifest import door_center_tile, get_world_manifest
+
+DOOR_COST = 1  # cruzar una puerta cuenta como un paso
+FIELD_CACHE = 64  # campos BFS de tiles que no son puertas (destinos/orígenes sueltos)
+ROUTE_CACHE = 256
+
+
+@dataclass(frozen=True)
+class RouteLeg:
+    map_id: str
+    start: tuple[int, int]
+    end: tuple[int, int]
+    door: dict | None  # puerta por la que se sale al final del tramo (None: último tramo)
+    steps: int
+
+
+class _MapGrid:
+    """Colisión estática de un mapa fijo (tiles bloqueados) para BFS offline."""
+
+    def __init__(self, width: int, height: int, blocked: frozenset):
+        self.width = width
+        self.height = height
+        self.blocked = blocked
+
+    def walkable(self, tx: int, ty: int) -> bool:
+        return 0 <= tx < self.width and 0 <= ty < self.height and (tx, ty) not in self.blocked
+
+    def field(self, source: tuple[int, int]) -> dict[tuple[int, int], int]:
+        """
+        Distancia en pasos desde source a cada tile alcanzable. Las puertas
+        suelen caer sobre colisión: source puede estar bloqueado y los tiles
+        bloqueados vecinos quedan con distancia (como extremo, no se expanden).
+        """
+        dist = {source: 0}
+        queue = deque((source,))
+        while queue:
+            x, y = queue.popleft()
+            d = dist[(x, y)] + 1
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if (nx, ny) in dist or not (0 <= nx < self.width and 0 <= ny < self.height):
+                    continue
+                dist[(nx, ny)] = d
+                if (nx, ny) not in self.blocked:
+                    queue.append((nx, ny))
+        return dist
+
+
+class WorldRouter:
+    """Planificador jerárquico de rutas entre mapas (ver docstring del módulo)."""
+
+    def __init__(self, manifest):
+        self.manifest = manifest
+        self._grids: dict[str, _MapGrid | None] = {}
+
+        # campos BFS: los de tiles de puerta quedan siempre, el resto en LRU
+        self._door_fields: dict[tuple[str, tuple[int, int]], dict] = {}
+        self._fields: "OrderedDict[tuple[str, tuple[int, int]], dict]" = OrderedDict()
+        self._routes: "OrderedDict[tuple, list[RouteLeg] | None]" = OrderedDict()
+        self._paths: "OrderedDict[tuple, list[tuple[int, int]] | None]" = OrderedDict()
+
+        # nodo = (map_id, tile); exits[map] = [(tile, puerta)], edges[nodo] = [(costo, nodo, puerta)]
+        self._exits: dict[str, list[tuple[tuple[int, int], dict]]] = {}
+        self._entries: dict[str, list[tuple[int, int]]] = {}
+        self._edges: dict[tuple[str, tuple[int, int]], list] = {}
+        self._build_graph()
+
+    # -------------------------------
+    # API
+    # -------------------------------
+    def route(self, from_map, from_tile, to_map, to_tile) -> list[RouteLeg] | None:
+        """Tramos de (from_map, from_tile) a (to_map, to_tile), o None si no hay camino."""
+        a_map, b_map = normalize_map_id(from_map), normalize_map_id(to_map)
+        a, b = (int(from_tile[0]), int(from_tile[1])), (int(to_tile[0]), int(to_tile[1]))
+        key = (a_map, a, b_map, b)
+        if key in self._routes:
+            self._routes.move_to_end(key)
+            return self._routes[key]
+
+        legs = self._search(a_map, a, b_map, b)
+        self._routes[key] = legs
+        if len(self._routes) > ROUTE_CACHE:
+            self._routes.popitem(last=False)
+        return legs
+
+    def route_to_map(self, from_map, from_tile, to_map) -> list[RouteLeg] | None:
+        """La ruta más corta hasta entrar a to_map (termina en el tile de llegada de una puerta)."""
+        best = None
+        for tile in dict.fromkeys(self._entries.get(normalize_map_id(to_map), ())):
+            legs = self.route(from_map, from_tile, to_map, tile)
+            if legs and (best is None or sum(l.steps for l in legs) < sum(l.steps for l in best)):
+                best = legs
+        return best
+
+    def first_door(self, from_map, from_tile, to_map, to_tile) -> dict | None:
+        """Puerta por la que hay que salir de from_map (None: mismo mapa o sin ruta)."""
+        legs = self.route(from_map, from_tile, to_map, to_tile)
+        return legs[0].door if legs else None
+
+    def entry_tile(self, from_map, from_tile, to_map, to_tile) -> tuple[int, int] | None:
+        """Tile por el que se entra a to_map viniendo de from_map (None: sin ruta)."""
+        legs = self.route(from_map, from_tile, to_map, to_tile)
+        return legs[-1].start if legs else None
+
+    def travel_minutes(self, legs: list[RouteLeg], move_speed: float = DEFAULT_MOVE_SPEED) -> float:
+        """Minutos de juego que tarda una Unit en recorrer los tramos."""
+        steps = sum(leg.steps for leg in legs)
+        return steps * (TILE_SIZE / move_speed) * GAME_MINUTES_PER_SECOND
+
+    def leg_path(self, leg: RouteLeg) -> list[tuple[int, int]] | None:
+        """Tiles del tramo (sin el inicial); None si el mapa no tiene grilla."""
+        return self.path(leg.map_id, leg.start, leg.end)
+
+    def path(self, map_id, start, goal) -> list[tuple[int, int]] | None:
+        map_id = normalize_map_id(map_id)
+        key = (map_id, tuple(start), tuple(goal))
+        if key in self._paths:
+            self._paths.move_to_end(key)
+            return self._paths[key]
+
+        out = None
+        goal = tuple(goal)
+        field = self._field(map_id, goal)
+        if field is not None and tuple(start) in field:
+            # bajar por el campo del objetivo (sin pisar colisión salvo el objetivo)
+            grid = self._grids[map_id]
+            out = []
+            x, y = start
+            d = field[(x, y)]
+            while d > 0:
+                for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                    if field.get((nx, ny)) == d - 1 and (grid.walkable(nx, ny) or (nx, ny) == goal):
+                        x, y, d = nx, ny, d - 1
+                        out.append((x, y))
+                        break
+                else:
+                    out = None
+                    break
+
+        self._paths[key] = out
+        if len(self._paths) > ROUTE_CACHE:
+            self._paths.popitem(last=False)
+        return out
+
+    # -------------------------------
+    # Nivel alto: grafo de puertas
+    # -------------------------------
+    def _build_graph(self) -> None:
+        for map_id in self.manifest.maps:
+            exits = []
+            for door in self.manifest.doors(map_id):
+                arrival = door.get("arrival")
+                if door.get("target") and arrival:
+                    exits.append((door_center_tile(door["rect"]), door))
+                    self._entries.setdefault(arrival["map"], []).append(tuple(arrival["tile"]))
+            self._exits[map_id] = exits
+
+        for map_id in self.manifest.maps:
+            # una puerta suele ser salida y llegada a la vez: nodos sin repetir
+            nodes = list(dict.fromkeys([t for t, _ in self._exits[map_id]] + self._entries.get(map_id, [])))
+            for tile, door in self._exits[map_id]:
+                arrival = door["arrival"]
+                self._edges.setdefault((map_id, tile), []).append(
+                    (DOOR_COST, (arrival["map"], tuple(arrival["tile"])), door)
+                )
+            # caminar dentro del mapa: de cualquier nodo a cada salida
+            for src in nodes:
+                for exit_tile, _ in self._exits[map_id]:
+                    if src == exit_tile:
+                        continue
+                    cost = self._distance(map_id, src, exit_tile)
+                    if cost is not None:
+                        self._edges.setdefault((map_id, src), []).append((cost, (map_id, exit_tile), None))
+
+    def _search(self, a_map: str, a: tuple[int, int], b_map: str, b: tuple[int, int]) -> list[RouteLeg] | None:
+        if a_map == b_map:
+            direct = self._distance(a_map, a, b)
+            if direct is not None:
+                return [RouteLeg(a_map, a, b, None, direct)]
+
+        start, goal = (a_map, a), (b_map, b)
+        best = {start: 0}
+        prev: dict = {}
+        heap = [(0, 0, start)]
+        tie = 1
+
+        # origen -> salidas del mapa de origen
+        def neighbors(node):
+            if node == start:
+                for exit_tile, _ in self._exits.get(a_map, ()):
+                    cost = self._distance(a_map, a, exit_tile)
+                    if cost is not None:
+                        yield cost, (a_map, exit_tile), None
+                return
+            yield from self._edges.get(node, ())
+            # llegadas al mapa destino -> tile final
+            if node[0] == b_map:
+                cost = self._distance(b_map, node[1], b)
+                if cost is not None:
+                    yield cost, goal, None
+
+        while heap:
+            d, _, node = heapq.heappop(heap)
+            if node == goal:
+                return self._legs(prev, start, goal)
+            if d > best.get(node, d):
+                continue
+            for cost, nxt, door in neighbors(node):
+                nd = d + cost
+                if nd < best.get(nxt, nd + 1):
+                    best[nxt] = nd
+                    prev[nxt] = (node, door, cost)
+                    heapq.heappush(heap, (nd, tie, nxt))
+                    tie += 1
+        return None
+
+    @staticmethod
+    def _legs(prev: dict, start, goal) -> list[RouteLeg]:
+        # reconstruir nodos y partir en tramos en cada cruce de puerta
+        hops = []
+        node = goal
+        while node != start:
+            parent, door, cost = prev[node]
+            hops.append((parent, node, door, cost))
+            node = parent
+        hops.reverse()
+
+        legs = []
+        leg_start, steps = start, 0
+        for parent, node, door, cost in hops:
+            if door is not None:
+                legs.append(RouteLeg(parent[0], leg_start[1], parent[1], door, steps))
+                leg_start, steps = node, 0
+            else:
+                steps += cost
+        legs.append(RouteLeg(goal[0], leg_start[1], goal[1], None, steps))
+        return legs
+
+    # -------------------------------
+    # Nivel bajo: grillas + campos BFS
+    # -------------------------------
+    def _distance(self, map_id: str, a: tuple[int, int], b: tuple[int, int]) -> int | None:
+        if a == b:
+            return 0
+        field = self._field(map_id, b)
+        if field is None:
+            return abs(a[0] - b[0]) + abs(a[1] - b[1])
+        return field.get(a)
+
+    def _field(self, map_id: str, tile: tuple[int, int]) -> dict | None:
+        key = (map_id, tile)
+        field = self._door_fields.get(key)
+        if field is not None:
+            return field
+        field = self._fields.get(key)
+        if field is not None:
+            self._fields.move_to_end(key)
+            return field
+
+        grid = self._grid(map_id)
+        if grid is None:
+            return None
+        field = grid.field(tile)
+
+        is_door = any(t == tile for t, _ in self._exits.get(map_id, ())) or tile in self._entries.get(map_id, ())
+        if is_door:
+            self._door_fields[key] = field
+        else:
+            self._fields[key] = field
+            if len(self._fields) > FIELD_CACHE:
+                self._fields.popitem(last=False)
+        return field
+
+    def _grid(self, map_id: str) -> _MapGrid | None:
+        if map_id in self._grids:
+            return self._grids[map_id]
+
+        grid = None
+        entry = self.manifest.maps.get(map_id) or {}
+        if not entry.get("infinite"):
+            try:
+                tmap = TiledMap(asset_path(map_id), load_tiles=False)
+                grid = _MapGrid(tmap.width, tmap.height, frozenset(tmap.collision))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[ROUTES] ⚠️ Sin grilla para {map_id}: {e}")
+        self._grids[map_id] = grid
+        return grid
+
+
+_router: WorldRouter | None = None
+
+
+def get_world_router() -> WorldRouter:
+    """Router del manifest actual (se rehace si el manifest se descartó)."""
+    global _router
+    manifest = get_world_manifest()
+    if _router is None or _router.manifest is not manifest:
+        _router = WorldRouter(manifest)
+    return _router
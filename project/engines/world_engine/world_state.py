@@ -1,6 +1,6 @@
 # project/engines/world_engine/world_state.py
 
-from engines.world_engine.map_loader import TiledMap
+from engines.world_engine.map_stream import open_map
 from engines.world_engine.collision import CollisionSystem
 from engines.world_engine.dialogue_system import DialogueSystem
 from engines.world_engine.npc_system import NPCSystem
@@ -9,15 +9,22 @@ from engines.world_engine.map_data import MapData
 from engines.world_engine.map_transition_system import MapTransitionSystem
 from engines.world_engine.assign_roles_system import AssignRolesSystem
 from engines.world_engine.npc_controller import MovementController
-from engines.world_engine.event_runner import EventRunner
+from engines.world_engine.event_runner import EventRunner, ambient_script
+from engines.world_engine.event_scheduler import EventScheduler
+from engines.world_engine.event_registry import get_event_registry, normalize_map_id
+from engines.world_engine.npc_schedule import get_schedule_director
+from engines.world_engine.dialogue_rules import get_dialogue_rules
+from engines.world_engine.consequences import get_consequence_engine
+from engines.world_engine.shop_prices import SHOP_PAGE, get_shop_prices
 
 from core.entities.unit import Unit
 from core.config import TILE_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT
+from core.world.clock import GAME_MINUTES_PER_SECOND
 from render.world.camera import Camera
+from render.world.map_renderer import ScrollingMapRenderer
 from core.assets import asset_path
 
 import pygame
-import json
 
 
 class WorldState:
@@ -25,25 +32,22 @@ class WorldState:
         from collections import deque
 
         self.game = game
+        # GameState con el que se armó (el pool no guarda states de otra partida)
+        self.owner_state = game.game_state
 
-        # ✅ Guardar mapa actual EXACTAMENTE como llega (string o tuple/list)
-        # Esto evita romper tu lógica actual y permite reabrir el mapa correcto al cargar.
-        try:
-            if isinstance(map_rel_path, (tuple, list)):
-                self.game.game_state.current_map_id = tuple(map_rel_path)
-            else:
-                self.game.game_state.current_map_id = str(map_rel_path)
-        except Exception:
-            pass
+        self._set_current_map(map_rel_path)
 
         if isinstance(map_rel_path, (tuple, list)):
             json_path = asset_path(*map_rel_path)
         else:
             json_path = asset_path(map_rel_path)
 
-        self.map = TiledMap(json_path=json_path, assets_root=asset_path(""))
+        self.map_id = normalize_map_id(map_rel_path)
 
-        self.map_data = MapData(self.map.json_path, tile_size=TILE_SIZE)
+        # TiledMap fijo o StreamingTiledMap (mapas infinite / con .chunks)
+        self.map = open_map(json_path, assets_root=asset_path(""))
+
+        self.map_data = MapData(self.map.json_path, tile_size=TILE_SIZE, data=getattr(self.map, "meta", None))
 
         self.markers = self.map_data.load_markers()
         self.markers_static = self.map_data.load_markers_static()
@@ -52,23 +56,30 @@ class WorldState:
 
         self.input_locked = False
 
+        # scripts concurrentes (eventos en espera + NPCs ambientales del mapa)
+        self.scheduler = EventScheduler(get_flag=self.game.game_state.get_flag)
+        self.game.game_state.on_flag_change = self.scheduler.notify_flag
+
         # ✅ collision (SIN tile_size)
         self.collision = CollisionSystem(
             self.map,
-            get_npc_units=lambda: self.npc_system.units if hasattr(self, "npc_system") else {}
+            get_npc_units=lambda: self.npc_system.units if hasattr(self, "npc_system") else {},
+            on_bump=lambda npc_id: self.npc_system.wake(npc_id),
+            get_units_at=lambda tx, ty: self.npc_system.units_at(tx, ty) if hasattr(self, "npc_system") else (),
         )
         self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.map_renderer = ScrollingMapRenderer(layer_order=("mapa",))
 
         # spawn player
-        if spawn_tile is not None:
-            px, py = spawn_tile
-            self.game.game_state.set_player_tile(px, py)
-        else:
-            px, py = self.game.game_state.get_player_tile()
+        px, py = self._resolve_spawn(spawn_tile)
 
         self.player = Unit(tile_x=px, tile_y=py)
         self.controller = MovementController(self.player, self.collision)
 
+        # streaming: chunks alrededor del spawn cargados antes del primer frame
+        self.camera.follow(self.player.pixel_x, self.player.pixel_y)
+        self.map.update_streaming(self.player.pixel_x, self.player.pixel_y, SCREEN_WIDTH, SCREEN_HEIGHT, block=True)
+
         # input
         self.move_dir = None
         self.move_timer = 0
@@ -85,12 +96,21 @@ class WorldState:
         # ✅ placements estables (advisor, etc.)
         self._apply_static_role_placements()
 
+        # horarios de NPCs (detalle completo acá, grueso en el resto del mundo)
+        self.schedules = get_schedule_director(game)
+        self.schedules.sync(self)
+
+        # efectos ocultos / traiciones (reglas indexadas por hecho)
+        self.consequences = get_consequence_engine(game)
+
+        self.events = get_event_registry()
         self.event_runner = EventRunner(self)
         self._event_assignments = {}
         self._event_apply_role_outcomes_step = None
 
         if not self.game.game_state.get_flag("intro_done", False):
             self.start_intro_event()
+        self.start_auto_events()
 
         # -----------------------------
         # ✅ Guardaespaldas (follow natural)
@@ -114,6 +134,95 @@ class WorldState:
         # Compat: usado por Interaction/Transition systems
         # --------------------------------
 
+    def _set_current_map(self, map_rel_path) -> None:
+        # ✅ Guardar mapa actual EXACTAMENTE como llega (string o tuple/list)
+        # Esto evita romper tu lógica actual y permite reabrir el mapa correcto al cargar.
+        try:
+            if isinstance(map_rel_path, (tuple, list)):
+                self.game.game_state.current_map_id = tuple(map_rel_path)
+            else:
+                self.game.game_state.current_map_id = str(map_rel_path)
+        except Exception:
+            pass
+
+    def _resolve_spawn(self, spawn_tile) -> tuple[int, int]:
+        if spawn_tile is not None:
+            px, py = spawn_tile
+            self.game.game_state.set_player_tile(px, py)
+            return px, py
+        return self.game.game_state.get_player_tile()
+
+    # --------------------------------
+    # Pool de mapas (WorldStatePool): suspender / retomar
+    # --------------------------------
+    def suspend(self) -> None:
+        """
+        Sale del mapa sin destruirlo: queda en el pool con NPCs, tasks y caches.
+        Los guardaespaldas se despawnean (se re-spawnean junto al jugador al volver).
+        """
+        self.move_dir = None
+        self.move_timer = 0
+        self._snap_unit(self.player, self.player.tile_x, self.player.tile_y)
+
+        for rid in list(self._bodyguard_runtime_ids):
+            self.npc_system.despawn_unit(rid)
+        self._bodyguard_runtime_ids = []
+
+        if self.game.game_state.on_flag_change == self.scheduler.notify_flag:
+            self.game.game_state.on_flag_change = None
+
+    def resume(self, map_rel_path, spawn_tile=None) -> None:
+        """
+        Vuelve a este mapa desde el pool y lo re-sincroniza con GameState
+        (lo que pudo cambiar en otros mapas: flags, reclutas, roles, guardaespaldas).
+        """
+        gs = self.game.game_state
+        self._set_current_map(map_rel_path)
+
+        gs.on_flag_change = self.scheduler.notify_flag
+        self.scheduler.resync_flags()
+
+        px, py = self._resolve_spawn(spawn_tile)
+        self._snap_unit(self.player, px, py)
+        self.camera.follow(self.player.pixel_x, self.player.pixel_y)
+        self.map.update_streaming(self.player.pixel_x, self.player.pixel_y, SCREEN_WIDTH, SCREEN_HEIGHT, block=True)
+
+        self.interactions.reset_doors()
+
+        # NPCs: reclutados en otro lado desaparecen; roles persistidos se re-aplican
+        self.map.npcs = self.npc_system.filter_map_npcs(getattr(self.map, "npcs", []) or [])
+        for npc_id in list(self.npc_system.units):
+            if not npc_id.startswith(self._bg_prefix) and gs.get_flag(f"recruited:{npc_id}", False):
+                self.npc_system.remove(npc_id)
+        self._apply_static_role_placements()
+        self.schedules.sync(self)
+
+        if not gs.get_flag("intro_done", False):
+            self.start_intro_event()
+        self.start_auto_events()
+
+        self._last_player_tile = (self.player.tile_x, self.player.tile_y)
+        self._follow_history.clear()
+        self._follow_history.appendleft(self._last_player_tile)
+        self.sync_bodyguards()
+
+    def dispose(self) -> None:
+        """Sale del pool para siempre: corta scripts y el worker de streaming."""
+        self.scheduler.cancel_all()
+        close = getattr(self.map, "close", None)
+        if close is not None:
+            close()
+
+    @staticmethod
+    def _snap_unit(u, tx: int, ty: int) -> None:
+        u.tile_x = int(tx)
+        u.tile_y = int(ty)
+        u.pixel_x = u.tile_x * TILE_SIZE
+        u.pixel_y = u.tile_y * TILE_SIZE
+        u.target_x = u.pixel_x
+        u.target_y = u.pixel_y
+        u.is_moving = False
+
     # --------------------------------
     # Compat: usado por Interaction/Transition systems
     # --------------------------------
@@ -169,6 +278,7 @@ class WorldState:
         self.controller.update(dt)
         self.player.update_sprite(dt)
         self.camera.follow(self.player.pixel_x, self.player.pixel_y)
+        self.map.update_streaming(self.player.pixel_x, self.player.pixel_y, SCREEN_WIDTH, SCREEN_HEIGHT)
 
         if (not self.input_locked) and self.move_dir and not self.player.is_moving:
             self.controller.try_move(*self.move_dir)
@@ -185,10 +295,40 @@ class WorldState:
         self.npc_system.update(dt)
         self.interactions.update(dt)
 
+        # una puerta pudo cambiar de mapa y suspender este estado: el resto del
+        # frame lo corre el WorldState nuevo
+        if self.game.state is not self:
+            return
+
         # persistir tile del jugador
         self.game.game_state.set_player_tile(self.player.tile_x, self.player.tile_y)
 
         self.event_runner.update(dt)
+        self.scheduler.update(dt)
+
+        # reloj del mundo: corre mientras se juega (no en eventos con input bloqueado)
+        if not self.input_locked:
+            self.game.game_state.world_time += dt * GAME_MINUTES_PER_SECOND
+        self.schedules.update(self)
+
+        # decisiones del frame + relax diario de la confianza, en lote (core/world/morality.py)
+        sim = self.game.game_state.morality()
+        if sim is not None:
+            sim.tick(self.game.game_state.world_time)
+
+        # economía: tick diario en el worker; acá sólo el punto de sincronización
+        econ = self.game.game_state.economy()
+        if econ is not None:
+            econ.update(self.game.game_state)
+
+        # edificios: sólo salen del heap los trabajos que vencieron (sus eventos
+        # quedan en GameState.pending_events)
+        self.game.game_state.advance_buildings()
+
+        # sólo re-evalúa las reglas cuyos hechos cambiaron; puede lanzar eventos
+        self.consequences.update(self)
+
+        self._run_queued_event()
 
     # -------------------------------
     # Interacción (hablar)
@@ -207,6 +347,12 @@ class WorldState:
         if self.event_runner.active and self.event_runner.on_player_interact(npc_id):
             return
 
+        if not self.event_runner.active:
+            ev = self._first_pending(self.events.talk_events(npc_id, self.map_id))
+            if ev is not None:
+                self.run_event(ev)
+                return
+
         if source == "map" and npc_data:
             self.open_dialogue(
                 npc_data.get("name", ""),
@@ -215,16 +361,67 @@ class WorldState:
                 context={"npc_id": npc_id, "npc": npc_data}
             )
         else:
+            # runtime NPC: la línea que mejor encaja con el contexto (dialogue_rules)
+            line = get_dialogue_rules().pick(self.game.game_state, npc_id, self.map_id)
+            options = list(line.options) if line and line.options else []
+
+            # el encargado de una tienda siempre la ofrece, gane la línea que gane
+            prices = get_shop_prices()
+            shop_id = prices.shop_kept_by(self.game.game_state, npc_id)
+            if shop_id and not any(str(o.get("action", "")).startswith("shop:") for o in options):
+                shop_opt = {"text": prices.shops[shop_id].get("option", "Ver mercancía"), "action": f"shop:{shop_id}"}
+                options = [shop_opt] + (options or [{"text": "Salir", "action": "close"}])
+
             self.open_dialogue(
                 npc_id.replace("_", " ").title(),
-                ["..."],
-                options=None,
+                list(line.lines) if line else ["..."],
+                options=options or None,
                 context={"npc_id": npc_id}
             )
 
     def open_dialogue(self, speaker: str, lines, options=None, context=None):
         self.dialogue.open(speaker, lines, options=options, context=context or {})
 
+    # -------------------------------
+    # Tiendas (precios cacheados en shop_prices)
+    # -------------------------------
+    def open_shop(self, shop_id: str, page: int = 0) -> None:
+        prices = get_shop_prices()
+        table = prices.table(self.game.game_state, shop_id)
+        if table is None:
+            self.open_dialogue("Tienda", ["No hay nada a la venta."], options=[{"text": "Salir", "action": "close"}])
+            return
+
+        spec = prices.shops[shop_id]
+        name = spec.get("name", shop_id)
+        if spec.get("role") and table.keeper is None:
+            self.open_dialogue(name, ["Está cerrado: nadie atiende el mostrador."],
+                               options=[{"text": "Salir", "action": "close"}])
+            return
+
+        rows = table.listing(page * SHOP_PAGE, SHOP_PAGE)
+        options = [
+            {"text": f"{prices.item_name(shop_id, item)} - {buy}", "action": f"shop_item:{shop_id}:{item}"}
+            for item, buy, _sell in rows
+        ]
+        if (page + 1) * SHOP_PAGE < len(table.by_price):
+            options.append({"text": "Más...", "action": f"shop:{shop_id}:{page + 1}"})
+        options.append({"text": "Salir", "action": "close"})
+        self.open_dialogue(name, ["¿Qué le interesa, mi lord?"], options=options, context={"shop": shop_id})
+
+    def show_shop_item(self, shop_id: str, item: str) -> None:
+        prices = get_shop_prices()
+        table = prices.table(self.game.game_state, shop_id)
+        if table is None or item not in table.buy:
+            self.open_shop(shop_id)
+            return
+        self.open_dialogue(
+            prices.shops[shop_id].get("name", shop_id),
+            [f"{prices.item_name(shop_id, item)}: se vende a {table.buy[item]}, se compra a {table.sell[item]}."],
+            options=[{"text": "Volver", "action": f"shop:{shop_id}"}, {"text": "Salir", "action": "close"}],
+            context={"shop": shop_id},
+        )
+
     # llamada desde DialogueSystem
     def _dialogue_action_recruit(self, unit_id: str, speaker: str, npc_id: str | None):
         """Recluta una unidad y persiste sus stats.
@@ -248,14 +445,11 @@ class WorldState:
         npc_key = str(npc_id or unit_id)
         npc_stats: dict = {}
         try:
-            from core.assets import asset_path  # import local para evitar ciclos en import time
-            import os as _os
-            import json as _json
+            from core.assets import asset_exists, load_json_asset  # import local para evitar ciclos en import time
 
             npc_json_path = asset_path("sprites", "npcs", npc_key, f"{npc_key}.json")
-            if _os.path.exists(npc_json_path):
-                with open(npc_json_path, "r", encoding="utf-8") as f:
-                    npc_data = _json.load(f) or {}
+            if asset_exists(npc_json_path):
+                npc_data = load_json_asset(npc_json_path) or {}
 
                 combat_profile = npc_data.get("combat_profile") or {}
                 base_stats = combat_profile.get("base_stats") or {}
@@ -330,6 +524,9 @@ class WorldState:
     def assign_role(self, role: str) -> None:
         self.assign_roles.assign(role)
 
+    def auto_assign_roles(self) -> None:
+        self.assign_roles.auto_complete()
+
     # -------------------------------
     # Role outcomes (delegado a NPCSystem)
     # -------------------------------
@@ -346,6 +543,18 @@ class WorldState:
         cfg = roles_cfg.get(role, {}) or {}
         self.npc_system.apply_role_outcomes(npc_id, cfg, self.markers)
 
+    def _apply_role_outcomes_batch(self, assignments: dict) -> None:
+        """Outcomes de muchas asignaciones juntas (auto_complete): un solo pase, sin prompts."""
+        step = getattr(self, "_event_apply_role_outcomes_step", None)
+        if not step:
+            return
+
+        roles_cfg = step.get("roles", {}) or {}
+        for npc_id, role in assignments.items():
+            cfg = roles_cfg.get(role)
+            if cfg:
+                self.npc_system.apply_role_outcomes(npc_id, cfg, self.markers)
+
     # -------------------------------
     # Intro / eventos
     # -------------------------------
@@ -365,14 +574,58 @@ class WorldState:
 
         self.npc_system.spawn_intro_line(self.markers, (self.player.tile_x, self.player.tile_y))
 
-        event_path = asset_path("data", "events", "intro_assign_roles.json")
-        with open(event_path, "r", encoding="utf-8") as f:
-            event_json = json.load(f)
+        self.run_event_by_id("intro_assign_roles")
+
+    def start_auto_events(self) -> None:
+        """
+        Eventos trigger=auto de este mapa:
+          - los ambient arrancan todos como scripts del scheduler
+          - del resto, corre el primero pendiente en el EventRunner
+        """
+        blocking = []
+        for ev in self.events.auto_events(self.map_id):
+            if ev.ambient:
+                # al retomar desde el pool el script puede seguir vivo
+                if not self.scheduler.has_task(ev.event_id):
+                    self.scheduler.spawn(ambient_script(self, ev), name=ev.event_id)
+            else:
+                blocking.append(ev)
+
+        if self.event_runner.active:
+            return
 
-        self.run_event(event_json)
+        ev = self._first_pending(blocking)
+        if ev is not None:
+            self.run_event(ev)
 
-    def run_event(self, event_json):
-        self.event_runner.start(event_json)
+    def run_event(self, event):
+        self.event_runner.start(event)
+
+    def queue_event(self, event_id: str) -> None:
+        """Evento a correr apenas no haya otro evento ni diálogo activo (consecuencias, edificios)."""
+        self.game.game_state.queue_event(event_id)
+
+    def _run_queued_event(self) -> None:
+        gs = self.game.game_state
+        if not gs.pending_events or self.event_runner.active or self.dialogue.active:
+            return
+        self.run_event_by_id(gs.pop_event())
+
+    def run_event_by_id(self, event_id: str) -> bool:
+        ev = self.events.get(str(event_id))
+        if ev is None:
+            print(f"[EVENT] No existe el evento: {event_id}")
+            return False
+        self.run_event(ev)
+        return True
+
+    def _first_pending(self, events):
+        gs = self.game.game_state
+        for ev in events:
+            if ev.once_flag and gs.get_flag(ev.once_flag, False):
+                continue
+            return ev
+        return None
 
     # -------------------------------
     # Cambiar mapa (delegado)
@@ -384,9 +637,8 @@ class WorldState:
     # Render
     # -------------------------------
     def render(self, screen):
-        screen.fill((0, 0, 0))
-
-        self.map.draw(screen, self.camera, layer_order=("mapa",))
+        # mapa: buffer con scroll (pinta todo el fondo, no hace falta fill)
+        self.map_renderer.render(screen, self.map, self.camera)
         self.player.draw(screen, self.camera)
 
         self.npc_system.draw(screen, self.camera)
@@ -0,0 +1,83 @@
+# project/engines/world_engine/world_state_pool.py
+from collections import OrderedDict
+
+from engines.world_engine.event_registry import normalize_map_id
+
+
+class WorldStatePool:
+    """
+    Pool LRU de WorldStates suspendidos, por map_id.
+
+    Al cruzar una puerta el mapa que se deja se suspende (WorldState.suspend) y
+    queda acá con sus NPCs runtime, scripts y caches; volver a él es un
+    resume() + re-sync con GameState en vez de reconstruir todo.
+
+    El pool pertenece a un GameState: si el juego cambia de GameState (nueva
+    partida, cargar save) se vacía solo.
+    """
+
+    def __init__(self, capacity: int = 4):
+        self.capacity = max(0, int(capacity))
+        self._states: "OrderedDict[str, object]" = OrderedDict()
+        self._owner = None
+
+        # stats (debug)
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, game, map_rel_path, spawn_tile=None):
+        """WorldState del mapa: retomado del pool si está, nuevo si no."""
+        self._check_owner(game)
+
+        ws = self._states.pop(normalize_map_id(map_rel_path), None)
+        if ws is not None:
+            self.hits += 1
+            ws.resume(map_rel_path, spawn_tile=spawn_tile)
+            return ws
+
+        self.misses += 1
+        from engines.world_engine.world_state import WorldState
+        return WorldState(game, map_rel_path=map_rel_path, spawn_tile=spawn_tile)
+
+    def release(self, ws) -> None:
+        """Suspende ws y lo guarda como el más reciente; descarta el menos usado si sobra."""
+        self._check_owner(ws.game)
+
+        if self.capacity == 0 or ws.owner_state is not ws.game.game_state:
+            ws.dispose()
+            return
+
+        old = self._states.pop(ws.map_id, None)
+        if old is not None and old is not ws:
+            old.dispose()
+
+        ws.suspend()
+        self._states[ws.map_id] = ws
+
+        while len(self._states) > self.capacity:
+            _, evicted = self._states.popitem(last=False)
+            evicted.dispose()
+
+    def clear(self) -> None:
+        for ws in self._states.values():
+            ws.dispose()
+        self._states.clear()
+
+    def __contains__(self, map_id) -> bool:
+        return normalize_map_id(map_id) in self._states
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def _check_owner(self, game) -> None:
+        if game.game_state is not self._owner:
+            self.clear()
+            self._owner = game.game_state
+
+
+def get_world_pool(game) -> WorldStatePool:
+    pool = getattr(game, "world_pool", None)
+    if pool is None:
+        pool = WorldStatePool()
+        game.world_pool = pool
+    return pool
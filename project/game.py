@@ -10,6 +10,11 @@ class Game:
         # Estado persistente del juego
         self.game_state = GameState()
 
+        # Mapas visitados recientemente (engines/world_engine/world_state_pool, lazy)
+        self.world_pool = None
+        # Horarios de NPCs (engines/world_engine/npc_schedule, lazy)
+        self.npc_schedules = None
+
         # Estado actual (arranca en menú)
         self.state = StartMenuState(self)
 
@@ -20,6 +25,11 @@ class Game:
     def handle_event(self, event):
         # Atajos globales
         if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_F3:
+                from render.world.memory import format_report, memory_report
+                print(format_report(memory_report(getattr(self.state, "map", None))))
+                return
+
             if event.key == pygame.K_F5:
                 from core.save_manager import save_game
                 path = save_game(self.game_state, slot=1)
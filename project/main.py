@@ -1,14 +1,23 @@
 import pygame
-from game import Game
+
 
 def main():
-    pygame.init()
+    # Sólo los módulos que usamos (pygame.init() también levanta audio/joystick y tarda)
+    pygame.display.init()
+    pygame.font.init()
     screen = pygame.display.set_mode((800, 600))
     pygame.display.set_caption("My RPG")
 
+    # Import diferido: el menú no necesita los engines de mundo/batalla,
+    # esos se importan recién al elegir "Nueva partida"/"Cargar".
+    from game import Game
+
     clock = pygame.time.Clock()
     game = Game(screen)
 
+    # Primer frame del menú lo antes posible (antes del primer tick/eventos)
+    game.render()
+
     running = True
     while running:
         dt = clock.tick(60) / 1000
@@ -0,0 +1,94 @@
+# project/render/world/atlas.py
+import pygame
+
+from core.assets import asset_exists, asset_key, asset_path, load_json_asset, open_asset
+from render.world.memory import surface_bytes
+
+
+# Generado por tools/atlas_builder.py
+ATLAS_INDEX = asset_path("atlas", "atlas.json")
+
+
+def tile_key(image_path: str, local_id: int) -> str:
+    return f"tile:{asset_key(image_path)}:{int(local_id)}"
+
+
+def walk_frame_key(sheet_path: str, row: int, col: int) -> str:
+    return f"walk:{asset_key(sheet_path)}:{int(row)}:{int(col)}"
+
+
+class TextureAtlas:
+    """
+    Atlas de texturas (runtime).
+
+    Índice:
+      {
+        "pages": ["atlas/page_0.png", ...],
+        "images": ["tilesets/pueblo.png", "sprites/npcs/x/walk.png", ...],
+        "rects": { "<key>": [page, x, y, w, h], ... }
+      }
+
+    Se dibuja con screen.blit(page, pos, rect): pocas surfaces grandes en vez
+    de miles de surfaces chicas. Las páginas se cargan recién al usarlas.
+    """
+
+    def __init__(self, index: dict):
+        self.page_paths: list[str] = list(index.get("pages", []))
+        self.images: set[str] = set(index.get("images", []))
+        self.rects: dict[str, tuple[int, int, int, int, int]] = {
+            k: tuple(v) for k, v in (index.get("rects", {}) or {}).items()
+        }
+        self._pages: list[pygame.Surface | None] = [None] * len(self.page_paths)
+
+    def covers(self, image_path: str) -> bool:
+        return asset_key(image_path) in self.images
+
+    def get(self, key: str) -> tuple[pygame.Surface, pygame.Rect] | None:
+        r = self.rects.get(key)
+        if r is None:
+            return None
+        page, x, y, w, h = r
+        return self._page(page), pygame.Rect(x, y, w, h)
+
+    def walk_frames(self, sheet_path: str, rows: int = 4, cols: int = 3) -> dict | None:
+        """(row, col) -> (page, rect) de un walk sheet, o None si el atlas no lo tiene completo."""
+        if not self.covers(sheet_path):
+            return None
+        out = {}
+        for row in range(rows):
+            for col in range(cols):
+                area = self.get(walk_frame_key(sheet_path, row, col))
+                if area is None:
+                    return None
+                out[(row, col)] = area
+        return out
+
+    def memory_report(self) -> dict:
+        loaded = [p for p in self._pages if p is not None]
+        return {
+            "pages": len(self._pages),
+            "pages_loaded": len(loaded),
+            "total": sum(surface_bytes(p) for p in loaded),
+        }
+
+    def _page(self, idx: int) -> pygame.Surface:
+        surf = self._pages[idx]
+        if surf is None:
+            path = asset_path(self.page_paths[idx])
+            surf = pygame.image.load(open_asset(path), path).convert_alpha()
+            self._pages[idx] = surf
+        return surf
+
+
+_atlas: TextureAtlas | None = None
+_atlas_checked = False
+
+
+def get_atlas() -> TextureAtlas | None:
+    """Atlas compartido, o None si no se generó (se usan los sheets sueltos)."""
+    global _atlas, _atlas_checked
+    if not _atlas_checked:
+        _atlas_checked = True
+        if asset_exists(ATLAS_INDEX):
+            _atlas = TextureAtlas(load_json_asset(ATLAS_INDEX))
+    return _atlas
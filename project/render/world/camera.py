@@ -1,3 +1,6 @@
+import math
+
+
 class Camera:
     def __init__(self, width, height):
         self.x = 0
@@ -6,5 +9,6 @@ class Camera:
         self.height = height
 
     def follow(self, target_x, target_y):
-        self.x = target_x - self.width // 2
-        self.y = target_y - self.height // 2
+        # Píxeles enteros: el mapa (scroll del buffer) y los sprites caen en la misma grilla
+        self.x = math.floor(target_x) - self.width // 2
+        self.y = math.floor(target_y) - self.height // 2
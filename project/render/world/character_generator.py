@@ -0,0 +1,300 @@
+# project/render/world/character_generator.py
+"""
+Compositor de personajes a partir de generator.json (CharacterGeneratorSettings).
+
+Partes por capas en assets/sprites/generator/ (layout del generador de RPG Maker):
+
+  <Kind>/<Gender>/<Prefix>_<Parte>_<patrón>.png      capa
+  <Kind>/<Gender>/<Prefix>_<Parte>_<patrón>_c.png    máscara de color (opcional)
+  gradients.png                                      tabla de colores, una fila cada GRADIENT_ROW px
+
+  Kind/Prefix: Walk/TV (walk), SV/SV (battle), Face/FG (portrait)
+  Parte: Body, FrontHair, RearHair, Clothing... (una "2" opcional va detrás del cuerpo)
+
+generator.json:
+  - patterns: {"body": "p01", "fronthair": "p20", ...}
+  - colors:   {"#F9C19D": 12, ...}  color de la máscara -> fila de gradients.png
+              (el brillo del píxel de la capa elige la posición dentro de la fila)
+  - offsets:  {"face": {"x": 0, "y": 0}, ...}  (sólo en el retrato, como el generador)
+
+Los sheets salen a cache/sprites/<hash>/<walk|battle|portrait>.png, donde hash
+es el de los settings (+ COMPOSITOR_VERSION). Se componen una vez (al hornear
+con tools/sprite_baker.py o la primera vez que se piden con build=True); al
+spawnear sólo se busca el archivo (cached_sheet), sin componer nada.
+
+El recoloreo usa numpy; sin numpy las capas se apilan sin paleta.
+"""
+import hashlib
+import json
+import os
+import random
+from functools import lru_cache
+
+import pygame
+
+from core.assets import PROJECT_ROOT, asset_exists, asset_path, is_asset_dir, list_assets, open_asset
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin él no hay recoloreo
+    np = None
+
+HAS_NUMPY = np is not None
+
+PARTS_DIR = asset_path("sprites", "generator")
+CACHE_DIR = os.path.join(PROJECT_ROOT, "cache", "sprites")
+
+# subir si cambia el resultado del compositor (invalida el cache en disco)
+COMPOSITOR_VERSION = 1
+
+GRADIENT_ROW = 4  # alto en px de cada fila de gradients.png
+
+# colores de máscara estándar del generador (piel, ojos, pelo, ropa...)
+MASK_COLORS = (
+    "#F9C19D", "#2C80CB", "#FCCB0A", "#B892C5", "#009296", "#D3CEC7", "#AE8682", "#FE9D1E",
+    "#1C76D0", "#D9A404", "#D8AC00", "#A30708", "#D3CEC2", "#DA346E", "#A4C911", "#C78407",
+    "#C0D3D2", "#4155B6", "#BA3B45", "#999999", "#CCBAD2", "#607E4B", "#E6D6BD", "#A7D6D6",
+)
+
+# sheet -> (carpeta, prefijo de archivo)
+SHEETS = {
+    "walk": ("Walk", "TV"),
+    "battle": ("SV", "SV"),
+    "portrait": ("Face", "FG"),
+}
+
+PART_NAMES = {
+    "body": "Body",
+    "face": "Face",
+    "fronthair": "FrontHair",
+    "rearhair": "RearHair",
+    "beard": "Beard",
+    "ears": "Ears",
+    "eyes": "Eyes",
+    "eyebrows": "Eyebrows",
+    "nose": "Nose",
+    "mouth": "Mouth",
+    "facialmark": "FacialMark",
+    "beastears": "BeastEars",
+    "tail": "Tail",
+    "wing": "Wing",
+    "clothing": "Clothing",
+    "cloak": "Cloak",
+    "acca": "AccA",
+    "accb": "AccB",
+    "glasses": "Glasses",
+}
+
+# orden de dibujo (fondo -> frente); "2" = la mitad trasera de una parte partida
+LAYER_ORDER = (
+    ("wing", ""), ("tail", ""), ("rearhair", "2"), ("cloak", "2"), ("clothing", "2"),
+    ("body", ""), ("face", ""), ("ears", ""), ("eyes", ""), ("eyebrows", ""), ("nose", ""),
+    ("mouth", ""), ("facialmark", ""), ("beard", ""), ("clothing", ""), ("rearhair", ""),
+    ("fronthair", ""), ("beastears", ""), ("cloak", ""), ("glasses", ""), ("acca", ""), ("accb", ""),
+)
+
+
+def settings_key(settings: dict) -> str:
+    """Hash estable de los settings (orden de claves indistinto)."""
+    raw = json.dumps({"v": COMPOSITOR_VERSION, "s": settings}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def cached_sheet(settings: dict, kind: str = "walk") -> str | None:
+    """Path del sheet ya compuesto, o None si todavía no se horneó."""
+    path = os.path.join(CACHE_DIR, settings_key(settings), f"{kind}.png")
+    return path if os.path.exists(path) else None
+
+
+class CharacterCompositor:
+    """
+    Compone sheets por capas. Guarda las partes y gradientes cargados, así
+    hornear cientos de variantes no relee los mismos PNG.
+    """
+
+    def __init__(self, parts_dir: str = PARTS_DIR):
+        self.parts_dir = parts_dir
+        self._images: dict[str, pygame.Surface | None] = {}
+        self._gradients = None  # array [filas, ancho, 3] (numpy) o False si no hay
+
+    def available(self) -> bool:
+        return is_asset_dir(self.parts_dir)
+
+    # -------------------------------
+    # API
+    # -------------------------------
+    def sheet(self, settings: dict, kind: str = "walk", build: bool = True) -> str | None:
+        path = cached_sheet(settings, kind)
+        if path is not None or not build:
+            return path
+        return self.build(settings, (kind,)).get(kind)
+
+    def build(self, settings: dict, kinds=tuple(SHEETS)) -> dict[str, str]:
+        """Compone (si falta) y escribe en cache los sheets pedidos: kind -> path."""
+        out = {}
+        folder = os.path.join(CACHE_DIR, settings_key(settings))
+        for kind in kinds:
+            path = os.path.join(folder, f"{kind}.png")
+            if not os.path.exists(path):
+                surf = self.compose(settings, kind)
+                if surf is None:
+                    continue
+                os.makedirs(folder, exist_ok=True)
+                tmp = path + ".tmp.png"
+                pygame.image.save(surf, tmp)
+                os.replace(tmp, path)
+            out[kind] = path
+        return out
+
+    def compose(self, settings: dict, kind: str) -> pygame.Surface | None:
+        folder, prefix = SHEETS[kind]
+        gender = str(settings.get("gender") or "female").capitalize()
+        patterns = settings.get("patterns") or {}
+        colors = settings.get("colors") or {}
+        offsets = (settings.get("offsets") or {}) if kind == "portrait" else {}
+
+        layers = []
+        for part, half in LAYER_ORDER:
+            pattern = patterns.get(part)
+            if not pattern:
+                continue
+            name = PART_NAMES[part] + half
+            base = self._part(folder, gender, prefix, name, pattern)
+            if base is None and not half:
+                name = PART_NAMES[part] + "1"
+                base = self._part(folder, gender, prefix, name, pattern)
+            if base is None:
+                continue
+            mask = self._part(folder, gender, prefix, name, pattern, "_c")
+            off = offsets.get(part) or {}
+            layers.append((base, mask, (int(off.get("x", 0)), int(off.get("y", 0)))))
+
+        if not layers:
+            print(f"[CHARGEN] ⚠️ Sin partes para {kind} ({gender}) en {self.parts_dir}")
+            return None
+
+        size = layers[0][0].get_size()
+        out = pygame.Surface(size, pygame.SRCALPHA)
+        for base, mask, pos in layers:
+            out.blit(self._recolor(base, mask, colors), pos)
+        return out
+
+    # -------------------------------
+    # Internals
+    # -------------------------------
+    def _part(self, folder: str, gender: str, prefix: str, name: str, pattern: str, suffix: str = ""):
+        path = os.path.join(self.parts_dir, folder, gender, f"{prefix}_{name}_{pattern}{suffix}.png")
+        if path not in self._images:
+            surf = None
+            if asset_exists(path):
+                surf = pygame.image.load(open_asset(path), path)
+                surf = surf.convert_alpha() if pygame.display.get_surface() else surf
+            self._images[path] = surf
+        return self._images[path]
+
+    def _gradient_table(self):
+        if self._gradients is None:
+            self._gradients = False
+            path = os.path.join(self.parts_dir, "gradients.png")
+            if HAS_NUMPY and asset_exists(path):
+                surf = pygame.image.load(open_asset(path), path)
+                rgb = pygame.surfarray.array3d(surf).transpose(1, 0, 2)  # [alto, ancho, 3]
+                rows = rgb.shape[0] // GRADIENT_ROW
+                if rows:
+                    self._gradients = rgb[GRADIENT_ROW // 2::GRADIENT_ROW][:rows].astype(np.uint8)
+        return self._gradients
+
+    def _recolor(self, base: pygame.Surface, mask, colors: dict) -> pygame.Surface:
+        grads = self._gradient_table()
+        if mask is None or not colors or grads is False or mask.get_size() != base.get_size():
+            return base
+
+        surf = base.copy()
+        rgb = pygame.surfarray.pixels3d(surf)  # [w, h, 3], vista sobre surf
+        m = pygame.surfarray.array3d(mask).astype(np.int32)
+        packed = (m[..., 0] << 16) | (m[..., 1] << 8) | m[..., 2]
+
+        # brillo del píxel (0..255) -> columna del gradiente (claro a la izquierda)
+        lum = rgb[..., 0] * 0.299 + rgb[..., 1] * 0.587 + rgb[..., 2] * 0.114
+        cols = ((255.0 - lum) * (grads.shape[1] - 1) / 255.0).astype(np.int32)
+
+        for hex_color, row in colors.items():
+            try:
+                code = int(str(hex_color).lstrip("#"), 16)
+            except ValueError:
+                continue
+            row = int(row)
+            if not 0 <= row < grads.shape[0]:
+                continue
+            sel = packed == code
+            if sel.any():
+                rgb[sel] = grads[row][cols[sel]]
+        del rgb  # libera el lock de la surface
+        return surf
+
+
+@lru_cache(maxsize=None)
+def _patterns_in(kind: str, gender: str) -> dict[str, list[str]]:
+    """parte -> patrones disponibles en las partes (para variantes al azar)."""
+    folder, prefix = SHEETS[kind]
+    path = os.path.join(PARTS_DIR, folder, gender.capitalize())
+    names = {v: k for k, v in PART_NAMES.items()}
+    out: dict[str, set] = {}
+    if not is_asset_dir(path):
+        return {}
+    for fname in list_assets(path):
+        stem, ext = os.path.splitext(fname)
+        bits = stem.split("_")
+        if ext != ".png" or len(bits) != 3 or bits[0] != prefix:
+            continue
+        part = names.get(bits[1].rstrip("12"))
+        if part:
+            out.setdefault(part, set()).add(bits[2])
+    return {k: sorted(v) for k, v in out.items()}
+
+
+def villager_settings(seed, gender: str | None = None, base: dict | None = None) -> dict:
+    """
+    Settings deterministas para un aldeano (misma seed -> mismo aspecto).
+    Sortea un patrón disponible por parte y una fila de gradiente por color
+    de máscara (los de base["colors"] si se pasa un generator.json, si no MASK_COLORS).
+    """
+    rnd = random.Random(str(seed))
+    if gender is None:
+        genders = [g for g in ("female", "male") if _patterns_in("walk", g)]
+        gender = rnd.choice(genders or ["female", "male"])
+    base = base or {}
+
+    patterns = {}
+    for part, options in _patterns_in("walk", gender).items():
+        if part in ("beastears", "tail", "wing", "facialmark"):
+            continue  # rasgos especiales: no en aldeanos comunes
+        if part in ("glasses", "acca", "accb", "beard", "cloak") and rnd.random() < 0.7:
+            continue
+        patterns[part] = rnd.choice(options)
+
+    rows = 0
+    grads = get_compositor()._gradient_table()
+    if grads is not False:
+        rows = grads.shape[0]
+    base_colors = base.get("colors") or dict.fromkeys(MASK_COLORS, 0)
+    colors = {c: (rnd.randrange(rows) if rows else int(v)) for c, v in base_colors.items()}
+
+    return {
+        "identity": "CharacterGeneratorSettings",
+        "version": base.get("version", "2.0.0"),
+        "gender": gender,
+        "patterns": patterns or dict(base.get("patterns") or {}),
+        "colors": colors,
+        "offsets": dict(base.get("offsets") or {}),
+    }
+
+
+_compositor: CharacterCompositor | None = None
+
+
+def get_compositor() -> CharacterCompositor:
+    global _compositor
+    if _compositor is None:
+        _compositor = CharacterCompositor()
+    return _compositor
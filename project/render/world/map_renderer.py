@@ -0,0 +1,89 @@
+# project/render/world/map_renderer.py
+import math
+
+import pygame
+
+
+class ScrollingMapRenderer:
+    """
+    Renderer de la capa de mapa con buffer off-screen.
+
+    Guarda el frame anterior del mapa; cuando la cámara se mueve unos píxeles
+    desplaza el buffer (Surface.scroll) y repinta sólo las franjas que quedaron
+    expuestas. Redibuja todo si cambia el mapa (o su set de chunks residentes),
+    el tamaño de pantalla o si el salto es mayor que media pantalla.
+
+    Los sprites se dibujan encima, sobre la pantalla, después de render().
+    """
+
+    def __init__(self, layer_order=("mapa",), background=(0, 0, 0)):
+        self.layer_order = tuple(layer_order)
+        self.background = background
+
+        self._buffer: pygame.Surface | None = None
+        self._map = None
+        self._map_version = 0
+        self._cam: tuple[int, int] | None = None
+
+        # stats (debug): redibujos completos vs parciales
+        self.full_redraws = 0
+        self.strip_redraws = 0
+
+    def invalidate(self) -> None:
+        """Fuerza redibujo completo en el próximo frame (ej: un tile del mapa cambió)."""
+        self._cam = None
+
+    def render(self, screen: pygame.Surface, tiled_map, camera) -> None:
+        size = screen.get_size()
+        # cámara entera: el scroll del buffer y los tiles tienen que caer en el mismo píxel
+        cam = (math.floor(camera.x), math.floor(camera.y))
+
+        if self._buffer is None or self._buffer.get_size() != size:
+            self._buffer = pygame.Surface(size).convert()
+            self._cam = None
+
+        # mapas en streaming: llegó o se descartó un chunk -> redibujo completo
+        version = getattr(tiled_map, "version", 0)
+        if tiled_map is not self._map or version != self._map_version:
+            self._map = tiled_map
+            self._map_version = version
+            self._cam = None
+
+        if self._cam is None:
+            self._redraw(tiled_map, cam, self._buffer.get_rect())
+            self.full_redraws += 1
+        elif cam != self._cam:
+            dx = cam[0] - self._cam[0]
+            dy = cam[1] - self._cam[1]
+            w, h = size
+            if abs(dx) * 2 >= w or abs(dy) * 2 >= h:
+                self._redraw(tiled_map, cam, self._buffer.get_rect())
+                self.full_redraws += 1
+            else:
+                self._scroll(tiled_map, cam, dx, dy, w, h)
+                self.strip_redraws += 1
+
+        self._cam = cam
+        screen.blit(self._buffer, (0, 0))
+
+    def _scroll(self, tiled_map, cam, dx: int, dy: int, w: int, h: int) -> None:
+        self._buffer.scroll(-dx, -dy)
+
+        # franja vertical (columnas nuevas a izquierda/derecha)
+        if dx > 0:
+            self._redraw(tiled_map, cam, pygame.Rect(w - dx, 0, dx, h))
+        elif dx < 0:
+            self._redraw(tiled_map, cam, pygame.Rect(0, 0, -dx, h))
+
+        # franja horizontal (filas nuevas arriba/abajo); la esquina ya quedó en la vertical
+        if dy > 0:
+            self._redraw(tiled_map, cam, pygame.Rect(0, h - dy, w, dy))
+        elif dy < 0:
+            self._redraw(tiled_map, cam, pygame.Rect(0, 0, w, -dy))
+
+    def _redraw(self, tiled_map, cam, rect: pygame.Rect) -> None:
+        buf = self._buffer
+        buf.set_clip(rect)
+        buf.fill(self.background, rect)
+        tiled_map.draw_region(buf, cam[0], cam[1], rect, self.layer_order)
+        buf.set_clip(None)
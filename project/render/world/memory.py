@@ -0,0 +1,57 @@
+# project/render/world/memory.py
+import pygame
+
+
+def surface_bytes(surf: pygame.Surface) -> int:
+    """
+    Bytes de píxeles que retiene una surface.
+    Las subsurfaces comparten los píxeles del padre: cuentan 0.
+    """
+    if surf.get_parent() is not None:
+        return 0
+    return surf.get_pitch() * surf.get_height()
+
+
+def memory_report(tiled_map=None) -> dict:
+    """
+    Reporte de memoria de surfaces del mundo:
+      - map:     TiledMap.memory_report() del mapa actual (si se pasa)
+      - sprites: caches compartidos de walk sheets / frames (core.entities.unit)
+      - atlas:   páginas cargadas del atlas (si existe)
+    """
+    from core.entities.unit import walk_cache_report
+    from render.world.atlas import get_atlas
+
+    report = {"sprites": walk_cache_report()}
+
+    atlas = get_atlas()
+    if atlas is not None:
+        report["atlas"] = atlas.memory_report()
+
+    if tiled_map is not None:
+        report["map"] = tiled_map.memory_report()
+
+    report["total"] = sum(part["total"] for part in report.values())
+    return report
+
+
+def format_report(report: dict) -> str:
+    def kb(n: int) -> str:
+        return f"{n / 1024:.1f} KB"
+
+    lines = [f"[MEM] total surfaces: {kb(report['total'])}"]
+
+    m = report.get("map")
+    if m is not None:
+        lines.append(f"  map: {kb(m['total'])} (flipped {kb(m['flipped'])})")
+        for image, info in sorted(m["tilesets"].items()):
+            lines.append(f"    {image}: {info['tiles']} tiles, {kb(info['bytes'])}")
+
+    s = report["sprites"]
+    lines.append(f"  sprites: {kb(s['total'])} ({s['sheets']} sheets, {s['frames']} frames)")
+
+    a = report.get("atlas")
+    if a is not None:
+        lines.append(f"  atlas: {kb(a['total'])} ({a['pages_loaded']}/{a['pages']} páginas cargadas)")
+
+    return "\n".join(lines)
@@ -0,0 +1,102 @@
+# project/tools/asset_packer.py
+"""
+Empaqueta assets/ en un único assets.pack (para builds de distribución).
+
+El juego lo detecta solo (core/assets.get_pack) y sirve todos los archivos
+desde el pack con un único open + mmap; sin pack se usan los archivos sueltos.
+
+Uso (desde project/):
+    python tools/asset_packer.py                 # genera assets.pack
+    python tools/asset_packer.py --out build/x.pack
+    python tools/asset_packer.py --verify        # chequea hashes de un pack existente
+"""
+import hashlib
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.assets import (  # noqa: E402
+    ASSETS_ROOT,
+    PACK_ENTRY,
+    PACK_HEADER,
+    PACK_MAGIC,
+    PACK_PATH,
+    AssetPack,
+)
+
+# Fuentes de Tiled que el juego no lee en runtime
+SKIP_EXTS = (".tmx",)
+
+
+def collect_files(root: str) -> list[str]:
+    out = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(SKIP_EXTS) or name.startswith("."):
+                continue
+            full = os.path.join(dirpath, name)
+            out.append(os.path.relpath(full, root).replace("\\", "/"))
+    return out
+
+
+def build_pack(out_path: str, root: str = ASSETS_ROOT) -> int:
+    files = collect_files(root)
+
+    index = []
+    with open(out_path + ".tmp", "wb") as out:
+        out.write(b"\0" * PACK_HEADER.size)
+
+        for rel in files:
+            with open(os.path.join(root, rel), "rb") as f:
+                data = f.read()
+            index.append((rel, out.tell(), len(data), hashlib.sha1(data).digest()))
+            out.write(data)
+
+        index_offset = out.tell()
+        for rel, offset, length, digest in index:
+            name = rel.encode("utf-8")
+            out.write(struct.pack("<H", len(name)))
+            out.write(name)
+            out.write(PACK_ENTRY.pack(offset, length, digest))
+        index_size = out.tell() - index_offset
+
+        out.seek(0)
+        out.write(PACK_HEADER.pack(PACK_MAGIC, len(index), index_offset, index_size))
+
+    os.replace(out_path + ".tmp", out_path)
+    return len(index)
+
+
+def verify_pack(path: str) -> int:
+    pack = AssetPack(path)
+    bad = 0
+    try:
+        for key, (_, _, digest) in pack.index.items():
+            if hashlib.sha1(pack.read(key)).digest() != digest:
+                print(f"[PACK] ❌ hash distinto: {key}")
+                bad += 1
+        print(f"[PACK] {len(pack.index)} archivos, {bad} con error")
+    finally:
+        pack.close()
+    return bad
+
+
+def main(argv: list[str]) -> int:
+    out_path = PACK_PATH
+    if "--out" in argv:
+        out_path = os.path.abspath(argv[argv.index("--out") + 1])
+
+    if "--verify" in argv:
+        return 1 if verify_pack(out_path) else 0
+
+    count = build_pack(out_path)
+    size_kb = os.path.getsize(out_path) / 1024
+    print(f"[PACK] {count} archivos -> {out_path} ({size_kb:.0f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
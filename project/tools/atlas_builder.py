@@ -0,0 +1,179 @@
+# project/tools/atlas_builder.py
+"""
+Genera el atlas de texturas (assets/atlas/) para tilesets y walk sheets.
+
+  - Tiles: sólo los GIDs que aparecen en los mapas de assets/maps/world
+  - Personajes: los 12 frames (3x4) del bloque (0,0) de cada walk sheet
+    (protagonista + visual.walk de cada NPC), ya escalados a TILE_SIZE
+
+Todo se empaqueta por estantes (shelf packing) en páginas de PAGE_SIZE y se
+escribe assets/atlas/atlas.json con la tabla de rects. El juego lo detecta
+solo (render/world/atlas.get_atlas); sin atlas se usan los sheets sueltos.
+
+Uso (desde project/):
+    python tools/atlas_builder.py
+    python tools/atlas_builder.py --page-size 2048
+"""
+import json
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+import pygame  # noqa: E402
+
+from core.assets import asset_key, asset_path, list_assets, load_json_asset, open_asset  # noqa: E402
+from core.config import TILE_SIZE  # noqa: E402
+from core.entities.unit import PROTAGONIST_WALK, WALK_FRAME_GRID, walk_frame_rect  # noqa: E402
+from engines.world_engine.map_loader import TiledMap  # noqa: E402
+from render.world.atlas import tile_key, walk_frame_key  # noqa: E402
+
+PAGE_SIZE = 1024
+PADDING = 0
+
+
+def _load_image(path: str) -> pygame.Surface:
+    return pygame.image.load(open_asset(path), path)
+
+
+def collect_tiles(images: set[str]) -> dict[str, pygame.Surface]:
+    """key -> surface de cada tile usado en algún mapa. Agrega los sheets fuente a images."""
+    out: dict[str, pygame.Surface] = {}
+    sheets: dict[str, pygame.Surface] = {}
+
+    maps_dir = asset_path("maps", "world")
+    for name in list_assets(maps_dir):
+        if not name.endswith(".json"):
+            continue
+
+        tmap = TiledMap(os.path.join(maps_dir, name), load_tiles=False)
+        used = tmap.used_gids()
+
+        for ts in tmap.tilesets:
+            firstgid = ts["firstgid"]
+            columns = ts["columns"]
+            if columns <= 0:
+                continue
+
+            for gid in sorted(used):
+                local = gid - firstgid
+                if local < 0 or local >= ts["tilecount"]:
+                    continue
+
+                key = tile_key(ts["image"], local)
+                if key in out:
+                    continue
+
+                sheet = sheets.get(ts["image"])
+                if sheet is None:
+                    sheet = _load_image(ts["image"])
+                    sheets[ts["image"]] = sheet
+                    images.add(asset_key(ts["image"]))
+
+                tw, th = ts["tilewidth"], ts["tileheight"]
+                x = ts["margin"] + (local % columns) * (tw + ts["spacing"])
+                y = ts["margin"] + (local // columns) * (th + ts["spacing"])
+                surf = pygame.Surface((tw, th), pygame.SRCALPHA)
+                surf.blit(sheet, (0, 0), pygame.Rect(x, y, tw, th))
+                out[key] = surf
+
+    return out
+
+
+def collect_walk_frames(images: set[str]) -> dict[str, pygame.Surface]:
+    sheets = [PROTAGONIST_WALK]
+
+    npcs_dir = asset_path("sprites", "npcs")
+    for npc_id in list_assets(npcs_dir):
+        profile = asset_path("sprites", "npcs", npc_id, f"{npc_id}.json")
+        try:
+            walk = (load_json_asset(profile).get("visual") or {}).get("walk")
+        except (OSError, ValueError):
+            continue
+        if walk:
+            sheets.append(walk)
+
+    out: dict[str, pygame.Surface] = {}
+    cols, rows = WALK_FRAME_GRID
+    for rel in sheets:
+        sheet = _load_image(asset_path(rel))
+        for row in range(rows):
+            for col in range(cols):
+                src = walk_frame_rect(sheet.get_width(), sheet.get_height(), row, col)
+                frame = sheet.subsurface(src)
+                if frame.get_size() != (TILE_SIZE, TILE_SIZE):
+                    frame = pygame.transform.scale(frame, (TILE_SIZE, TILE_SIZE))
+                out[walk_frame_key(rel, row, col)] = frame.copy()
+        images.add(asset_key(rel))
+    return out
+
+
+def pack(items: dict[str, pygame.Surface], page_size: int) -> tuple[list[pygame.Surface], dict[str, list[int]]]:
+    """Shelf packing: ordena por alto y llena filas; abre página nueva cuando no entra."""
+    pages: list[pygame.Surface] = []
+    rects: dict[str, list[int]] = {}
+
+    order = sorted(items.items(), key=lambda kv: (-kv[1].get_height(), -kv[1].get_width(), kv[0]))
+
+    page = None
+    x = y = shelf_h = 0
+    for key, surf in order:
+        w, h = surf.get_size()
+        if w > page_size or h > page_size:
+            raise ValueError(f"Imagen más grande que la página del atlas: {key} ({w}x{h})")
+
+        if page is not None and x + w > page_size:
+            x = 0
+            y += shelf_h + PADDING
+            shelf_h = 0
+
+        if page is None or y + h > page_size:
+            page = pygame.Surface((page_size, page_size), pygame.SRCALPHA)
+            pages.append(page)
+            x = y = shelf_h = 0
+
+        page.blit(surf, (x, y))
+        rects[key] = [len(pages) - 1, x, y, w, h]
+
+        x += w + PADDING
+        shelf_h = max(shelf_h, h)
+
+    return pages, rects
+
+
+def main(argv: list[str]) -> int:
+    page_size = PAGE_SIZE
+    if "--page-size" in argv:
+        page_size = int(argv[argv.index("--page-size") + 1])
+
+    pygame.display.init()
+
+    # imágenes fuente cubiertas (el runtime sólo usa el atlas para estas)
+    images: set[str] = set()
+    items = collect_tiles(images)
+    items.update(collect_walk_frames(images))
+    pages, rects = pack(items, page_size)
+
+    out_dir = asset_path("atlas")
+    os.makedirs(out_dir, exist_ok=True)
+
+    page_paths = []
+    for i, page in enumerate(pages):
+        rel = f"atlas/page_{i}.png"
+        pygame.image.save(page, asset_path(rel))
+        page_paths.append(rel)
+
+    index = {"version": 1, "page_size": page_size, "pages": page_paths, "images": sorted(images), "rects": rects}
+    with open(asset_path("atlas", "atlas.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+
+    print(f"[ATLAS] {len(rects)} rects en {len(pages)} páginas de {page_size}px -> {out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,58 @@
+# project/tools/map_chunker.py
+"""
+Convierte mapas de Tiled a <mapa>.chunks para cargarlos en streaming.
+
+Sirve para mapas "infinite" (usa los chunks de Tiled) y para mapas fijos
+grandes (los corta en chunks de --chunk-size tiles). El juego usa el .chunks
+si existe (engines/world_engine/map_stream.open_map); si el JSON es más nuevo
+que el .chunks, se ignora hasta regenerarlo.
+
+Uso (desde project/):
+    python tools/map_chunker.py assets/maps/world/reino.json
+    python tools/map_chunker.py --infinite            # todos los infinite de maps/world
+    python tools/map_chunker.py mapa.json --chunk-size 32
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.assets import asset_path, list_assets, load_json_asset  # noqa: E402
+from engines.world_engine.map_stream import chunk_file_path, write_chunk_file  # noqa: E402
+
+
+def chunk_map(json_path: str, chunk_size: int | None = None) -> None:
+    data = load_json_asset(json_path)
+    out_path = chunk_file_path(json_path)
+    count = write_chunk_file(out_path, data, chunk_size=chunk_size)
+    size_kb = os.path.getsize(out_path) / 1024
+    print(f"[CHUNKS] {os.path.basename(json_path)}: {count} chunks -> {out_path} ({size_kb:.0f} KB)")
+
+
+def main(argv: list[str]) -> int:
+    chunk_size = None
+    if "--chunk-size" in argv:
+        i = argv.index("--chunk-size")
+        chunk_size = int(argv[i + 1])
+        del argv[i:i + 2]
+
+    paths = [os.path.abspath(a) for a in argv if not a.startswith("--")]
+
+    if "--infinite" in argv:
+        maps_dir = asset_path("maps", "world")
+        for name in list_assets(maps_dir):
+            path = os.path.join(maps_dir, name)
+            if name.endswith(".json") and load_json_asset(path).get("infinite"):
+                paths.append(path)
+
+    if not paths:
+        print(__doc__)
+        return 1
+
+    for path in paths:
+        chunk_map(path, chunk_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,70 @@
+# project/tools/sprite_baker.py
+"""
+Hornea sheets de personajes (walk/battle/portrait) con el compositor de
+render/world/character_generator.py y los deja en cache/sprites/<hash>/.
+
+  - cada assets/sprites/npcs/<id>/generator.json (NPCs sin sheets propios
+    o para regenerar variantes)
+  - --villagers N: las variantes de aldeano seed 0..N-1 (NPCSystem.spawn_villager)
+
+Lo ya horneado se saltea (el hash de los settings es la clave del cache).
+
+Uso (desde project/):
+    python tools/sprite_baker.py
+    python tools/sprite_baker.py --villagers 300 --kinds walk
+"""
+import argparse
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+import pygame  # noqa: E402
+
+from core.assets import asset_exists, asset_path, list_assets, load_json_asset  # noqa: E402
+from render.world.character_generator import SHEETS, get_compositor, villager_settings  # noqa: E402
+
+
+def collect_settings(villagers: int) -> list[tuple[str, dict]]:
+    out = []
+    npcs_dir = asset_path("sprites", "npcs")
+    for npc_id in list_assets(npcs_dir):
+        path = asset_path("sprites", "npcs", npc_id, "generator.json")
+        if asset_exists(path):
+            out.append((npc_id, load_json_asset(path)))
+    for seed in range(villagers):
+        out.append((f"villager:{seed}", villager_settings(seed)))
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--villagers", type=int, default=0)
+    parser.add_argument("--kinds", nargs="+", default=list(SHEETS), choices=list(SHEETS))
+    args = parser.parse_args()
+
+    pygame.display.init()
+    compositor = get_compositor()
+    if not compositor.available():
+        print(f"❌ No hay partes en {compositor.parts_dir}")
+        return 1
+
+    t0 = time.perf_counter()
+    built = 0
+    for name, settings in collect_settings(args.villagers):
+        paths = compositor.build(settings, tuple(args.kinds))
+        if len(paths) < len(args.kinds):
+            print(f"⚠️ {name}: faltan {sorted(set(args.kinds) - set(paths))}")
+        built += len(paths)
+
+    print(f"✅ {built} sheets en {time.perf_counter() - t0:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# project/tools/startup_bench.py
+"""
+Benchmark de arranque en frío.
+
+Mide, en un proceso Python nuevo por corrida:
+  - import_game_s: tiempo de `import game` (lo que carga el menú)
+  - first_frame_s: desde el inicio del proceso hasta el primer frame del menú
+    (display init + Game(screen) + render + flip), con SDL_VIDEODRIVER=dummy
+
+Compara la mediana contra tools/startup_budget.json y además verifica que los
+engines de mundo/batalla NO estén importados al mostrar el menú.
+
+Uso (desde project/):
+    python tools/startup_bench.py            # exit 1 si se pasa del presupuesto
+    python tools/startup_bench.py --update   # reescribe el presupuesto (mediana * BUDGET_MARGIN)
+
+El presupuesto guarda también las medianas medidas (measured_*), para ver
+el margen real contra el que se compara.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BUDGET_PATH = os.path.join(PROJECT_ROOT, "tools", "startup_budget.json")
+
+# margen sobre la mediana medida: cubre el ruido entre corridas (~40% en una
+# misma máquina) y todavía salta ante una regresión de 2x
+BUDGET_MARGIN = 1.5
+
+# Script que corre en el proceso hijo (una medición en frío)
+_PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+
+import pygame
+pygame.display.init()
+pygame.font.init()
+screen = pygame.display.set_mode((800, 600))
+
+t_import = time.perf_counter()
+import game
+import_s = time.perf_counter() - t_import
+
+g = game.Game(screen)
+g.render()
+first_frame_s = time.perf_counter() - t0
+
+print(json.dumps({
+    "import_game_s": import_s,
+    "first_frame_s": first_frame_s,
+    "modules": sorted(m for m in sys.modules if m.startswith("engines.")),
+}))
+pygame.quit()
+"""
+
+
+def load_budget() -> dict:
+    with open(BUDGET_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_probe() -> dict:
+    env = dict(os.environ)
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv: list[str]) -> int:
+    budget = load_budget()
+    runs = int(budget.get("runs", 5))
+
+    samples = [run_probe() for _ in range(runs)]
+    import_s = statistics.median(s["import_game_s"] for s in samples)
+    frame_s = statistics.median(s["first_frame_s"] for s in samples)
+    loaded = set(samples[-1]["modules"])
+
+    print(f"import game:  {import_s * 1000:7.1f} ms  (budget {budget['import_game_s'] * 1000:.0f} ms)")
+    print(f"first frame:  {frame_s * 1000:7.1f} ms  (budget {budget['first_frame_s'] * 1000:.0f} ms)")
+
+    if "--update" in argv:
+        budget["measured_import_game_s"] = round(import_s, 4)
+        budget["measured_first_frame_s"] = round(frame_s, 4)
+        budget["margin"] = BUDGET_MARGIN
+        budget["import_game_s"] = round(import_s * BUDGET_MARGIN, 4)
+        budget["first_frame_s"] = round(frame_s * BUDGET_MARGIN, 4)
+        with open(BUDGET_PATH, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"[BENCH] Presupuesto actualizado: {BUDGET_PATH}")
+        return 0
+
+    failed = False
+    if import_s > budget["import_game_s"]:
+        print("[BENCH] ❌ import game excede el presupuesto")
+        failed = True
+    if frame_s > budget["first_frame_s"]:
+        print("[BENCH] ❌ primer frame excede el presupuesto")
+        failed = True
+
+    eager = sorted(m for m in budget.get("deferred_modules", []) if m in loaded)
+    if eager:
+        print(f"[BENCH] ❌ módulos que deberían ser diferidos ya están importados: {eager}")
+        failed = True
+
+    if not failed:
+        print("[BENCH] ✅ dentro del presupuesto")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,37 @@
+# project/tools/world_manifest.py
+"""
+Genera / muestra el manifest del mundo (assets/maps/world_manifest.json).
+
+El juego lo arma solo al primer uso (re-escaneando sólo mapas modificados);
+esto sirve para regenerarlo antes de empaquetar y para ver el grafo de puertas.
+
+Uso (desde project/):
+    python tools/world_manifest.py            # actualiza el cache y muestra el grafo
+    python tools/world_manifest.py --force    # re-escanea todos los mapas
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from engines.world_engine.world_manifest import MANIFEST_PATH, build_manifest  # noqa: E402
+
+
+def main(argv: list[str]) -> int:
+    manifest = build_manifest(write=True, force="--force" in argv)
+
+    for map_id, entry in sorted(manifest.maps.items()):
+        print(f"{map_id} ({entry['width']}x{entry['height']}) tilesets={entry['tilesets']}")
+        for door in entry["doors"]:
+            arrival = door.get("arrival")
+            if arrival is None:
+                print(f"   puerta {door['id']}: -> ❌ {door.get('raw_target')!r} (sin mapa)")
+            else:
+                print(f"   puerta {door['id']}: -> {arrival['map']} @ {tuple(arrival['tile'])}")
+
+    print(f"[WORLD] {len(manifest.maps)} mapas -> {MANIFEST_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
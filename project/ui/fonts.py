@@ -0,0 +1,43 @@
+# project/ui/fonts.py
+import pygame
+
+from core.assets import asset_exists, asset_path, open_asset
+
+
+# Fuente por defecto del juego. Si existe assets/fonts/<DEFAULT_FACE>, se usa ese TTF;
+# si no, la fuente embebida de pygame (la misma que daba SysFont(None, ...)),
+# pero sin pasar por el descubrimiento de fuentes del sistema.
+DEFAULT_FACE = "ui.ttf"
+
+_fonts: dict[tuple[str | None, int], pygame.font.Font] = {}
+
+
+def get_font(size: int, face: str | None = None) -> pygame.font.Font:
+    """
+    Devuelve la fuente (face, size), creándola una sola vez por proceso.
+
+    face:
+      - None -> DEFAULT_FACE si está en assets/fonts, si no la de pygame
+      - "x.ttf" -> assets/fonts/x.ttf (fallback a la de pygame si no existe)
+    """
+    key = (face, int(size))
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        path = _resolve_face(face)
+        font = pygame.font.Font(open_asset(path) if path else None, int(size))
+        _fonts[key] = font
+    return font
+
+
+def _resolve_face(face: str | None) -> str | None:
+    path = asset_path("fonts", face or DEFAULT_FACE)
+    if asset_exists(path):
+        return path
+    return None
+
+
+def clear_fonts() -> None:
+    """Descarta las fuentes cacheadas (ej: si se reinicia pygame.font)."""
+    _fonts.clear()